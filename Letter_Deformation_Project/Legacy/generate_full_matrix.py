@@ -1,10 +1,14 @@
 import os
+import sys
 import itertools
-import matplotlib.pyplot as plt
+import cv2
 import numpy as np
 from skimage.metrics import structural_similarity as ssim
 from src.letter_model import LetterSkeleton
 from src.base_letters import CanonicalLetters
+from src.montage import (BACKGROUND, FONT, TITLE_HEIGHT, draw_tile, draw_title,
+                         score_color, tile_shape)
+from src.png_stream import PNGStreamWriter
 
 # ==========================================
 # 1. Configuration Definitions (including F, X, W)
@@ -126,21 +130,43 @@ def get_all_combinations(param_keys):
 # ==========================================
 # 3. Grid Drawing and Analysis
 # ==========================================
+# The matrix is produced one row (strip) at a time: every strip is tiled with
+# NumPy, appended to a streaming PNG and discarded, so peak memory is one
+# strip regardless of the number of rows (combinations) and columns (steps).
+
+TILE_SCALE = 0.8    # rendered 200x200 letters are shrunk to 160x160 tiles
+LABEL_LINES = 3     # "Dist" + up to two lines of parameter values
+NAME_SCALE = 0.45
+GAP = 4
+
+def format_cell_label(combo, params, thickness_val, dist_score):
+    info_texts = []
+    for k in combo:
+        if k == 'thickness':
+            val = thickness_val
+        else:
+            val = params.get(k)
+        
+        if isinstance(val, float): val_str = f"{val:.1f}"
+        else: val_str = f"{val}"
+        
+        short_name = PARAM_SHORT_NAMES.get(k, k)
+        info_texts.append(f"{short_name}:{val_str}")
+    
+    if len(info_texts) > 2:
+        mid = len(info_texts) // 2
+        param_lines = [",".join(info_texts[:mid]), ",".join(info_texts[mid:])]
+    else:
+        param_lines = info_texts
+
+    return [f"Dist: {dist_score:.2f}"] + param_lines
 
-def generate_full_matrix_for_letter(letter_char, draw_func, output_dir):
+def generate_full_matrix_for_letter(letter_char, draw_func, output_dir, steps=10):
     print(f"Generating FULL matrix with SCORES for Letter {letter_char}...")
     
     param_keys = list(CONFIGS[letter_char].keys())
     combinations = get_all_combinations(param_keys)
-    
-    num_rows = len(combinations)
-    steps = 10 
-    
-    fig_height = num_rows * 2.2 
-    fig_width = steps * 1.8
-    
-    fig, axes = plt.subplots(num_rows, steps, figsize=(fig_width, fig_height))
-    fig.suptitle(f"Letter {letter_char}: Analysis (Value & Distance Score)", fontsize=24, y=1.002)
+    display_names = [" + ".join([PARAM_SHORT_NAMES.get(k, k) for k in combo]) for combo in combinations]
 
     model = LetterSkeleton(size=(200, 200))
 
@@ -151,67 +177,63 @@ def generate_full_matrix_for_letter(letter_char, draw_func, output_dir):
     draw_func(model, **base_params, thickness=base_thick)
     base_img = model.apply_morphology(thickness=base_thick)
 
-    # --- Main Loop ---
-    for row_idx, combo in enumerate(combinations):
-        
-        display_name = " + ".join([PARAM_SHORT_NAMES.get(k, k) for k in combo])
-        
-        for col_idx in range(steps):
-            t = col_idx / (steps - 1)
-            params = get_interpolated_params(letter_char, combo, t)
+    # --- Layout (known up front, so the PNG header can be written first) ---
+    img_size = int(round(200 * TILE_SCALE))
+    tile_h, tile_w = tile_shape((img_size, img_size), LABEL_LINES)
+    name_w = max(cv2.getTextSize(n, FONT, NAME_SCALE, 1)[0][0] for n in display_names) + 3 * GAP
+    width = name_w + steps * (tile_w + GAP) + GAP
+    strip_h = tile_h + GAP
+    height = TITLE_HEIGHT + len(combinations) * strip_h + GAP
 
-            thickness_val = params.pop('thickness', 6)
-            if isinstance(thickness_val, float): thickness_val = int(thickness_val)
+    strip = np.empty((strip_h, width, 3), dtype=np.uint8)
+    tile = np.empty((tile_h, tile_w, 3), dtype=np.uint8)
+    filename = os.path.join(output_dir, f"FULL_MATRIX_{letter_char}_SCORED.png")
 
-            draw_func(model, **params, thickness=thickness_val)
-            
-            img = model.apply_morphology(thickness=thickness_val)
+    with PNGStreamWriter(filename, width, height, bgr=True) as png:
+        title = np.empty((TITLE_HEIGHT, width, 3), dtype=np.uint8)
+        png.write_rows(draw_title(title, f"Letter {letter_char}: Analysis (Value & Distance Score)"))
 
-            dist_score = calculate_distance(base_img, img)
+        # --- Main Loop: one strip per combination ---
+        for combo, display_name in zip(combinations, display_names):
+            strip[...] = BACKGROUND
+            (text_w, text_h), _ = cv2.getTextSize(display_name, FONT, NAME_SCALE, 1)
+            cv2.putText(strip, display_name, (name_w - 2 * GAP - text_w, GAP + (tile_h + text_h) // 2),
+                        FONT, NAME_SCALE, (0, 0, 0), 1, cv2.LINE_AA)
 
-            info_texts = []
-            for k in combo:
-                if k == 'thickness':
-                    val = thickness_val
-                else:
-                    val = params.get(k)
-                
-                if isinstance(val, float): val_str = f"{val:.1f}"
-                else: val_str = f"{val}"
+            for col_idx in range(steps):
+                t = col_idx / max(1, steps - 1)
+                params = get_interpolated_params(letter_char, combo, t)
+
+                thickness_val = params.pop('thickness', 6)
+                if isinstance(thickness_val, float): thickness_val = int(thickness_val)
+
+                draw_func(model, **params, thickness=thickness_val)
                 
-                short_name = PARAM_SHORT_NAMES.get(k, k)
-                info_texts.append(f"{short_name}:{val_str}")
-            
-            if len(info_texts) > 2:
-                mid = len(info_texts) // 2
-                param_str = ",".join(info_texts[:mid]) + "\n" + ",".join(info_texts[mid:])
-            else:
-                param_str = "\n".join(info_texts)
-
-            ax = axes[row_idx, col_idx]
-            ax.imshow(img, cmap='gray')
-            ax.axis('off')
-            
-            title_text = f"Dist: {dist_score:.2f}\n{param_str}"
-            ax.set_title(title_text, fontsize=7, pad=2)
-            
-            if col_idx == 0:
-                ax.text(-50, 100, display_name, fontsize=11, weight='bold', va='center', ha='right')
+                img = model.apply_morphology(thickness=thickness_val)
+
+                dist_score = calculate_distance(base_img, img)
+
+                small = cv2.resize(img, (img_size, img_size), interpolation=cv2.INTER_AREA)
+                draw_tile(tile, small, format_cell_label(combo, params, thickness_val, dist_score),
+                          score_color(dist_score))
+                x = name_w + col_idx * (tile_w + GAP)
+                strip[GAP:, x:x + tile_w] = tile
+
+            png.write_rows(strip)
+
+        png.write_rows(np.full((GAP, width, 3), BACKGROUND, dtype=np.uint8))
 
-    plt.tight_layout()
-    filename = os.path.join(output_dir, f"FULL_MATRIX_{letter_char}_SCORED.png")
-    plt.savefig(filename, dpi=70, bbox_inches='tight')
-    plt.close()
     print(f"Saved: {filename}")
 
 def main():
+    steps = int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else 10
     OUTPUT_DIR = 'full_matrices_scored'
     if not os.path.exists(OUTPUT_DIR):
         os.makedirs(OUTPUT_DIR)
 
     # Generate matrices for all letters
     for letter_char, draw_func in DRAW_FUNCS.items():
-        generate_full_matrix_for_letter(letter_char, draw_func, OUTPUT_DIR)
+        generate_full_matrix_for_letter(letter_char, draw_func, OUTPUT_DIR, steps=steps)
     
     print(f"\n✅ Done! Check '{OUTPUT_DIR}' folder.")
 
@@ -4,8 +4,6 @@ import matplotlib.pyplot as plt
 import numpy as np
 import seaborn as sns
 import json
-from skimage.metrics import structural_similarity as ssim
-from skimage.filters import gaussian
 
 # --- PATH CONFIGURATION ---
 # Fix paths so we can import from src/ even if running from Run_Project/
@@ -16,6 +14,12 @@ if parent_dir not in sys.path:
 
 from src.letter_model import LetterSkeleton
 from src.base_letters import CanonicalLetters
+from src.param_space import load_spaces
+from src.param_config import STANDARD_HEATMAP_PAIRS
+import src.metrics
+from src.metrics import calculate_distance
+from src.sweep_store import SweepStore, input_hash, render_code
+from src.dedup import DistanceCache
 
 # =========================
 # Configuration
@@ -26,6 +30,10 @@ OUTPUT_DIR = os.path.join(parent_dir, "analysis", "heatmaps")
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 CONFIG_PATH = os.path.join(parent_dir, 'param_config.json')
 
+# Raw heatmap grids, reused by later runs
+CACHE_DIR = os.path.join(parent_dir, "analysis", "sweep_cache")
+SWEEP_STORE = SweepStore(CACHE_DIR)
+
 DRAW_FUNCS = {
     'A': CanonicalLetters.draw_A,
     'B': CanonicalLetters.draw_B,
@@ -48,22 +56,13 @@ def load_param_config(filepath):
         return json.load(f)
 
 PARAM_CONFIG = load_param_config(CONFIG_PATH)
-
-def calculate_distance(img1, img2):
-    """Calculates visual distance using blurred SSIM."""
-    if img1.shape != img2.shape: return 0.0
-    img1_blur = gaussian(img1, sigma=1.5)
-    img2_blur = gaussian(img2, sigma=1.5)
-    d_range = img1_blur.max() - img1_blur.min()
-    if d_range == 0: d_range = 1 
-    sim = ssim(img1_blur, img2_blur, data_range=d_range)
-    return max(0.0, 1.0 - sim)
+PARAM_SPACES = load_spaces(PARAM_CONFIG)
 
 def get_base_image(letter):
     """Generates the canonical base image for a letter."""
     model = LetterSkeleton(size=(200, 200))
-    params = {k: v['default'] for k, v in PARAM_CONFIG[letter].items()}
-    thick = int(params.pop('thickness', 6))
+    space = PARAM_SPACES[letter]
+    params, thick = space.draw_args(space.defaults(1)[0])
     DRAW_FUNCS[letter](model, **params, thickness=thick)
     return model.apply_morphology(thickness=thick)
 
@@ -71,53 +70,69 @@ def get_base_image(letter):
 # Core Logic
 # =========================
 
-def generate_heatmap(letter, param1, param2, steps=10, show_plot=False):
-    """
-    Generates and saves a 2D heatmap showing the interaction between two parameters.
-    """
-    print(f"   -> Generating Heatmap: {letter} ({param1} vs {param2})...")
-    
-    # Validation
-    if param1 not in PARAM_CONFIG[letter] or param2 not in PARAM_CONFIG[letter]:
-        print(f"❌ Error: Invalid parameters for {letter}")
-        return
+# compute_heatmap() renders and scores the grid (cached in CACHE_DIR via
+# src.sweep_store), plot_heatmap() only draws from the stored arrays.
 
-    # Get ranges from config
+def heatmap_name(letter, param1, param2, steps):
+    """Name of a heatmap grid in the sweep cache (one file per step count)."""
+    return f"2d_{letter}_{param1}_{param2}_{steps}"
+
+def heatmap_axes(letter, param1, param2, steps=10):
+    """(x_values, y_values): both parameters over their config range."""
     cfg1 = PARAM_CONFIG[letter][param1]
     cfg2 = PARAM_CONFIG[letter][param2]
-
-    x_values = np.linspace(cfg1['min'], cfg1['max'], steps)
-    y_values = np.linspace(cfg2['min'], cfg2['max'], steps)
+    return np.linspace(cfg1['min'], cfg1['max'], steps), np.linspace(cfg2['min'], cfg2['max'], steps)
+
+def heatmap_hash(letter, param1, param2, steps):
+    """Input hash of a heatmap: spec, letter config and the code that produces the numbers."""
+    spec = {"kind": "2d", "letter": letter, "param1": param1, "param2": param2,
+            "steps": steps, "config": PARAM_CONFIG[letter]}
+    # Draw function + helpers, rasterizer and parameter rounding, the distance module
+    # (blur, SSIM, precision), then this script's own steps
+    return input_hash(spec, code=render_code(letter) + (get_base_image, src.metrics,
+                                                        compute_heatmap))
+
+def compute_heatmap(letter, param1, param2, steps=10, distances=None):
+    """
+    Renders and scores the steps x steps grid. Returns (arrays, metadata) for the store.
+    'distances' is an optional DistanceCache for the letter's base image.
+    """
+    # Get ranges from config
+    x_values, y_values = heatmap_axes(letter, param1, param2, steps)
     
     heatmap_data = np.zeros((steps, steps))
     
-    base_img = get_base_image(letter)
+    if distances is None:
+        distances = DistanceCache(get_base_image(letter), calculate_distance)
     model = LetterSkeleton(size=(200, 200))
 
-    # Get defaults once
-    default_params = {k: v['default'] for k, v in PARAM_CONFIG[letter].items()}
+    # Rows follow param2 (Y axis), columns param1 (X axis)
+    space = PARAM_SPACES[letter]
+    grid = space.grid(param1, x_values, param2, y_values)
 
-    for i, y_val in enumerate(y_values): # Rows (Y axis)
-        for j, x_val in enumerate(x_values): # Cols (X axis)
-            current_params = default_params.copy()
-
-            # Handle types (int vs float)
-            if isinstance(cfg1['default'], int): current_params[param1] = int(round(x_val))
-            else: current_params[param1] = float(x_val)
-                
-            if isinstance(cfg2['default'], int): current_params[param2] = int(round(y_val))
-            else: current_params[param2] = float(y_val)
-            
-            thick = int(current_params.pop('thickness', 6))
+    for i in range(steps):
+        for j in range(steps):
+            current_params, thick = space.draw_args(grid[i, j])
             
             model.clear()
             DRAW_FUNCS[letter](model, **current_params, thickness=thick)
             img = model.apply_morphology(thickness=thick)
             
-            score = calculate_distance(base_img, img)
-            heatmap_data[i, j] = score
+            heatmap_data[i, j] = distances.distance(img)
+
+    return heatmap_result(letter, param1, param2, steps, x_values, y_values, heatmap_data)
+
+def heatmap_result(letter, param1, param2, steps, x_values, y_values, heatmap_data):
+    """(arrays, metadata) of a scored grid, as kept in the sweep cache."""
+    arrays = {"x_values": x_values, "y_values": y_values, "scores": heatmap_data}
+    metadata = {"letter": letter, "param1": param1, "param2": param2, "steps": steps}
+    return arrays, metadata
+
+def plot_heatmap(arrays, metadata, show_plot=False):
+    """Draws and saves the heatmap figure from stored arrays."""
+    letter, param1, param2 = metadata["letter"], metadata["param1"], metadata["param2"]
+    x_values, y_values, heatmap_data = arrays["x_values"], arrays["y_values"], arrays["scores"]
 
-    # Plotting
     plt.figure(figsize=(10, 8))
     
     # We use flipud (flip up-down) so that the visual Y-axis matches a graph (min at bottom)
@@ -138,6 +153,25 @@ def generate_heatmap(letter, param1, param2, steps=10, show_plot=False):
         plt.show()
     plt.close()
 
+def generate_heatmap(letter, param1, param2, steps=10, show_plot=False, recompute=False, distances=None):
+    """
+    Generates and saves a 2D heatmap showing the interaction between two parameters.
+    Scores are reused from the sweep cache while the inputs are unchanged.
+    """
+    print(f"   -> Generating Heatmap: {letter} ({param1} vs {param2})...")
+    
+    # Validation
+    if param1 not in PARAM_CONFIG[letter] or param2 not in PARAM_CONFIG[letter]:
+        print(f"❌ Error: Invalid parameters for {letter}")
+        return
+
+    arrays, metadata, cached = SWEEP_STORE.load_or_compute(
+        heatmap_name(letter, param1, param2, steps), heatmap_hash(letter, param1, param2, steps),
+        lambda: compute_heatmap(letter, param1, param2, steps, distances), recompute=recompute)
+    if cached:
+        print("      (cached sweep, re-plotting only)")
+    plot_heatmap(arrays, metadata, show_plot=show_plot)
+
 # =========================
 # Modes
 # =========================
@@ -153,27 +187,20 @@ def mode_interactive():
     
     generate_heatmap(letter, p1, p2, steps=10, show_plot=True)
 
-def mode_batch_report():
+def mode_batch_report(recompute=False):
     print("\n--- 📑 Generating Standard Heatmap Report ---")
     
-    # List of interesting parameter pairs to analyze
-    pairs = [
-        ('A', 'shear_x', 'base_width_factor'),
-        ('B', 'vertical_squash', 'waist_y_shift'),
-        ('C', 'cut_top', 'vertical_squash'),
-        ('F', 'bar_length', 'middle_bar_shift'),
-        ('X', 'cross_ratio', 'spread_angle'),
-        ('W', 'peak_depth', 'width_factor')
-    ]
-    
-    for l, p1, p2 in pairs:
-        generate_heatmap(l, p1, p2, steps=10, show_plot=False)
+    # Interesting parameter pairs, defined in src/param_config.py
+    # (re-plotted from the cache when inputs are unchanged)
+    for l, p1, p2 in STANDARD_HEATMAP_PAIRS:
+        generate_heatmap(l, p1, p2, steps=10, show_plot=False, recompute=recompute)
     
     print("\n✅ Batch Heatmap Report Completed.")
 
 if __name__ == "__main__":
+    # --recompute ignores the sweep cache
     if "--batch" in sys.argv:
-        mode_batch_report()
+        mode_batch_report(recompute="--recompute" in sys.argv)
     else:
         print("\nHeatmap Tool")
         print("1. Interactive Mode")
@@ -3,8 +3,6 @@ import os
 import matplotlib.pyplot as plt
 import numpy as np
 import json
-from skimage.metrics import structural_similarity as ssim
-from skimage.filters import gaussian
 
 # --- PATH CONFIGURATION ---
 # Fix paths so we can import from src/ even if running from Run_Project/
@@ -15,6 +13,12 @@ if parent_dir not in sys.path:
 
 from src.letter_model import LetterSkeleton
 from src.base_letters import CanonicalLetters
+from src.param_space import load_spaces
+from src.param_config import STANDARD_SWEEPS
+import src.metrics
+from src.metrics import calculate_distance
+from src.sweep_store import SweepStore, input_hash, render_code
+from src.dedup import DistanceCache
 
 # =========================
 # Configuration
@@ -25,6 +29,10 @@ OUTPUT_DIR = os.path.join(parent_dir, "analysis", "parameter_plots")
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 CONFIG_PATH = os.path.join(parent_dir, 'param_config.json')
 
+# Raw sweep results (values, scores, thumbnails), reused by later runs
+CACHE_DIR = os.path.join(parent_dir, "analysis", "sweep_cache")
+SWEEP_STORE = SweepStore(CACHE_DIR)
+
 DRAW_FUNCS = {
     'A': CanonicalLetters.draw_A,
     'B': CanonicalLetters.draw_B,
@@ -47,72 +55,90 @@ def load_param_config(filepath):
         return json.load(f)
 
 PARAM_CONFIG = load_param_config(CONFIG_PATH)
-
-def calculate_distance(img1, img2):
-    """Calculates visual distance using blurred SSIM."""
-    if img1.shape != img2.shape: return 0.0
-    img1_blur = gaussian(img1, sigma=1.5)
-    img2_blur = gaussian(img2, sigma=1.5)
-    d_range = img1_blur.max() - img1_blur.min()
-    if d_range == 0: d_range = 1 
-    sim = ssim(img1_blur, img2_blur, data_range=d_range)
-    return max(0.0, 1.0 - sim)
+PARAM_SPACES = load_spaces(PARAM_CONFIG)
 
 def get_base_image(letter):
     """Generates the canonical base image for a letter."""
     model = LetterSkeleton(size=(200, 200))
-    params = {k: v['default'] for k, v in PARAM_CONFIG[letter].items()}
-    thick = int(params.pop('thickness', 6))
+    space = PARAM_SPACES[letter]
+    params, thick = space.draw_args(space.defaults(1)[0])
     DRAW_FUNCS[letter](model, **params, thickness=thick)
     return model.apply_morphology(thickness=thick)
 
 # =========================
 # Analysis Logic
 # =========================
-
-def run_analysis(letter, param, start, end, steps, show_plot=False, save_prefix=""):
+# Two stages: compute_sweep() renders and scores (cached in CACHE_DIR via
+# src.sweep_store), plot_sweep() only draws from the stored arrays.
+
+def sweep_name(letter, param, start, end, steps):
+    """Name of a 1D sweep in the sweep cache (one file per range and step count)."""
+    return f"1d_{letter}_{param}_{start:g}_{end:g}_{steps}"
+
+def sweep_hash(letter, param, start, end, steps):
+    """Input hash of a sweep: spec, letter config and the code that produces the numbers."""
+    spec = {"kind": "1d", "letter": letter, "param": param, "start": start, "end": end,
+            "steps": steps, "config": PARAM_CONFIG[letter]}
+    # Draw function + helpers, rasterizer and parameter rounding, the distance module
+    # (blur, SSIM, precision), then this script's own steps
+    return input_hash(spec, code=render_code(letter) + (get_base_image, src.metrics,
+                                                        compute_sweep))
+
+def compute_sweep(letter, param, start, end, steps, distances=None):
     """
-    Runs the analysis for a single parameter.
-    Generates a report containing both the image sequence and the distance graph.
+    Renders and scores the sweep. Returns (arrays, metadata) for the store.
+    'distances' is an optional DistanceCache for the letter's base image
+    (e.g. kept warm by watch.py); identical masks are scored once.
     """
-    print(f"   -> Analyzing {letter}: {param}...")
-    
     model = LetterSkeleton(size=(200, 200))
-    base_img = get_base_image(letter)
+    if distances is None:
+        distances = DistanceCache(get_base_image(letter), calculate_distance)
     
     values = np.linspace(start, end, steps)
     images, scores = [], []
-    default_params = {k: v['default'] for k, v in PARAM_CONFIG[letter].items()}
+    space = PARAM_SPACES[letter]
 
-    for val in values:
+    # Other parameters stay at their defaults; ints are rounded by the space
+    for row in space.sweep(param, values):
         model.clear()
-        current_params = default_params.copy()
-        
-        # Handle int vs float parameters
-        if isinstance(current_params[param], int):
-            current_params[param] = int(round(val))
-        else:
-            current_params[param] = float(val)
-
-        thick = int(current_params.pop('thickness', 6))
+        current_params, thick = space.draw_args(row)
         DRAW_FUNCS[letter](model, **current_params, thickness=thick)
         img = model.apply_morphology(thickness=thick)
 
         images.append(img)
-        scores.append(calculate_distance(base_img, img))
+        scores.append(distances.distance(img))
 
-    # --- Visualization ---
-    
-    fig = plt.figure(figsize=(16, 8))
-    fig.suptitle(f"Parameter Analysis: {letter} – '{param}'", fontsize=18, fontweight='bold')
+    return sweep_result(letter, param, start, end, steps, values, images, scores)
 
-    # Top row: Images (limit to 12 max to prevent crowding)
+def sweep_result(letter, param, start, end, steps, values, images, scores):
+    """(arrays, metadata) of a rendered sweep, as kept in the sweep cache."""
+    # Only the images shown in the figure are kept (limit to 12 to prevent crowding)
     display_steps = min(steps, 12) 
     indices = np.linspace(0, steps-1, display_steps, dtype=int)
-    
+
+    arrays = {
+        "values": values,
+        "scores": np.array(scores),
+        "thumb_indices": indices,
+        "thumbnails": np.stack([images[i] for i in indices]),
+    }
+    metadata = {"letter": letter, "param": param, "start": start, "end": end, "steps": steps}
+    return arrays, metadata
+
+def plot_sweep(arrays, metadata, show_plot=False, save_prefix=""):
+    """Draws the report figure (image sequence + distance graph) from stored arrays."""
+    letter, param = metadata["letter"], metadata["param"]
+    values, scores = arrays["values"], arrays["scores"]
+    indices, thumbnails = arrays["thumb_indices"], arrays["thumbnails"]
+
+    fig = plt.figure(figsize=(16, 8))
+    fig.suptitle(f"Parameter Analysis: {letter} – '{param}'", fontsize=18, fontweight='bold')
+
+    # Top row: Images
+    display_steps = len(indices)
     for i, idx in enumerate(indices):
         ax = fig.add_subplot(2, display_steps, i + 1)
-        ax.imshow(images[idx], cmap='gray')
+        ax.imshow(thumbnails[i], cmap='gray')
         
         score = scores[idx]
         color = 'green' if score < 0.25 else 'orange' if score < 0.5 else 'red'
@@ -141,6 +167,21 @@ def run_analysis(letter, param, start, end, steps, show_plot=False, save_prefix=
         plt.show() 
     plt.close()
 
+def run_analysis(letter, param, start, end, steps, show_plot=False, save_prefix="", recompute=False,
+                 distances=None):
+    """
+    Runs the analysis for a single parameter.
+    Generates a report containing both the image sequence and the distance graph.
+    Scores are reused from the sweep cache while the inputs are unchanged.
+    """
+    print(f"   -> Analyzing {letter}: {param}...")
+    arrays, metadata, cached = SWEEP_STORE.load_or_compute(
+        sweep_name(letter, param, start, end, steps), sweep_hash(letter, param, start, end, steps),
+        lambda: compute_sweep(letter, param, start, end, steps, distances), recompute=recompute)
+    if cached:
+        print("      (cached sweep, re-plotting only)")
+    plot_sweep(arrays, metadata, show_plot=show_plot, save_prefix=save_prefix)
+
 # =========================
 # Modes
 # =========================
@@ -170,23 +211,20 @@ def mode_interactive():
     except ValueError:
         print("❌ Invalid input.")
 
-def mode_batch_report():
+def mode_batch_report(recompute=False):
     print("\n--- 📑 Generating Standard 1D Report (All Letters) ---")
     
-    # Run the standard suite for all letters
-    run_analysis('A', 'shear_x', -30, 30, 12, save_prefix="report_")
-    run_analysis('B', 'vertical_squash', 0.4, 1.0, 12, save_prefix="report_")
-    run_analysis('C', 'cut_top', -20, 80, 12, save_prefix="report_")
-    run_analysis('F', 'bar_length', 0.5, 1.5, 12, save_prefix="report_")
-    run_analysis('X', 'cross_ratio', 0.3, 0.7, 12, save_prefix="report_")
-    run_analysis('W', 'peak_depth', 0.3, 0.9, 12, save_prefix="report_")
+    # Run the standard suite for all letters (re-plots from the cache when inputs are unchanged)
+    for letter, param, start, end, steps in STANDARD_SWEEPS:
+        run_analysis(letter, param, start, end, steps, save_prefix="report_", recompute=recompute)
     
     print("\n✅ Batch Report Completed.")
 
 if __name__ == "__main__":
     # Check if run from main.py with --batch argument
+    # --recompute ignores the sweep cache
     if "--batch" in sys.argv:
-        mode_batch_report()
+        mode_batch_report(recompute="--recompute" in sys.argv)
     else:
         print("\n📈 Parameter Analysis Tool")
         print("1. Interactive Mode (Explore one param with GUI)")
@@ -0,0 +1,108 @@
+import sys
+import os
+import time
+
+# --- PATH CONFIGURATION ---
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+import numpy as np
+
+from src.letter_model import LetterSkeleton
+from src.base_letters import DRAW_FUNCS, render_letter
+from src.param_config import load_param_config
+from src.sampling import sample_space
+from src.param_space import ParameterSpace
+from src.metrics import calculate_distance, blur_image, DistanceWorkspace
+from src.fused_kernels import dilate_blur, KernelWorkspace
+
+# =========================
+# Benchmark: reference vs fused dilate+blur kernels
+# =========================
+# Usage: python Run_Project/benchmark_kernels.py [samples_per_letter]
+
+def build_cases(config, per_letter, seed=0):
+    """Renders raw (undilated) canvases for a random sweep of every letter."""
+    model = LetterSkeleton(size=(200, 200))
+    cases = []
+    for letter in DRAW_FUNCS:
+        base = render_letter(model, letter, {k: v['default'] for k, v in config[letter].items()}).copy()
+        space = ParameterSpace(config[letter], letter=letter)
+        for row in sample_space(space, per_letter, method='random', seed=seed):
+            params, thick = space.draw_args(row)
+            DRAW_FUNCS[letter](model, **params, thickness=thick)
+            cases.append((letter, base, model.canvas.copy(), thick))
+    return cases
+
+def time_per_sample(fn, cases, repeats=3):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for case in cases:
+            fn(case)
+        best = min(best, time.perf_counter() - start)
+    return best / len(cases) * 1e3
+
+def main():
+    per_letter = int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else 50
+    config = load_param_config()
+    cases = build_cases(config, per_letter)
+    print(f"\n⏱️  Kernel benchmark: {len(cases)} samples (200x200), \n")
+
+    model = LetterSkeleton(size=(200, 200))
+    workspace = KernelWorkspace((200, 200))
+    out = np.empty((200, 200))
+
+    def reference_path(case):
+        letter, base, canvas, thick = case
+        model.canvas[...] = canvas
+        return calculate_distance(base, model.apply_morphology(thickness=thick))
+
+    scorer = DistanceWorkspace((200, 200))
+    mask = np.empty((200, 200), dtype=np.uint8)
+
+    def workspace_path(case):
+        # Same computation as the reference, into preallocated buffers
+        letter, base, canvas, thick = case
+        model.canvas[...] = canvas
+        return calculate_distance(base, model.apply_morphology(thickness=thick, out=mask), workspace=scorer)
+
+    local_scorer = DistanceWorkspace((200, 200), local=True)
+
+    def local_path(case):
+        # SSIM only around the pixels that differ from the base image
+        letter, base, canvas, thick = case
+        model.canvas[...] = canvas
+        return calculate_distance(base, model.apply_morphology(thickness=thick, out=mask), workspace=local_scorer)
+
+    rows = [("reference (cv2 dilate + gaussian + ssim)", reference_path),
+            ("out= + DistanceWorkspace", workspace_path),
+            ("out= + diff-restricted SSIM", local_path)]
+
+    ref_scores = np.array([reference_path(c) for c in cases])
+    ref_ms = time_per_sample(reference_path, cases)
+
+    print(f"{'path':<42}{'ms/sample':>10}{'speedup':>9}{'max |Δscore|':>14}")
+    for name, fn in rows:
+        ms = ref_ms if fn is reference_path else time_per_sample(fn, cases)
+        scores = np.array([fn(c) for c in cases])
+        print(f"{name:<42}{ms:>10.3f}{ref_ms / ms:>8.2f}x{np.abs(scores - ref_scores).max():>14.2e}")
+
+    # Kernel-only timings (dilate + blur, no SSIM), against the unfused
+    # cv2 dilation + blur into buffers that the workspace path runs
+    print()
+    def unfused_kernel(case):
+        model.canvas[...] = case[2]
+        blur_image(model.apply_morphology(thickness=case[3], out=mask), out=out, scratch=scratch)
+    scratch = np.empty((200, 200))
+    kernel_ref = time_per_sample(unfused_kernel, cases)
+    print(f"{'kernel only: cv2 dilate + blur, out=':<42}{kernel_ref:>10.3f}")
+    ms = time_per_sample(lambda c: dilate_blur(c[2], c[3], out=out, backend='reference'), cases)
+    print(f"{'kernel only: skimage reference':<42}{ms:>10.3f}{kernel_ref / ms:>8.2f}x")
+    ms = time_per_sample(lambda c: dilate_blur(c[2], c[3], out=out, workspace=workspace, backend='numpy'), cases)
+    print(f"{'kernel only: fused numpy':<42}{ms:>10.3f}{kernel_ref / ms:>8.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+import sys
+import os
+import json
+import time
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+# --- PATH CONFIGURATION ---
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+from src.cli import get_cli_option
+from src.param_config import load_param_config
+from src.param_space import load_spaces
+from src.letter_model import LetterSkeleton
+from src.base_letters import render_letter
+from src.bitmask import PackedMasks
+from src.embedding import farthest_point_landmarks, jaccard_distance, landmark_mds, MiniBatchKMedoids
+from src.streaming import LetterStream
+
+# =========================
+# 2-D embedding and clustering of the deformation dataset
+# =========================
+# Usage:
+#   python Run_Project/embed_dataset.py [--source dataset|stream] [--samples 100000]
+#                                       [--landmarks 64] [--clusters 12] [--pool 2] [--seed 0]
+#                                       [--workers N]
+#
+# --source dataset (default) re-renders every distinct image of
+# OUTPUT_DATASET/dataset_summary.json from its parameters (the PNGs there are
+# titled figures); --source stream draws --samples new deformations from a
+# LetterStream instead (rendered and scored by --workers processes). Masks
+# are max-pooled by --pool and bit-packed, and compared with the Jaccard
+# distance (1 - IoU) through popcounts (src/bitmask.py). The embedding is
+# landmark MDS on the distances to --landmarks masks (the canonical letters
+# plus farthest-point picks) and the clusters come from mini-batch k-medoids
+# (src/embedding.py); no N x N matrix is ever built. With 100k masks the
+# landmarks, embedding and clustering take ~15 s on one core; the rest is
+# rendering (and SSIM scoring for the stream).
+#
+# Output: analysis/embedding/embedding_<source>.png (coloured by letter, by
+# score band and by cluster) and embedding_<source>.npz with the coordinates.
+
+OUTPUT_DIR = os.path.join(parent_dir, "analysis", "embedding")
+DATASET_DIR = os.path.join(parent_dir, "OUTPUT_DATASET")
+MASK_SIZE = (200, 200)
+
+# Score bands (same thresholds and colours as get_color_for_score)
+SCORE_BANDS = ((0.25, 'green', 'excellent (< 0.25)'),
+               (0.50, '#ff8c00', 'moderate (< 0.50)'),
+               (np.inf, 'red', 'poor (>= 0.50)'))
+
+def pool_masks(masks, factor):
+    """Max-pools a stack of masks by an integer factor (thin strokes survive)."""
+    if factor <= 1:
+        return masks
+    n, h, w = masks.shape
+    h, w = h // factor * factor, w // factor * factor
+    return masks[:, :h, :w].reshape(n, h // factor, factor, w // factor, factor).max(axis=(2, 4))
+
+def pooled_shape(factor):
+    return (MASK_SIZE[0] // max(factor, 1), MASK_SIZE[1] // max(factor, 1))
+
+def base_masks(config, pool):
+    """The canonical letters (all parameters at their defaults), pooled and packed."""
+    model = LetterSkeleton(size=MASK_SIZE)
+    letters, images = [], []
+    for letter, space in load_spaces(config).items():
+        letters.append(letter)
+        images.append(render_letter(model, letter, space.to_dict(space.defaults(1)[0])))
+    store = PackedMasks(pooled_shape(pool), capacity=len(images))
+    store.extend(pool_masks(np.stack(images), pool))
+    return store, np.array(letters)
+
+def load_dataset(pool, batch=512):
+    """
+    Masks of OUTPUT_DATASET, one per distinct image (image_hash). Returns
+    (PackedMasks, letters, scores, record counts per mask).
+    """
+    summary_path = os.path.join(DATASET_DIR, "dataset_summary.json")
+    if not os.path.exists(summary_path):
+        raise FileNotFoundError(f"No dataset at {summary_path}, run generate_dataset.py first")
+    with open(summary_path) as f:
+        records = [r for r in json.load(f) if r.get("type") != "base"]
+
+    first = {}
+    counts = {}
+    for r in records:
+        key = (r["letter"], r.get("image_hash") or json.dumps(r["parameters"], sort_keys=True))
+        first.setdefault(key, r)
+        counts[key] = counts.get(key, 0) + 1
+
+    model = LetterSkeleton(size=MASK_SIZE)
+    store = PackedMasks(pooled_shape(pool), capacity=len(first))
+    images = np.empty((batch,) + MASK_SIZE, dtype=np.uint8)
+    keys = list(first)
+    for start in range(0, len(keys), batch):
+        part = keys[start:start + batch]
+        for k, key in enumerate(part):
+            render_letter(model, key[0], first[key]["parameters"], out=images[k])
+        store.extend(pool_masks(images[:len(part)], pool))
+    letters = np.array([key[0] for key in keys])
+    scores = np.array([first[key]["score_dist"] for key in keys], dtype=np.float64)
+    weights = np.array([counts[key] for key in keys], dtype=np.int64)
+    return store, letters, scores, weights
+
+def load_stream(config, n_samples, pool, seed, workers=0, batch=256):
+    """n_samples masks drawn from a LetterStream (sobol sampling, 'workers' processes)."""
+    n_batches = -(-n_samples // batch)
+    store = PackedMasks(pooled_shape(pool), capacity=n_samples)
+    letters, scores = [], []
+    for item in LetterStream(config=config, batch_size=batch, sampling='sobol', seed=seed,
+                             num_workers=workers, num_batches=n_batches):
+        keep = min(batch, n_samples - len(store))
+        store.extend(pool_masks(item['images'][:keep], pool))
+        letters.extend(item['labels'][:keep])
+        scores.extend(item['distances'][:keep])
+    return store, np.array(letters), np.array(scores, dtype=np.float64), np.ones(len(store), np.int64)
+
+def score_band_colors(scores):
+    colors = np.empty(len(scores), dtype=object)
+    lower = -np.inf
+    for limit, color, _ in SCORE_BANDS:
+        colors[(scores >= lower) & (scores < limit)] = color
+        lower = limit
+    return colors
+
+def plot_embedding(coords, letters, scores, clusters, base_coords, base_letters,
+                   medoid_coords, title, save_path):
+    fig, axes = plt.subplots(1, 3, figsize=(24, 8))
+    size = max(1.0, min(12.0, 20000.0 / len(coords)))
+    order = np.random.default_rng(0).permutation(len(coords))   # no letter drawn on top of all others
+
+    ax = axes[0]
+    palette = plt.get_cmap('tab10')
+    letter_list = list(base_letters)
+    letter_idx = np.array([letter_list.index(l) if l in letter_list else len(letter_list)
+                           for l in letters])
+    ax.scatter(coords[order, 0], coords[order, 1], c=[palette(i % 10) for i in letter_idx[order]],
+               s=size, alpha=0.7, linewidths=0, rasterized=True)
+    for i, letter in enumerate(letter_list):
+        ax.scatter([], [], color=palette(i % 10), s=40, label=letter)
+    ax.set_title("By letter", fontsize=13, fontweight='bold')
+
+    ax = axes[1]
+    ax.scatter(coords[order, 0], coords[order, 1], c=list(score_band_colors(scores)[order]),
+               s=size, alpha=0.7, linewidths=0, rasterized=True)
+    for _, color, label in SCORE_BANDS:
+        ax.scatter([], [], color=color, s=40, label=label)
+    ax.set_title("By score band (distance to base letter)", fontsize=13, fontweight='bold')
+
+    ax = axes[2]
+    ax.scatter(coords[order, 0], coords[order, 1], c=clusters[order] % 20, cmap='tab20',
+               vmin=0, vmax=19, s=size, alpha=0.7, linewidths=0, rasterized=True)
+    ax.scatter(medoid_coords[:, 0], medoid_coords[:, 1], marker='X', s=120, c='black',
+               edgecolors='white')
+    ax.scatter([], [], marker='X', s=60, c='black', label='medoids')
+    for c, (x, y) in enumerate(medoid_coords):
+        ax.annotate(str(c), (x, y), xytext=(5, 5), textcoords='offset points', fontsize=9,
+                    fontweight='bold')
+    ax.set_title(f"Mini-batch k-medoids ({len(medoid_coords)} clusters)", fontsize=13,
+                 fontweight='bold')
+
+    for ax in axes:
+        ax.scatter(base_coords[:, 0], base_coords[:, 1], marker='*', s=400, c='gold',
+                   edgecolors='black', linewidths=1.2, zorder=5)
+        ax.scatter([], [], marker='*', s=150, c='gold', edgecolors='black', label='canonical')
+        for letter, (x, y) in zip(base_letters, base_coords):
+            ax.annotate(letter, (x, y), xytext=(8, -4), textcoords='offset points',
+                        fontsize=14, fontweight='bold', zorder=6)
+        ax.set_xticks([])
+        ax.set_yticks([])
+        ax.legend(loc='best', fontsize=9)
+
+    fig.suptitle(title, fontsize=15, fontweight='bold')
+    plt.savefig(save_path, dpi=130, bbox_inches='tight')
+    plt.close()
+
+def main():
+    source = get_cli_option('--source', 'dataset')
+    n_samples = get_cli_option('--samples', 100000, int)
+    n_landmarks = get_cli_option('--landmarks', 64, int)
+    n_clusters = get_cli_option('--clusters', 12, int)
+    pool = get_cli_option('--pool', 2, int)
+    seed = get_cli_option('--seed', 0, int)
+    workers = get_cli_option('--workers', 0, int)
+    if source not in ('dataset', 'stream'):
+        print(f"❌ Unknown source '{source}' (choose 'dataset' or 'stream')")
+        return
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    config = load_param_config()
+
+    t0 = time.perf_counter()
+    print(f"🚀 Loading masks ({source})...")
+    try:
+        if source == 'dataset':
+            store, letters, scores, weights = load_dataset(pool)
+        else:
+            store, letters, scores, weights = load_stream(config, n_samples, pool, seed, workers)
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        return
+    bases, base_letters = base_masks(config, pool)
+    n_data = len(store)
+    # Canonical letters go last, and are always landmarks
+    store.extend(np.stack([bases.image(i) for i in range(len(bases))]))
+    t_load = time.perf_counter() - t0
+    print(f"📦 {n_data} masks ({weights.sum()} records), {store.nbytes / 1e6:.1f} MB packed "
+          f"at {store.shape[1]}x{store.shape[0]} ({t_load:.1f}s)")
+
+    t0 = time.perf_counter()
+    landmarks = farthest_point_landmarks(store, n_landmarks, first=range(n_data, len(store)),
+                                         seed=seed)
+    lm_store = store.take(landmarks)
+    coords = landmark_mds(jaccard_distance(lm_store, lm_store), jaccard_distance(store, lm_store))
+    t_embed = time.perf_counter() - t0
+    print(f"🗺️  Landmark MDS with {len(landmarks)} landmarks ({t_embed:.1f}s)")
+
+    t0 = time.perf_counter()
+    data = store.take(np.arange(n_data))
+    km = MiniBatchKMedoids(n_clusters, seed=seed).fit(data)
+    t_cluster = time.perf_counter() - t0
+    print(f"🧩 Mini-batch k-medoids: {len(km.medoids)} clusters, {km.iterations} iterations, "
+          f"mean distance to medoid {km.inertia / n_data:.3f} ({t_cluster:.1f}s)")
+
+    save_path = os.path.join(OUTPUT_DIR, f"embedding_{source}.png")
+    plot_embedding(coords[:n_data], letters, scores, km.labels, coords[n_data:], base_letters,
+                   coords[km.medoids], f"Deformation space ({n_data} masks, Jaccard distance)",
+                   save_path)
+    np.savez(os.path.join(OUTPUT_DIR, f"embedding_{source}.npz"), coords=coords[:n_data],
+             letters=letters, scores=scores, weights=weights, clusters=km.labels,
+             medoids=km.medoids, landmarks=landmarks, base_coords=coords[n_data:],
+             base_letters=base_letters)
+
+    print("\nCluster composition (records per letter):")
+    for c in range(len(km.medoids)):
+        members = km.labels == c
+        counts = {l: int(weights[members & (letters == l)].sum()) for l in base_letters}
+        top = ", ".join(f"{l}: {n}" for l, n in sorted(counts.items(), key=lambda kv: -kv[1]) if n)
+        print(f"   {c:>2} (medoid {letters[km.medoids[c]]}, mean score "
+              f"{scores[members].mean():.2f}): {top}")
+    print(f"✅ Embedding saved to: {save_path}")
+
+if __name__ == "__main__":
+    main()
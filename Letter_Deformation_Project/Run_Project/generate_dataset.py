@@ -13,19 +13,27 @@ if parent_dir not in sys.path:
 CONFIG_PATH = os.path.join(parent_dir, 'param_config.json')
 # --- PATH CONFIGURATION END ---
 
+import io
 import json
 import itertools
-import matplotlib.pyplot as plt
-import numpy as np
-from skimage.metrics import structural_similarity as ssim
-from skimage.filters import gaussian
+import threading
 import matplotlib
+from matplotlib.figure import Figure
 
 # Use Agg backend to save memory and avoid GUI windows during batch processing
 matplotlib.use('Agg')
 
+from src.cli import get_cli_option
 from src.letter_model import LetterSkeleton
 from src.base_letters import CanonicalLetters
+from src.sampling import SAMPLING_METHODS, sample_space, letter_seed
+from src.param_space import ParameterSpace, param_kinds
+from src.metrics import calculate_distance
+from src.dedup import mask_digest, encode_mask, DistanceCache, DedupStore
+from src.results_table import write_results_table
+from src.montage import build_montage, save_image
+from src.sharding import owns_unit, validate_shard, write_shard_manifest, merge_shard_manifests
+from src.pipeline import Pipeline, parse_workers
 
 # ==========================================
 # 1. Global Setup & Short Names
@@ -99,51 +107,9 @@ def get_user_steps():
     print(f"Using default steps: {default_steps}")
     return default_steps
 
-def calculate_distance(img1, img2):
-    """
-    Calculates distance with tolerance for thickness changes
-    using Gaussian Blur before SSIM comparison.
-    Range: 0.0 (Identical) to 1.0 (Different).
-    """
-    if img1.shape != img2.shape: return 0.0
-    
-    # Apply Gaussian blur to soften edges (reduces pixel-perfect requirements)
-    img1_blur = gaussian(img1, sigma=1.5)
-    img2_blur = gaussian(img2, sigma=1.5)
-    
-    d_range = img1_blur.max() - img1_blur.min()
-    if d_range == 0: d_range = 1.0
-    
-    similarity = ssim(img1_blur, img2_blur, data_range=d_range)
-    return max(0.0, 1.0 - similarity)
-
-def get_interpolated_params(letter_char, active_keys, t):
-    """
-    Interpolates parameters based on 't' (0.0 to 1.0).
-    Active keys move from Min to Max. Inactive keys stay at Default.
-    """
-    letter_config = PARAM_CONFIG[letter_char]
-    current_params = {}
-    
-    # 1. Set defaults for all parameters
-    for key, props in letter_config.items():
-        current_params[key] = props['default']
-
-    # 2. Calculate values for active parameters (interpolation)
-    for key in active_keys:
-        props = letter_config[key]
-        start_val = props['min']
-        end_val = props['max']
-        
-        # Linear interpolation
-        val = start_val + (end_val - start_val) * t
-        
-        if isinstance(start_val, int) and isinstance(end_val, int):
-            current_params[key] = int(round(val))
-        else:
-            current_params[key] = val
-            
-    return current_params
+def get_space(letter_char):
+    """ParameterSpace of a letter (explicit int / float dtypes from the config)."""
+    return ParameterSpace(PARAM_CONFIG[letter_char], letter=letter_char)
 
 def get_all_combinations(param_keys):
     """Generates all possible combinations of parameters."""
@@ -162,66 +128,417 @@ def get_color_for_score(score):
     else:
         return 'red'     # Poor match / High distortion
 
-def save_single_image(img, title, filepath, score=0.0):
-    """Saves a single image with a color-coded title."""
-    fig, ax = plt.subplots(figsize=(3, 3))
+def encode_single_image(img, title, score=0.0):
+    """
+    Renders a single image with a color-coded title to PNG bytes.
+    Uses the Figure API (no pyplot state), so it is safe to call from threads.
+    """
+    fig = Figure(figsize=(3, 3))
+    ax = fig.subplots()
     ax.imshow(img, cmap='gray')
     
     title_color = get_color_for_score(score)
     ax.set_title(title, fontsize=8, color=title_color, fontweight='bold')
     
     ax.axis('off')
-    plt.tight_layout()
-    plt.savefig(filepath, dpi=100)
-    plt.close(fig)
+    fig.tight_layout()
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=100)
+    return buffer.getvalue()
+
+def write_file(filepath, data):
+    """Writes encoded bytes, creating the folder if needed."""
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    with open(filepath, 'wb') as f:
+        f.write(data)
+
+def save_single_image(img, title, filepath, score=0.0):
+    """Saves a single image with a color-coded title."""
+    write_file(filepath, encode_single_image(img, title, score))
 
 def save_summary_matrix(images, titles, scores, main_title, filepath):
     """
     Saves a grid of images as a summary contact sheet.
+    Tiled with NumPy (score-coloured labels and borders) and written by OpenCV.
     """
     if not images: return
-    num_imgs = len(images)
-    rows = int(np.ceil(np.sqrt(num_imgs)))
-    cols = int(np.ceil(num_imgs / rows))
+    sheet = build_montage(images, titles, scores, title=f"Family: {main_title}")
+    save_image(filepath, sheet)
+
+# ==========================================
+# 3. Generation Units
+# ==========================================
+# Every record carries the content hash of its mask ('image_hash'). Scores
+# go through a per-letter DistanceCache, so identical masks (common because
+# of int truncation and clamping in the drawings) are scored once.
+#
+# The work of a unit is a list of tasks, one per image (parameters, output
+# path, label and the record fields known up front). The serial functions
+# below and the --pipeline mode (section 4) run the same tasks.
+
+def store_image(img, digest, title, score, root_dir, rel_path, dedup=None):
+    """
+    Saves one rendered sample and returns the path recorded in the metadata:
+    the titled figure at rel_path, or with a DedupStore (--dedup) the raw
+    mask stored once per distinct image.
+    """
+    if dedup is not None:
+        return dedup.add(img, digest)[0]
+    save_single_image(img, title, os.path.join(root_dir, rel_path), score=score)
+    return rel_path
+
+def generate_base(letter_char, draw_func, model, letter_dir, save=True, dedup=None):
+    """
+    Renders the canonical base image, returns it with its metadata.
+    The file is only written when save=True (one shard owns it); with a
+    DedupStore it is stored like every other sample (see store_image).
+    """
+    space = get_space(letter_char)
+    base_params, base_thick = space.draw_args(space.defaults(1)[0])
     
-    fig, axes = plt.subplots(rows, cols, figsize=(cols * 2.5, rows * 3.0))
-    fig.suptitle(f"Family: {main_title}", fontsize=16, y=1.02)
+    draw_func(model, **base_params, thickness=base_thick)
+    base_img = model.apply_morphology(thickness=base_thick)
     
-    if num_imgs > 1: axes_flat = axes.flatten()
-    else: axes_flat = [axes]
-
-    for i, ax in enumerate(axes_flat):
-        if i < num_imgs:
-            ax.imshow(images[i], cmap='gray')
-            c = get_color_for_score(scores[i])
-            ax.set_title(titles[i], fontsize=7, color=c, fontweight='bold')
-            ax.axis('off')
+    # Save base image
+    digest = mask_digest(base_img)
+    rel_path = dedup.rel_path(digest) if dedup is not None else base_rel_path(letter_char)
+    if save:
+        rel_path = store_image(base_img, digest, f"Base {letter_char}", 0.0, os.path.dirname(letter_dir),
+                               base_rel_path(letter_char), dedup)
+    
+    return base_img, base_record(letter_char, base_img, rel_path)
+
+def base_rel_path(letter_char):
+    """Path of the titled base figure, relative to the dataset folder."""
+    return os.path.join(letter_char, "base_letter.png")
+
+def base_record(letter_char, base_img, rel_path=None):
+    """Metadata record of a letter's base image (stored at rel_path, by default the titled figure)."""
+    space = get_space(letter_char)
+    base_params, base_thick = space.draw_args(space.defaults(1)[0])
+    rel_path = rel_path or base_rel_path(letter_char)
+    return {
+        "letter": letter_char,
+        "type": "base",
+        "deformation_family": "None",
+        "filename": os.path.basename(rel_path),
+        "filepath": rel_path,
+        "image_hash": mask_digest(base_img),
+        "score_dist": 0.0,
+        "parameters": {**base_params, "thickness": base_thick}
+    }
+
+def family_name(combo):
+    """Short name of a deformation family, e.g. 'W_Rot'."""
+    return "_".join([PARAM_SHORT_NAMES.get(k, k) for k in combo])
+
+def family_rows(letter_char, combo, steps):
+    """Parameter sets of one deformation family (active parameters moving from min to max)."""
+    return get_space(letter_char).interpolate(combo, [i / max(1, (steps - 1)) for i in range(steps)])
+
+def family_tasks(letter_char, combo, steps):
+    """
+    Tasks of one deformation family, one per row of family_rows(). A task
+    holds the parameters, the output path, the label under the score and the
+    record fields known before rendering.
+    """
+    deformation_name_short = family_name(combo)
+    space = get_space(letter_char)
+    tasks = []
+
+    for row in family_rows(letter_char, combo, steps):
+        params, thickness_val = space.draw_args(row)
+
+        # Construct filename
+        filename_params = []
+        title_params = []
+        for k in combo:
+            val = thickness_val if k == 'thickness' else params.get(k)
+            val_fmt = f"{val:.1f}" if isinstance(val, float) else f"{val}"
+            short = PARAM_SHORT_NAMES.get(k, k)
+            filename_params.append(f"{short}{val_fmt}")
+            title_params.append(f"{short}:{val_fmt}")
+
+        fname_str = "_".join(filename_params)
+        tasks.append({
+            "letter": letter_char,
+            "params": params,
+            "thickness": thickness_val,
+            "rel_path": os.path.join(letter_char, f"deformation_{deformation_name_short}", f"{fname_str}.png"),
+            "label": "\n".join(title_params),
+            "record": {
+                "letter": letter_char,
+                "type": "deformation",
+                "deformation_family": deformation_name_short,
+                "active_params": list(combo),
+            },
+        })
+
+    return tasks
+
+def sample_tasks(letter_char, method, n_samples, seed, indices=None):
+    """
+    Tasks of the sampled mode. The whole sample set is always drawn so it
+    does not depend on sharding; only the sample indices in 'indices'
+    (default: all) become tasks.
+    """
+    seed_used = letter_seed(seed, letter_char)
+    space = get_space(letter_char)
+    samples = sample_space(space, n_samples, method=method, seed=seed_used)
+    if indices is None: indices = range(n_samples)
+    tasks = []
+
+    for i in indices:
+        params, thickness_val = space.draw_args(samples[i])
+        tasks.append({
+            "letter": letter_char,
+            "params": params,
+            "thickness": thickness_val,
+            "rel_path": os.path.join(letter_char, f"sampled_{method}", f"sample_{i:06d}.png"),
+            "label": f"#{i} ({method})",
+            "record": {
+                "letter": letter_char,
+                "type": "sample",
+                "deformation_family": f"Sampled_{method}",
+                "active_params": list(PARAM_CONFIG[letter_char].keys()),
+                "sampling": {"method": method, "seed": seed_used, "index": i},
+            },
+        })
+
+    return tasks
+
+def render_task(model, draw_func, task):
+    draw_func(model, **task["params"], thickness=task["thickness"])
+    return model.apply_morphology(thickness=task["thickness"])
+
+def task_title(task, score):
+    return f"Dist: {score:.2f}\n{task['label']}"
+
+def task_record(task, digest, score, rel_path):
+    """Metadata record of a finished task."""
+    return {
+        **task["record"],
+        "filename": os.path.basename(rel_path),
+        "filepath": rel_path,
+        "image_hash": digest,
+        "score_dist": float(f"{score:.4f}"),
+        "parameters": {**task["params"], "thickness": task["thickness"]}
+    }
+
+def run_task(task, draw_func, model, distances, root_dir, dedup=None):
+    """Renders, scores and stores one task. Returns (image, score, record)."""
+    img = render_task(model, draw_func, task)
+    digest = mask_digest(img)
+    dist_score = distances.distance(img, digest)
+    rel_path = store_image(img, digest, task_title(task, dist_score), dist_score, root_dir,
+                           task["rel_path"], dedup)
+    return img, dist_score, task_record(task, digest, dist_score, rel_path)
+
+def save_family_summary(root_dir, letter_char, combo, images, tasks, scores):
+    """Saves the contact sheet of a deformation family."""
+    deformation_name_short = family_name(combo)
+    summary_path = os.path.join(root_dir, letter_char, f"SUMMARY_{deformation_name_short}.png")
+    titles = [task_title(task, score) for task, score in zip(tasks, scores)]
+    save_summary_matrix(images, titles, scores, deformation_name_short, summary_path)
+
+def generate_sampled_letter(letter_char, draw_func, model, base_img, root_dir,
+                            method, n_samples, seed, indices=None, distances=None, dedup=None):
+    """
+    Renders a fixed budget of parameter sets sampled over the full config box
+    (instead of the lockstep min->max combination sweep).
+    Only the sample indices in 'indices' (default: all) are rendered, see
+    sample_tasks(). See store_image() for 'distances' and 'dedup'.
+    """
+    os.makedirs(os.path.join(root_dir, letter_char, f"sampled_{method}"), exist_ok=True)
+    if distances is None: distances = DistanceCache(base_img, calculate_distance)
+
+    return [run_task(task, draw_func, model, distances, root_dir, dedup)[2]
+            for task in sample_tasks(letter_char, method, n_samples, seed, indices)]
+
+def generate_family(letter_char, draw_func, model, base_img, root_dir, combo, steps,
+                    distances=None, dedup=None):
+    """
+    Renders one deformation family (a combination of active parameters moving
+    from min to max over 'steps' steps), saves its images and contact sheet
+    and returns the metadata records. See store_image() for 'distances' and 'dedup'.
+    """
+    os.makedirs(os.path.join(root_dir, letter_char, f"deformation_{family_name(combo)}"), exist_ok=True)
+    if distances is None: distances = DistanceCache(base_img, calculate_distance)
+
+    tasks = family_tasks(letter_char, combo, steps)
+    images, scores, records = [], [], []
+    for task in tasks:
+        img, dist_score, record = run_task(task, draw_func, model, distances, root_dir, dedup)
+        images.append(img)
+        scores.append(dist_score)
+        records.append(record)
+
+    # Save summary contact sheet for this deformation family
+    save_family_summary(root_dir, letter_char, combo, images, tasks, scores)
+
+    return records
+
+# ==========================================
+# 4. Pipelined Generation (--pipeline)
+# ==========================================
+# The same tasks, run through a staged pipeline (src/pipeline.py) so that
+# rendering, scoring, PNG encoding and file writes overlap:
+#   render -> score -> encode -> write
+# Each stage has its own thread count (--workers render=1,score=2,...) and
+# bounded queues (--queue) keep memory flat. Contact sheets are built as
+# soon as the last image of a family has been written.
+
+PIPELINE_STAGES = ("render", "score", "encode", "write")
+
+def generate_pipelined(jobs, root_dir, distances, workers, queue_size=32, dedup=None):
+    """
+    Runs generation units through the pipeline.
+    jobs: [(unit, letter, combo or None, tasks)], combo set for deformation
+    families (which get a contact sheet). distances: letter -> DistanceCache.
+    Returns [(unit, records)] in unit order.
+    """
+    local = threading.local()
+
+    def render(item):
+        # LetterSkeleton holds a canvas, so every render thread has its own
+        if not hasattr(local, "model"):
+            local.model = LetterSkeleton(size=(200, 200))
+        task = item["task"]
+        item["img"] = render_task(local.model, DRAW_FUNCS[task["letter"]], task)
+        return item
+
+    def score(item):
+        item["digest"] = mask_digest(item["img"])
+        item["score"] = distances[item["task"]["letter"]].distance(item["img"], item["digest"])
+        return item
+
+    def encode(item):
+        if dedup is not None:
+            item["rel_path"] = dedup.rel_path(item["digest"])
+            item["data"] = None if dedup.contains(item["digest"]) else encode_mask(item["img"])
+        elif item["superseded"]:
+            item["rel_path"], item["data"] = item["task"]["rel_path"], None
         else:
-            ax.axis('off')
-            
-    plt.tight_layout()
-    plt.savefig(filepath, dpi=100, bbox_inches='tight')
-    plt.close(fig)
+            item["rel_path"] = item["task"]["rel_path"]
+            item["data"] = encode_single_image(item["img"], task_title(item["task"], item["score"]), item["score"])
+        return item
+
+    def write(item):
+        data = item.pop("data")
+        if dedup is not None:
+            dedup.add_encoded(item["digest"], data)
+        elif data is not None:
+            write_file(os.path.join(root_dir, item["rel_path"]), data)
+        return item
+
+    pipe = Pipeline([(name, fn, workers[name]) for name, fn in
+                     zip(PIPELINE_STAGES, (render, score, encode, write))], queue_size=queue_size)
+    sizes = {unit: len(tasks) for unit, _, _, tasks in jobs}
+    families = {unit: (letter, combo) for unit, letter, combo, _ in jobs}
+    # Steps whose formatted values coincide share a file name; as in the serial
+    # run the last one is kept, the earlier ones are not encoded or written
+    last_step = {(unit, task["rel_path"]): i for unit, _, _, tasks in jobs for i, task in enumerate(tasks)}
+    items = ({"unit": unit, "index": i, "task": task, "superseded": last_step[unit, task["rel_path"]] != i}
+             for unit, _, _, tasks in jobs for i, task in enumerate(tasks))
+
+    units = [(unit, []) for unit, size in sizes.items() if size == 0]
+    pending = {}
+    for item in pipe.imap(items):
+        unit = item["unit"]
+        pending.setdefault(unit, []).append(item)
+        if len(pending[unit]) < sizes[unit]:
+            continue
+
+        done = sorted(pending.pop(unit), key=lambda it: it["index"])
+        letter, combo = families[unit]
+        if combo is not None:
+            save_family_summary(root_dir, letter, combo, [it["img"] for it in done],
+                                [it["task"] for it in done], [it["score"] for it in done])
+        units.append((unit, [task_record(it["task"], it["digest"], it["score"], it["rel_path"]) for it in done]))
+
+    print("\n⏱️  Pipeline stages:")
+    print(pipe.report())
+    return sorted(units, key=lambda u: u[0])
 
 # ==========================================
-# 3. Main Generation Logic
+# 5. Main Generation Logic
 # ==========================================
 
+def save_results_table(root_dir, dataset_metadata):
+    """Writes the metadata as a columnar table next to dataset_summary.json (see src/results_table.py)."""
+    table_dir = os.path.join(root_dir, "dataset_table")
+    write_results_table(table_dir, dataset_metadata, param_kinds(PARAM_CONFIG))
+    print(f"💾 Saved columnar table to {table_dir}")
+
 def main():
     global PARAM_CONFIG
     
     # Load config
     PARAM_CONFIG = load_param_config(CONFIG_PATH)
-    steps = get_user_steps()
-    
+
     # Define output directory at project root
     root_dir = os.path.join(parent_dir, "OUTPUT_DATASET")
     os.makedirs(root_dir, exist_ok=True)
+
+    # Merge step for multi-node runs: combine all shard manifests into one index
+    if '--merge-shards' in sys.argv:
+        try:
+            dataset_metadata = merge_shard_manifests(root_dir)
+        except ValueError as e:
+            print(f"❌ Error: {e}")
+            sys.exit(1)
+        json_output_path = os.path.join(root_dir, "dataset_summary.json")
+        print(f"💾 Merged {len(dataset_metadata)} records into {json_output_path}")
+        with open(json_output_path, 'w') as f:
+            json.dump(dataset_metadata, f, indent=4)
+        save_results_table(root_dir, dataset_metadata)
+        return
+
+    # Optional quasi-random sampling mode (e.g. --sampling sobol --samples 500 --seed 0)
+    sampling = get_cli_option('--sampling')
+    if sampling is not None and sampling not in SAMPLING_METHODS:
+        print(f"❌ Error: Unknown sampling method '{sampling}'. Choose from {', '.join(SAMPLING_METHODS)}")
+        sys.exit(1)
+    n_samples = get_cli_option('--samples', 1000, int)
+    seed = get_cli_option('--seed', 0, int)
+
+    # Optional static sharding (e.g. --shard 2 --num-shards 4)
+    shard = get_cli_option('--shard', 0, int)
+    num_shards = get_cli_option('--num-shards', 1, int)
+    try:
+        validate_shard(shard, num_shards)
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+    # --dedup: store every distinct image once (records point to the shared file)
+    dedup = DedupStore(root_dir) if '--dedup' in sys.argv else None
+
+    # --pipeline: overlap rendering, scoring, encoding and writing (section 4),
+    # e.g. --workers render=1,score=2,encode=2,write=1 --queue 32
+    use_pipeline = '--pipeline' in sys.argv
+    try:
+        workers = parse_workers(get_cli_option('--workers'), PIPELINE_STAGES)
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+    queue_size = get_cli_option('--queue', 32, int)
+
+    steps = get_user_steps() if sampling is None else None
     
     print(f"\n🚀 Starting Dataset Generation...")
-    print(f"📂 Output Directory: {os.path.abspath(root_dir)}\n")
-
-    dataset_metadata = []
+    print(f"📂 Output Directory: {os.path.abspath(root_dir)}")
+    if num_shards > 1:
+        print(f"🧩 Shard {shard} of {num_shards}")
+    print()
+
+    # Work is split into units (a base image, a deformation family or a single
+    # sample). Unit numbering only depends on config and settings, so every
+    # node computes the same numbering and keeps the units it owns.
+    units = []
+    unit = 0
+    jobs = []          # --pipeline: (unit, letter, combo, tasks), run after the loop
+    letter_distances = {}
 
     for letter_char, draw_func in DRAW_FUNCS.items():
         if letter_char not in PARAM_CONFIG:
@@ -233,102 +550,79 @@ def main():
 
         model = LetterSkeleton(size=(200, 200))
 
-        # --- Base Image Generation ---
-        base_params = get_interpolated_params(letter_char, [], 0) 
-        base_thick = int(base_params.pop('thickness', 6))
-        
-        draw_func(model, **base_params, thickness=base_thick)
-        base_img = model.apply_morphology(thickness=base_thick)
-        
-        # Save base image
-        full_base_path = os.path.join(letter_dir, "base_letter.png")
-        save_single_image(base_img, f"Base {letter_char}", full_base_path, score=0.0)
-        
-        # Add base metadata
-        dataset_metadata.append({
-            "letter": letter_char,
-            "type": "base",
-            "deformation_family": "None",
-            "filename": "base_letter.png",
-            "filepath": os.path.join(letter_char, "base_letter.png"),
-            "score_dist": 0.0,
-            "parameters": {**base_params, "thickness": base_thick}
-        })
+        # --- Base Image Generation (always rendered, every shard scores against it) ---
+        owns_base = owns_unit(unit, shard, num_shards)
+        base_img, base_record = generate_base(letter_char, draw_func, model, letter_dir, save=owns_base,
+                                              dedup=dedup)
+        if owns_base:
+            units.append((unit, [base_record]))
+        unit += 1
+        distances = DistanceCache(base_img, calculate_distance)
+        letter_distances[letter_char] = distances
+
+        if sampling is not None and use_pipeline:
+            owned = [i for i in range(n_samples) if owns_unit(unit + i, shard, num_shards)]
+            tasks = sample_tasks(letter_char, sampling, n_samples, seed, indices=owned)
+            jobs.extend((unit + i, letter_char, None, [task]) for i, task in zip(owned, tasks))
+            unit += n_samples
+            print(f"📋 Queued Letter {letter_char} ({len(owned)} {sampling} samples)     ")
+            continue
+
+        if sampling is not None:
+            owned = [i for i in range(n_samples) if owns_unit(unit + i, shard, num_shards)]
+            records = generate_sampled_letter(letter_char, draw_func, model, base_img, root_dir,
+                                              sampling, n_samples, seed, indices=owned,
+                                              distances=distances, dedup=dedup)
+            units.extend((unit + r["sampling"]["index"], [r]) for r in records)
+            unit += n_samples
+            print(f"✅ Finished Letter {letter_char} ({len(owned)} {sampling} samples, "
+                  f"{len(distances.scores)} distinct)     ")
+            continue
 
         # --- Deformation Loop ---
         param_keys = list(PARAM_CONFIG[letter_char].keys())
         combinations = get_all_combinations(param_keys)
         
         for combo in combinations:
-            deformation_name_short = "_".join([PARAM_SHORT_NAMES.get(k, k) for k in combo])
-            deformation_subdir_name = f"deformation_{deformation_name_short}"
-            deformation_subdir_path = os.path.join(letter_dir, deformation_subdir_name)
-            os.makedirs(deformation_subdir_path, exist_ok=True)
-
-            summary_images = []
-            summary_titles = []
-            summary_scores = []
-
-            for i in range(steps):
-                t = i / max(1, (steps - 1))
-
-                params = get_interpolated_params(letter_char, combo, t)
-                thickness_val = params.pop('thickness', 6)
-                if isinstance(thickness_val, float): thickness_val = int(thickness_val)
-
-                draw_func(model, **params, thickness=thickness_val)
-                img = model.apply_morphology(thickness=thickness_val)
-                dist_score = calculate_distance(base_img, img)
-
-                # Construct filename
-                filename_params = []
-                title_params = []
-                for k in combo:
-                    val = thickness_val if k == 'thickness' else params.get(k)
-                    val_fmt = f"{val:.1f}" if isinstance(val, float) else f"{val}"
-                    short = PARAM_SHORT_NAMES.get(k, k)
-                    filename_params.append(f"{short}{val_fmt}")
-                    title_params.append(f"{short}:{val_fmt}")
-
-                fname_str = "_".join(filename_params)
-                filename = f"{fname_str}.png"
-                rel_path = os.path.join(letter_char, deformation_subdir_name, filename)
-                full_path = os.path.join(root_dir, rel_path)
-                
-                title_str = f"Dist: {dist_score:.2f}\n" + "\n".join(title_params)
-                save_single_image(img, title_str, full_path, score=dist_score)
-
-                # Metadata
-                summary_images.append(img)
-                summary_titles.append(title_str)
-                summary_scores.append(dist_score)
-
-                full_params_record = {**params, "thickness": thickness_val}
-                dataset_metadata.append({
-                    "letter": letter_char,
-                    "type": "deformation",
-                    "deformation_family": deformation_name_short,
-                    "active_params": list(combo),
-                    "filename": filename,
-                    "filepath": rel_path,
-                    "score_dist": float(f"{dist_score:.4f}"), 
-                    "parameters": full_params_record
-                })
-
-            # Save summary contact sheet for this deformation family
-            summary_filename = f"SUMMARY_{deformation_name_short}.png"
-            summary_path = os.path.join(letter_dir, summary_filename)
-            save_summary_matrix(summary_images, summary_titles, summary_scores, deformation_name_short, summary_path)
-
-        print(f"✅ Finished Letter {letter_char}     ")
-
-    # --- Save JSON Summary ---
-    json_output_path = os.path.join(root_dir, "dataset_summary.json")
-    print(f"\n💾 Saving metadata to {json_output_path}...")
-    with open(json_output_path, 'w') as f:
-        json.dump(dataset_metadata, f, indent=4)
+            if owns_unit(unit, shard, num_shards) and use_pipeline:
+                jobs.append((unit, letter_char, combo, family_tasks(letter_char, combo, steps)))
+            elif owns_unit(unit, shard, num_shards):
+                units.append((unit, generate_family(letter_char, draw_func, model, base_img,
+                                                    root_dir, combo, steps, distances, dedup)))
+            unit += 1
+
+        if use_pipeline:
+            print(f"📋 Queued Letter {letter_char} ({len(combinations)} families)     ")
+            continue
+        print(f"✅ Finished Letter {letter_char} ({len(distances.scores)} distinct images, "
+              f"{distances.hits} duplicates)     ")
+
+    if use_pipeline:
+        print(f"\n🏭 Running {sum(len(tasks) for *_, tasks in jobs)} images through the pipeline "
+              f"({', '.join(f'{name}={workers[name]}' for name in PIPELINE_STAGES)}, queue {queue_size})...")
+        units = sorted(units + generate_pipelined(jobs, root_dir, letter_distances, workers, queue_size, dedup),
+                       key=lambda u: u[0])
+        print(f"✅ {sum(len(d.scores) for d in letter_distances.values())} distinct images, "
+              f"{sum(d.hits for d in letter_distances.values())} duplicates")
+
+    # --- Save JSON Summary (or this node's shard manifest) ---
+    if num_shards > 1:
+        settings = {"steps": steps, "sampling": sampling,
+                    "samples": n_samples if sampling else None,
+                    "seed": seed if sampling else None,
+                    "dedup": dedup is not None}
+        manifest_path = write_shard_manifest(root_dir, shard, num_shards, units, settings)
+        print(f"\n💾 Saved shard manifest to {manifest_path}")
+        print("   Run with --merge-shards once every shard has finished.")
+    else:
+        dataset_metadata = [record for _, records in units for record in records]
+        json_output_path = os.path.join(root_dir, "dataset_summary.json")
+        print(f"\n💾 Saving metadata to {json_output_path}...")
+        with open(json_output_path, 'w') as f:
+            json.dump(dataset_metadata, f, indent=4)
+        save_results_table(root_dir, dataset_metadata)
 
     print("\n🎉 Dataset Generation Complete!")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
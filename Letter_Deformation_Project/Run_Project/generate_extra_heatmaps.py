@@ -12,11 +12,11 @@ import matplotlib.pyplot as plt
 import numpy as np
 import seaborn as sns
 import json
-from skimage.metrics import structural_similarity as ssim
-from skimage.filters import gaussian
 
 from src.letter_model import LetterSkeleton
 from src.base_letters import CanonicalLetters
+from src.param_space import load_spaces
+from src.metrics import calculate_distance
 
 # =========================
 # Configuration
@@ -46,24 +46,12 @@ def load_param_config(filepath):
         return json.load(f)
 
 PARAM_CONFIG = load_param_config(CONFIG_PATH)
-
-def calculate_distance(img1, img2):
-    """Consistent distance metric using Gaussian blur + SSIM."""
-    if img1.shape != img2.shape: return 0.0
-    
-    img1_blur = gaussian(img1, sigma=1.5)
-    img2_blur = gaussian(img2, sigma=1.5)
-    
-    d_range = img1_blur.max() - img1_blur.min()
-    if d_range == 0: d_range = 1 
-    
-    sim = ssim(img1_blur, img2_blur, data_range=d_range)
-    return max(0.0, 1.0 - sim)
+PARAM_SPACES = load_spaces(PARAM_CONFIG)
 
 def get_base_image(letter_char):
     model = LetterSkeleton(size=(200, 200))
-    params = {k: v['default'] for k, v in PARAM_CONFIG[letter_char].items()}
-    thick = int(params.pop('thickness', 6))
+    space = PARAM_SPACES[letter_char]
+    params, thick = space.draw_args(space.defaults(1)[0])
     DRAW_FUNCS[letter_char](model, **params, thickness=thick)
     return model.apply_morphology(thickness=thick)
 
@@ -79,23 +67,13 @@ def generate_single_heatmap(letter, param1, range1, steps1, param2, range2, step
     base_img = get_base_image(letter)
     model = LetterSkeleton(size=(200, 200))
 
-    # Get defaults
-    default_params = {k: v['default'] for k, v in PARAM_CONFIG[letter].items()}
-    cfg1_default = PARAM_CONFIG[letter][param1]['default']
-    cfg2_default = PARAM_CONFIG[letter][param2]['default']
-
-    for i, y_val in enumerate(y_values):
-        for j, x_val in enumerate(x_values):
-            current_params = default_params.copy()
-
-            # Handle types
-            if isinstance(cfg1_default, int): current_params[param1] = int(round(x_val))
-            else: current_params[param1] = float(x_val)
-                
-            if isinstance(cfg2_default, int): current_params[param2] = int(round(y_val))
-            else: current_params[param2] = float(y_val)
-            
-            thick = int(current_params.pop('thickness', 6))
+    # Rows follow param2 (Y axis), columns param1 (X axis)
+    space = PARAM_SPACES[letter]
+    grid = space.grid(param1, x_values, param2, y_values)
+
+    for i in range(steps2):
+        for j in range(steps1):
+            current_params, thick = space.draw_args(grid[i, j])
             
             model.clear()
             DRAW_FUNCS[letter](model, **current_params, thickness=thick)
@@ -0,0 +1,138 @@
+import sys
+import os
+import json
+import time
+import cv2
+import numpy as np
+
+# --- PATH CONFIGURATION ---
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+from src.cli import get_cli_option
+from src.param_config import load_param_config
+from src.sampling import SAMPLING_METHODS, sample_space, letter_seed
+from src.words import GlyphAtlas, WordCompositor, WordScorer
+from src.montage import build_montage, save_image
+
+# =========================
+# Word dataset (multi-letter canvases)
+# =========================
+# Usage:
+#   python Run_Project/generate_words.py [--words FAX,CAB] [--samples 200] [--variants 20]
+#                                        [--spacing 12] [--spacing-jitter 8] [--width W]
+#                                        [--sampling sobol] [--seed 0]
+#
+# Every letter gets a pool of --variants deformations (sampled over its whole
+# parameter box). Each word sample picks one variant per letter and a random
+# spacing per gap, is composed from the glyph atlas (src/words.py) and scored
+# against the undeformed word with the default spacing. Glyphs are rendered
+# once per distinct deformation and reused by every word and sample that
+# contains them; the atlas hit rate is printed at the end.
+#
+# Output: OUTPUT_WORDS/<word>/<word>_0000.png (raw masks), a contact sheet
+# SUMMARY_<word>.png and OUTPUT_WORDS/words_summary.json.
+
+OUTPUT_DIR = os.path.join(parent_dir, "OUTPUT_WORDS")
+SHEET_SAMPLES = 24
+
+def letter_variants(atlas, letters, n_variants, method, seed):
+    """Pool of n_variants parameter dicts per letter."""
+    pools = {}
+    for letter in letters:
+        space = atlas.spaces[letter]
+        samples = sample_space(space, n_variants, method=method, seed=letter_seed(seed, letter))
+        pools[letter] = space.to_dicts(samples)
+    return pools
+
+def canvas_width(word, spacing, jitter, size, margin):
+    """Canvas width that fits the word with every variant and spacing."""
+    return len(word) * size[1] + max(len(word) - 1, 0) * (spacing + jitter) + 2 * margin
+
+def generate_word(word, compositor, pools, n_samples, spacing, jitter, width, rng, root_dir):
+    """Composes, scores and saves n_samples deformed versions of one word."""
+    scorer = WordScorer(compositor, word, width)
+    word_dir = os.path.join(root_dir, word)
+    os.makedirs(word_dir, exist_ok=True)
+    cv2.imwrite(os.path.join(word_dir, f"{word}_base.png"), scorer.reference)
+
+    records, sheet_images, sheet_labels, sheet_scores = [], [], [], []
+    for i in range(n_samples):
+        choice = [int(rng.integers(len(pools[letter]))) for letter in word]
+        params = [pools[letter][k] for letter, k in zip(word, choice)]
+        gaps = [int(g) for g in spacing + rng.integers(-jitter, jitter + 1, size=len(word) - 1)]
+        img = scorer.compose(params, gaps)
+        score = scorer.workspace.distance(img)
+
+        filename = f"{word}_{i:04d}.png"
+        if not cv2.imwrite(os.path.join(word_dir, filename), img):
+            raise IOError(f"Could not write image: {filename}")
+        records.append({
+            "word": word,
+            "filename": filename,
+            "filepath": os.path.join(word, filename),
+            "score_dist": float(f"{score:.4f}"),
+            "spacing": gaps,
+            "letters": [{"letter": letter, "variant": k, "parameters": p}
+                        for letter, k, p in zip(word, choice, params)],
+        })
+        if i < SHEET_SAMPLES:
+            sheet_images.append(img.copy())
+            sheet_labels.append(f"Dist: {score:.2f}\nGaps: {', '.join(map(str, gaps))}")
+            sheet_scores.append(score)
+
+    sheet = build_montage(sheet_images, sheet_labels, sheet_scores, title=f"Word: {word}", cols=4)
+    save_image(os.path.join(word_dir, f"SUMMARY_{word}.png"), sheet)
+    return records
+
+def main():
+    words = get_cli_option('--words', 'FAX,CAB').upper().split(',')
+    n_samples = get_cli_option('--samples', 200, int)
+    n_variants = get_cli_option('--variants', 20, int)
+    spacing = get_cli_option('--spacing', 12, int)
+    jitter = get_cli_option('--spacing-jitter', 8, int)
+    method = get_cli_option('--sampling', 'sobol')
+    seed = get_cli_option('--seed', 0, int)
+    if method not in SAMPLING_METHODS:
+        print(f"❌ Unknown sampling method '{method}' (choose from {', '.join(SAMPLING_METHODS)})")
+        return
+
+    config = load_param_config()
+    letters = sorted(set("".join(words)))
+    unknown = [l for l in letters if l not in config]
+    if unknown:
+        print(f"❌ No drawing for letter(s) {', '.join(unknown)} (available: {', '.join(config)})")
+        return
+
+    atlas = GlyphAtlas(config)
+    compositor = WordCompositor(atlas, spacing=spacing)
+    pools = letter_variants(atlas, letters, n_variants, method, seed)
+    rng = np.random.default_rng(seed)
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+    print(f"🚀 Composing {n_samples} samples of {', '.join(words)} "
+          f"({n_variants} variants per letter, spacing {spacing}±{jitter})...")
+    t0 = time.perf_counter()
+    records = []
+    for word in words:
+        width = get_cli_option('--width', canvas_width(word, spacing, jitter, atlas.size,
+                                                       compositor.margin), int)
+        word_records = generate_word(word, compositor, pools, n_samples, spacing, jitter,
+                                     width, rng, OUTPUT_DIR)
+        scores = [r["score_dist"] for r in word_records]
+        print(f"   {word}: {len(word_records)} samples, mean distance {np.mean(scores):.3f}")
+        records.extend(word_records)
+
+    with open(os.path.join(OUTPUT_DIR, "words_summary.json"), 'w') as f:
+        json.dump(records, f, indent=4)
+
+    letters_placed = sum(len(r["word"]) for r in records)
+    print(f"\n📊 {atlas.report()}")
+    print(f"   {letters_placed} letters placed with {atlas.misses} rasterizations "
+          f"in {time.perf_counter() - t0:.1f}s")
+    print(f"✅ Word dataset saved to: {OUTPUT_DIR}")
+
+if __name__ == "__main__":
+    main()
@@ -12,18 +12,25 @@ if parent_dir not in sys.path:
     sys.path.append(parent_dir)
 # --- PATH CONFIGURATION END ---
 
+from src.cli import get_cli_option
 from src.letter_model import LetterSkeleton
 from src.base_letters import CanonicalLetters
+from src.alignment import align_to
 
 # Central analysis directory for similarity matrices
 OUTPUT_DIR = os.path.join(parent_dir, "analysis", "inter_letter")
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-def get_similarity(img1, img2):
+def get_similarity(img1, img2, align=False, max_shift=None):
     """
     Calculates the Structural Similarity Index (SSIM) between two letter images.
     Range: 0.0 to 1.0 (1.0 means identical).
+    With align=True, img2 is first moved onto img1 by the shift that best
+    overlaps them (FFT cross-correlation, see src/alignment.py), so letters
+    drawn off-centre are not penalised for the translation.
     """
+    if align:
+        img2, _ = align_to(img1, img2, max_shift=max_shift)
     d_range = img1.max() - img1.min()
     if d_range == 0: d_range = 1.0
     return ssim(img1, img2, data_range=d_range)
@@ -52,12 +59,13 @@ def create_base_letters():
         
     return letters
 
-def run_matrix_analysis():
+def run_matrix_analysis(align=False, max_shift=None):
     """
     Performs a cross-comparison between all letters to create a similarity matrix.
     Saves the resulting heatmap to the analysis folder.
+    align=True compares the letters after removing their relative translation.
     """
-    print("🚀 Running Inter-letter Similarity Analysis...")
+    print("🚀 Running Inter-letter Similarity Analysis" + (" (shift-aligned)..." if align else "..."))
     
     base_letters = create_base_letters()
     char_list = list(base_letters.keys())
@@ -67,14 +75,16 @@ def run_matrix_analysis():
     # Nested loops to compare every letter with every other letter
     for i, char1 in enumerate(char_list):
         for j, char2 in enumerate(char_list):
-            matrix[i, j] = get_similarity(base_letters[char1], base_letters[char2])
+            matrix[i, j] = get_similarity(base_letters[char1], base_letters[char2],
+                                          align=align, max_shift=max_shift)
 
     # Visualization using Matplotlib
     fig, ax = plt.subplots(figsize=(10, 8))
     # Using 'RdYlGn' colormap (Red for different, Green for similar)
     im = ax.imshow(matrix, cmap='RdYlGn', vmin=0, vmax=1)
     
-    ax.set_title("Inter-letter Similarity Matrix (SSIM)", fontsize=14, fontweight='bold')
+    title = "Inter-letter Similarity Matrix (SSIM, shift-aligned)" if align else "Inter-letter Similarity Matrix (SSIM)"
+    ax.set_title(title, fontsize=14, fontweight='bold')
     ax.set_xticks(range(n))
     ax.set_yticks(range(n))
     ax.set_xticklabels(char_list)
@@ -89,11 +99,12 @@ def run_matrix_analysis():
     plt.colorbar(im, label='SSIM Score (1.0 = Perfect Match)')
     
     # Saving the output to the dedicated analysis folder
-    save_path = os.path.join(OUTPUT_DIR, "similarity_matrix.png")
+    save_path = os.path.join(OUTPUT_DIR, "similarity_matrix_aligned.png" if align else "similarity_matrix.png")
     plt.savefig(save_path, dpi=150, bbox_inches='tight')
     plt.close()
     
     print(f"✅ Inter-letter similarity matrix saved to: {save_path}")
 
 if __name__ == "__main__":
-    run_matrix_analysis()
\ No newline at end of file
+    # --align: remove the relative translation first (--max-shift N pixels, default 50)
+    run_matrix_analysis(align='--align' in sys.argv, max_shift=get_cli_option('--max-shift', None, int))
\ No newline at end of file
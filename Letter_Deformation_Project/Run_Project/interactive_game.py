@@ -14,13 +14,13 @@ CONFIG_PATH = os.path.join(parent_dir, 'param_config.json')
 
 import matplotlib.pyplot as plt
 from matplotlib.widgets import Slider, Button, RadioButtons
-from skimage.metrics import structural_similarity as ssim
-from skimage.filters import gaussian
 import numpy as np
 import json
 
 from src.letter_model import LetterSkeleton
 from src.base_letters import CanonicalLetters
+from src.param_space import load_spaces
+from src.metrics import calculate_distance
 
 # ==========================================
 #  Define global colors and styles
@@ -68,7 +68,8 @@ PARAM_LABELS = {
 def load_params_from_json(filepath):
     """
     Loads parameters from JSON and converts them to the list format 
-    expected by the GUI: (key, min, max, default, label)
+    expected by the GUI: (key, min, max, default, label).
+    Also returns the ParameterSpace of every letter (int / float dtypes).
     """
     if not os.path.exists(filepath):
         print(f"❌ Error: Config file '{filepath}' not found!")
@@ -89,10 +90,10 @@ def load_params_from_json(filepath):
         gui_params[letter] = letter_list
         
     print("✅ Loaded parameters from JSON successfully.")
-    return gui_params
+    return gui_params, load_spaces(config)
 
 # Load the parameters dynamically using the absolute path
-PARAMS = load_params_from_json(CONFIG_PATH)
+PARAMS, PARAM_SPACES = load_params_from_json(CONFIG_PATH)
 
 DRAW_FUNCS = {
     'A': CanonicalLetters.draw_A,
@@ -117,29 +118,11 @@ score_text_obj = None
 # 3. Helper Functions
 # ==========================================
 
-def calculate_distance(img1, img2):
-    """
-    Calculates distance using Gaussian Blur + SSIM.
-    This matches the logic used in 'generate_dataset.py'.
-    """
-    if img1.shape != img2.shape: return 0.0
-    
-    # Apply Gaussian blur to soften edges (Tolerance for thickness)
-    img1_blur = gaussian(img1, sigma=1.5)
-    img2_blur = gaussian(img2, sigma=1.5)
-    
-    d_range = img1_blur.max() - img1_blur.min()
-    if d_range == 0: d_range = 1
-    
-    similarity = ssim(img1_blur, img2_blur, data_range=d_range)
-    return max(0, 1.0 - similarity)
-
 def generate_base_image():
     global base_image
-    # Extract defaults from the loaded JSON structure
-    defaults = {p[0]: p[3] for p in PARAMS[current_letter]}
-    
-    thick = int(defaults.pop('thickness', 6))
+    # Defaults from the loaded JSON structure
+    space = PARAM_SPACES[current_letter]
+    defaults, thick = space.draw_args(space.defaults(1)[0])
     DRAW_FUNCS[current_letter](model, **defaults, thickness=thick)
     base_image = model.apply_morphology(thickness=thick)
 
@@ -197,15 +180,10 @@ def update_image(val=None):
         slider = sliders[i]
         param_info = PARAMS[current_letter][i]
         name = param_info[0] # The technical name
-        val = slider.val
-        
-        # Round integers if necessary (heuristic based on name)
-        if 'factor' not in name and 'squash' not in name and 'ratio' not in name and 'depth' not in name and 'height' not in name:
-            val = int(val)
-        current_params[name] = val
+        # Round integers (dtype declared in param_config.json)
+        current_params[name] = PARAM_SPACES[current_letter].cast(name, slider.val)
     
     thick = int(current_params.pop('thickness', 6))
-    if isinstance(thick, float): thick = int(thick)
     
     DRAW_FUNCS[current_letter](model, **current_params, thickness=thick)
     img = model.apply_morphology(thickness=thick)
@@ -233,12 +211,14 @@ def create_sliders():
         ax.clear()
         if i < len(letter_params):
             name, p_min, p_max, p_default, label = letter_params[i]
+            # Integer parameters snap to whole values
+            step = 1 if PARAM_SPACES[current_letter].is_int(name) else None
 
             try:
-                s = Slider(ax, label, p_min, p_max, valinit=p_default, 
+                s = Slider(ax, label, p_min, p_max, valinit=p_default, valstep=step,
                            color=COLORS['accent'], track_color=COLORS['panel'])
             except TypeError:
-                s = Slider(ax, label, p_min, p_max, valinit=p_default, 
+                s = Slider(ax, label, p_min, p_max, valinit=p_default, valstep=step,
                            color=COLORS['accent'])
 
             s.label.set_color(COLORS['text'])
@@ -0,0 +1,141 @@
+import sys
+import os
+import time
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+# --- PATH CONFIGURATION ---
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+from src.cli import get_cli_option
+from src.param_config import load_param_config
+from src.param_space import load_spaces
+from src.sampling import SAMPLING_METHODS, sample_space, letter_seed
+from src.letter_model import LetterSkeleton
+from src.base_letters import render_letter
+from src.bitmask import PackedMasks, METRICS
+
+# =========================
+# All-pairs mask confusion (bit-packed masks)
+# =========================
+# Usage:
+#   python Run_Project/mask_confusion.py [--samples 500] [--sampling sobol] [--seed 0]
+#                                        [--metric iou] [--save-masks]
+#
+# Renders --samples random deformations per letter as binary masks
+# (LetterSkeleton(binary=True)), stores them bit-packed (src/bitmask.py) and
+# compares every mask with every other one using popcounts, in tiles that are
+# reduced on the fly (PackedMasks.reduce_pairs: no N x N matrix). For each mask the
+# most similar mask of the whole set decides its predicted letter, giving a
+# nearest-neighbour confusion matrix; the second panel is the mean overlap
+# between the masks of each pair of letters. This is a cheap first pass: the
+# pairs it flags can be re-scored with SSIM.
+
+OUTPUT_DIR = os.path.join(parent_dir, "analysis", "inter_letter")
+MASK_SIZE = (200, 200)
+
+def render_masks(config, n_samples, method, seed):
+    """Samples and renders n_samples binary masks per letter into one PackedMasks."""
+    spaces = load_spaces(config)
+    model = LetterSkeleton(size=MASK_SIZE, binary=True)
+    store = PackedMasks(MASK_SIZE, capacity=n_samples * len(spaces))
+    labels = []
+    mask = np.empty(MASK_SIZE, dtype=np.uint8)
+    for letter, space in spaces.items():
+        samples = sample_space(space, n_samples, method=method, seed=letter_seed(seed, letter))
+        for row in samples:
+            render_letter(model, letter, space.to_dict(row), out=mask)
+            store.append(mask)
+            labels.append(letter)
+    return store, np.array(labels)
+
+def confusion_matrices(store, labels, letters, metric='iou'):
+    """
+    Nearest-neighbour confusion (rows: true letter, columns: letter of the
+    closest other mask, as fractions) and mean score between letter groups.
+    """
+    n = len(letters)
+    index = np.searchsorted(letters, labels)
+    nearest, _, sums, counts = store.reduce_pairs(index, metric=metric)
+    confusion = np.zeros((n, n))
+    np.add.at(confusion, (index, index[nearest]), 1)
+    confusion /= confusion.sum(axis=1, keepdims=True)
+
+    with np.errstate(invalid='ignore'):
+        mean = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+    return confusion, mean
+
+def plot_matrices(confusion, mean, letters, metric, n_samples, save_path):
+    fig, axes = plt.subplots(1, 2, figsize=(16, 7))
+    panels = [(confusion, "Nearest-neighbour confusion", "Fraction of masks", (0, 1)),
+              (mean, f"Mean {metric.upper()} between letters", metric.upper(), (None, None))]
+    for ax, (matrix, title, label, (vmin, vmax)) in zip(axes, panels):
+        im = ax.imshow(matrix, cmap='viridis', vmin=vmin, vmax=vmax)
+        ax.set_title(title, fontsize=13, fontweight='bold')
+        ax.set_xticks(range(len(letters)))
+        ax.set_yticks(range(len(letters)))
+        ax.set_xticklabels(letters)
+        ax.set_yticklabels(letters)
+        ax.set_xlabel("Nearest letter" if matrix is confusion else "Letter")
+        ax.set_ylabel("Letter")
+        fmt = '{:.2f}' if metric != 'xor' or matrix is confusion else '{:.0f}'
+        for i in range(len(letters)):
+            for j in range(len(letters)):
+                ax.text(j, i, fmt.format(matrix[i, j]), ha='center', va='center',
+                        fontweight='bold', color='white' if matrix[i, j] < np.nanmean(matrix) else 'black')
+        plt.colorbar(im, ax=ax, label=label, fraction=0.046)
+    fig.suptitle(f"Mask confusion ({metric.upper()}, {n_samples} samples per letter)",
+                 fontsize=15, fontweight='bold')
+    plt.savefig(save_path, dpi=150, bbox_inches='tight')
+    plt.close()
+
+def main():
+    n_samples = get_cli_option('--samples', 500, int)
+    method = get_cli_option('--sampling', 'sobol')
+    seed = get_cli_option('--seed', 0, int)
+    metric = get_cli_option('--metric', 'iou')
+    if method not in SAMPLING_METHODS:
+        print(f"❌ Unknown sampling method '{method}' (choose from {', '.join(SAMPLING_METHODS)})")
+        return
+    if metric not in METRICS:
+        print(f"❌ Unknown metric '{metric}' (choose from {', '.join(METRICS)})")
+        return
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+    config = load_param_config()
+    print(f"🚀 Rendering {n_samples} binary masks per letter ({method} sampling)...")
+    t0 = time.perf_counter()
+    store, labels = render_masks(config, n_samples, method, seed)
+    t_render = time.perf_counter() - t0
+
+    n = len(store)
+    dense = n * store.pixels
+    print(f"📦 {n} masks: {store.nbytes / 1e6:.1f} MB packed "
+          f"(uint8 images: {dense / 1e6:.1f} MB, float64: {dense * 8 / 1e6:.1f} MB)")
+
+    letters = np.array(sorted(set(labels)))
+    t0 = time.perf_counter()
+    confusion, mean = confusion_matrices(store, labels, letters, metric)
+    t_pairs = time.perf_counter() - t0
+    print(f"⚡ {n * n:,} mask pairs compared in {t_pairs:.2f}s (rendering took {t_render:.2f}s)")
+    save_path = os.path.join(OUTPUT_DIR, f"mask_confusion_{metric}.png")
+    plot_matrices(confusion, mean, list(letters), metric, n_samples, save_path)
+
+    if '--save-masks' in sys.argv:
+        masks_path = os.path.join(OUTPUT_DIR, "packed_masks.npz")
+        store.save(masks_path)
+        np.save(os.path.join(OUTPUT_DIR, "packed_masks_labels.npy"), labels)
+        print(f"💾 Packed masks saved to: {masks_path}")
+
+    print("\nNearest-neighbour accuracy per letter:")
+    for i, letter in enumerate(letters):
+        print(f"   {letter}: {confusion[i, i]:.1%}")
+    print(f"✅ Mask confusion saved to: {save_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+import sys
+import os
+import json
+import time
+
+# --- PATH CONFIGURATION ---
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+# The tool scripts are imported as modules from here
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+import cv2
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+
+from src.cli import get_cli_option
+from src.param_config import load_param_config, STANDARD_SWEEPS, STANDARD_HEATMAP_PAIRS
+from src.render_pass import RenderPass, RenderSink
+from src.dedup import DedupStore
+from src.montage import BACKGROUND, FONT, TITLE_HEIGHT, draw_tile, draw_title, score_color, tile_shape
+from src.png_stream import PNGStreamWriter
+import generate_dataset as gd
+import analyze_parameter as ap
+
+# =========================
+# One render pass for the dataset and the reports
+# =========================
+# Usage:
+#   python Run_Project/report_pass.py [--steps 10] [--only dataset,matrix,plots,heatmaps]
+#                                     [--recompute] [--dedup] [--local-ssim]
+#
+# Produces the outputs of generate_dataset.py (images, contact sheets,
+# dataset_summary.json), the full matrices (every deformation family of a
+# letter as one row), the standard 1D reports and the standard heatmaps from
+# a single src.render_pass.RenderPass: every distinct parameter set is
+# rendered and scored once and handed to each output that uses it. The
+# dataset families and the matrix rows are the same grid, so the matrices
+# cost no extra renders. 1D sweeps and heatmaps still valid in the sweep
+# cache are only re-plotted (--recompute renders them again). --local-ssim
+# scores only around the pixels that differ from the base image (see
+# src/metrics.py, same scores to ~1e-13).
+
+CONFIG_PATH = os.path.join(parent_dir, 'param_config.json')
+DATASET_DIR = os.path.join(parent_dir, "OUTPUT_DATASET")
+MATRIX_DIR = os.path.join(parent_dir, "analysis", "full_matrices")
+OUTPUTS = ('dataset', 'matrix', 'plots', 'heatmaps')
+
+def split_rows(rows, sizes):
+    """Splits a concatenated list back into consecutive parts of the given sizes."""
+    parts, start = [], 0
+    for size in sizes:
+        parts.append(rows[start:start + size])
+        start += size
+    return parts
+
+# =========================
+# Sinks
+# =========================
+
+class DatasetSink(RenderSink):
+    """OUTPUT_DATASET as written by generate_dataset.py <steps> (see generate_family)."""
+    name = "dataset"
+
+    def __init__(self, root_dir, steps, dedup=None):
+        self.root_dir = root_dir
+        self.steps = steps
+        self.dedup = dedup
+        self.records = []
+
+    def request(self, letter, space):
+        self.combos = gd.get_all_combinations(list(space.names))
+        return np.concatenate([space.defaults(1)] + [gd.family_rows(letter, combo, self.steps)
+                                                     for combo in self.combos])
+
+    def consume(self, letter, rows, images, scores, digests):
+        letter_dir = os.path.join(self.root_dir, letter)
+        os.makedirs(letter_dir, exist_ok=True)
+        rel_path = gd.store_image(images[0], digests[0], f"Base {letter}", 0.0, self.root_dir,
+                                  gd.base_rel_path(letter), self.dedup)
+        self.records.append(gd.base_record(letter, images[0], rel_path))
+
+        parts = zip(*(split_rows(x[1:], [self.steps] * len(self.combos)) for x in (images, scores, digests)))
+        for combo, (family_images, family_scores, family_digests) in zip(self.combos, parts):
+            os.makedirs(os.path.join(letter_dir, f"deformation_{gd.family_name(combo)}"), exist_ok=True)
+            tasks = gd.family_tasks(letter, combo, self.steps)
+            for task, img, score, digest in zip(tasks, family_images, family_scores, family_digests):
+                rel_path = gd.store_image(img, digest, gd.task_title(task, score), score, self.root_dir,
+                                          task["rel_path"], self.dedup)
+                self.records.append(gd.task_record(task, digest, score, rel_path))
+            gd.save_family_summary(self.root_dir, letter, combo, family_images, tasks, family_scores)
+        print(f"   ✅ dataset: {letter} ({len(self.combos)} families)")
+
+    def finish(self):
+        json_output_path = os.path.join(self.root_dir, "dataset_summary.json")
+        with open(json_output_path, 'w') as f:
+            json.dump(self.records, f, indent=4)
+        print(f"💾 Saved {len(self.records)} records to {json_output_path}")
+        gd.save_results_table(self.root_dir, self.records)
+
+
+class MatrixSink(RenderSink):
+    """
+    FULL_MATRIX_<L>_SCORED.png: one row per deformation family, one column
+    per step (the dataset grid), streamed to PNG one row at a time.
+    """
+    name = "matrix"
+    TILE_SCALE = 0.8    # rendered 200x200 letters are shrunk to 160x160 tiles
+    LABEL_LINES = 3     # "Dist" + up to two lines of parameter values
+    NAME_SCALE = 0.45
+    GAP = 4
+
+    def __init__(self, output_dir, steps):
+        self.output_dir = output_dir
+        self.steps = steps
+
+    def request(self, letter, space):
+        self.combos = gd.get_all_combinations(list(space.names))
+        return np.concatenate([gd.family_rows(letter, combo, self.steps) for combo in self.combos])
+
+    @staticmethod
+    def cell_label(task, score):
+        """'Dist' line plus the parameter values, folded into at most two lines."""
+        info = task["label"].split("\n")
+        if len(info) > 2:
+            mid = len(info) // 2
+            info = [",".join(info[:mid]), ",".join(info[mid:])]
+        return [f"Dist: {score:.2f}"] + info
+
+    def consume(self, letter, rows, images, scores, digests):
+        gap = self.GAP
+        names = [" + ".join(gd.PARAM_SHORT_NAMES.get(k, k) for k in combo) for combo in self.combos]
+        img_size = int(round(images[0].shape[0] * self.TILE_SCALE))
+        tile_h, tile_w = tile_shape((img_size, img_size), self.LABEL_LINES)
+        name_w = max(cv2.getTextSize(n, FONT, self.NAME_SCALE, 1)[0][0] for n in names) + 3 * gap
+        width = name_w + self.steps * (tile_w + gap) + gap
+        strip_h = tile_h + gap
+        height = TITLE_HEIGHT + len(self.combos) * strip_h + gap
+
+        strip = np.empty((strip_h, width, 3), dtype=np.uint8)
+        tile = np.empty((tile_h, tile_w, 3), dtype=np.uint8)
+        os.makedirs(self.output_dir, exist_ok=True)
+        filename = os.path.join(self.output_dir, f"FULL_MATRIX_{letter}_SCORED.png")
+
+        with PNGStreamWriter(filename, width, height, bgr=True) as png:
+            title = np.empty((TITLE_HEIGHT, width, 3), dtype=np.uint8)
+            png.write_rows(draw_title(title, f"Letter {letter}: Analysis (Value & Distance Score)"))
+
+            parts = zip(*(split_rows(x, [self.steps] * len(self.combos)) for x in (images, scores)))
+            for combo, name, (family_images, family_scores) in zip(self.combos, names, parts):
+                strip[...] = BACKGROUND
+                (text_w, text_h), _ = cv2.getTextSize(name, FONT, self.NAME_SCALE, 1)
+                cv2.putText(strip, name, (name_w - 2 * gap - text_w, gap + (tile_h + text_h) // 2),
+                            FONT, self.NAME_SCALE, (0, 0, 0), 1, cv2.LINE_AA)
+                tasks = gd.family_tasks(letter, combo, self.steps)
+                for col, (task, img, score) in enumerate(zip(tasks, family_images, family_scores)):
+                    small = cv2.resize(img, (img_size, img_size), interpolation=cv2.INTER_AREA)
+                    draw_tile(tile, small, self.cell_label(task, score), score_color(score))
+                    x = name_w + col * (tile_w + gap)
+                    strip[gap:, x:x + tile_w] = tile
+                png.write_rows(strip)
+
+            png.write_rows(np.full((gap, width, 3), BACKGROUND, dtype=np.uint8))
+        print(f"   ✅ matrix: {filename}")
+
+
+class SweepSink(RenderSink):
+    """Standard 1D reports (analyze_parameter.py --batch), stored in its sweep cache."""
+    name = "plots"
+
+    def __init__(self, recompute=False):
+        self.recompute = recompute
+
+    def request(self, letter, space):
+        self.pending = []
+        for letter_, param, start, end, steps in STANDARD_SWEEPS:
+            if letter_ != letter or param not in space:
+                continue
+            name = ap.sweep_name(letter, param, start, end, steps)
+            key = ap.sweep_hash(letter, param, start, end, steps)
+            if not self.recompute and ap.SWEEP_STORE.load(name, key) is not None:
+                continue
+            self.pending.append((param, start, end, steps, key, np.linspace(start, end, steps)))
+        if not self.pending:
+            return None
+        return np.concatenate([space.sweep(param, values) for param, *_, values in self.pending])
+
+    def consume(self, letter, rows, images, scores, digests):
+        sizes = [len(values) for *_, values in self.pending]
+        for (param, start, end, steps, key, values), sweep_images, sweep_scores in \
+                zip(self.pending, split_rows(images, sizes), split_rows(scores, sizes)):
+            arrays, metadata = ap.sweep_result(letter, param, start, end, steps, values, sweep_images, sweep_scores)
+            ap.SWEEP_STORE.save(ap.sweep_name(letter, param, start, end, steps), key, arrays, metadata)
+
+    def finish(self):
+        # Every report is drawn from the sweep cache (fresh or still valid)
+        for letter, param, start, end, steps in STANDARD_SWEEPS:
+            stored = ap.SWEEP_STORE.load(ap.sweep_name(letter, param, start, end, steps),
+                                         ap.sweep_hash(letter, param, start, end, steps))
+            if stored is not None:
+                ap.plot_sweep(*stored, save_prefix="report_")
+
+
+class HeatmapSink(RenderSink):
+    """Standard heatmaps (analyze_heatmap.py --batch), stored in its sweep cache."""
+    name = "heatmaps"
+    STEPS = 10
+
+    def __init__(self, tool, recompute=False):
+        self.ah = tool
+        self.recompute = recompute
+
+    def request(self, letter, space):
+        self.pending = []
+        for letter_, param1, param2 in STANDARD_HEATMAP_PAIRS:
+            if letter_ != letter or param1 not in space or param2 not in space:
+                continue
+            name = self.ah.heatmap_name(letter, param1, param2, self.STEPS)
+            key = self.ah.heatmap_hash(letter, param1, param2, self.STEPS)
+            if not self.recompute and self.ah.SWEEP_STORE.load(name, key) is not None:
+                continue
+            x_values, y_values = self.ah.heatmap_axes(letter, param1, param2, self.STEPS)
+            self.pending.append((param1, param2, name, key, x_values, y_values))
+        if not self.pending:
+            return None
+        # Grid rows follow param2 (Y axis), columns param1 (X axis), as in compute_heatmap
+        return np.concatenate([space.grid(p1, x, p2, y).reshape(-1) for p1, p2, _, _, x, y in self.pending])
+
+    def consume(self, letter, rows, images, scores, digests):
+        sizes = [len(x) * len(y) for *_, x, y in self.pending]
+        for (param1, param2, name, key, x_values, y_values), grid_scores in \
+                zip(self.pending, split_rows(scores, sizes)):
+            heatmap_data = np.array(grid_scores, dtype=np.float64).reshape(len(y_values), len(x_values))
+            arrays, metadata = self.ah.heatmap_result(letter, param1, param2, self.STEPS,
+                                                      x_values, y_values, heatmap_data)
+            self.ah.SWEEP_STORE.save(name, key, arrays, metadata)
+
+    def finish(self):
+        for letter, param1, param2 in STANDARD_HEATMAP_PAIRS:
+            stored = self.ah.SWEEP_STORE.load(self.ah.heatmap_name(letter, param1, param2, self.STEPS),
+                                              self.ah.heatmap_hash(letter, param1, param2, self.STEPS))
+            if stored is not None:
+                self.ah.plot_heatmap(*stored)
+
+# =========================
+# Main
+# =========================
+
+def build_sinks(outputs, steps, recompute=False, dedup=False):
+    sinks = []
+    if 'dataset' in outputs:
+        os.makedirs(DATASET_DIR, exist_ok=True)
+        sinks.append(DatasetSink(DATASET_DIR, steps, DedupStore(DATASET_DIR) if dedup else None))
+    if 'matrix' in outputs:
+        sinks.append(MatrixSink(MATRIX_DIR, steps))
+    if 'plots' in outputs:
+        sinks.append(SweepSink(recompute))
+    if 'heatmaps' in outputs:
+        try:
+            import analyze_heatmap
+            sinks.append(HeatmapSink(analyze_heatmap, recompute))
+        except ImportError as e:
+            print(f"⚠️  Skipping heatmaps: {e}")
+    return sinks
+
+def main():
+    steps = get_cli_option('--steps', 10, int)
+    outputs = get_cli_option('--only', ",".join(OUTPUTS)).split(',')
+    unknown = [o for o in outputs if o not in OUTPUTS]
+    if unknown:
+        print(f"❌ Error: Unknown outputs {unknown}. Choose from {', '.join(OUTPUTS)}")
+        sys.exit(1)
+
+    config = load_param_config(CONFIG_PATH)
+    gd.PARAM_CONFIG = config
+    sinks = build_sinks(outputs, steps, recompute='--recompute' in sys.argv, dedup='--dedup' in sys.argv)
+
+    print(f"\n🧮 Render pass for {', '.join(s.name for s in sinks)} ({steps} steps)\n")
+    start = time.perf_counter()
+    render_pass = RenderPass(config, sinks, local='--local-ssim' in sys.argv)
+    render_pass.run(letters=[l for l in gd.DRAW_FUNCS if l in config])
+
+    print(f"\n⏱️  Done in {time.perf_counter() - start:.1f}s, renders per letter:")
+    print(render_pass.report())
+
+if __name__ == "__main__":
+    main()
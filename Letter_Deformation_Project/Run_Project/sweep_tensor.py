@@ -0,0 +1,186 @@
+import sys
+import os
+import time
+from collections import OrderedDict
+
+# --- PATH CONFIGURATION ---
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+from src.cli import get_cli_option
+from src.letter_model import LetterSkeleton
+from src.base_letters import render_letter
+from src.param_config import load_param_config
+from src.param_space import ParameterSpace
+import src.canonical
+import src.metrics
+from src.metrics import DistanceWorkspace
+from src.sweep_store import input_hash, render_code
+from src.tensor_store import TensorStore, axes_from_config
+from src.canonical import canonical_keys, collapse_equivalent
+
+# =========================
+# N-D joint parameter sweep -> chunked tensor store
+# =========================
+# Usage:
+#   python Run_Project/sweep_tensor.py B width_factor rotation_deg vertical_squash \
+#          --steps 12 --workers 4 [--chunk 4] [--plot rotation_deg,vertical_squash]
+# Chunks are --chunk points along every axis (the unit of parallel work).
+# Re-running resumes: only chunks that are not on disk yet are computed.
+# The store header keeps an input hash (letter config, draw / render code,
+# metric); when it changed, the old chunks are dropped and recomputed.
+# --plot draws a 2-D cross-section (other axes at their defaults).
+# Grid points with the same canonical form (src/canonical.py) draw identical
+# masks, so only one of them is rendered and scored.
+
+OUTPUT_DIR = os.path.join(parent_dir, "analysis", "tensors")
+
+# (letter, canonical form bytes) -> score, kept per process across chunks so
+# equivalent parameter sets are only rendered once per worker. Bounded: the
+# least recently used scores are dropped beyond SCORE_CACHE_SIZE entries.
+SCORE_CACHE_SIZE = 100_000
+_SCORE_CACHE = OrderedDict()
+
+def chunk_params(store, chunk_id, space):
+    """
+    Parameter sets of every grid point of a chunk (C order) as a flat
+    structured array of the letter's ParameterSpace, plus the chunk shape.
+    """
+    chunk_axes = store.chunk_axes(chunk_id)
+    shape = tuple(len(values) for _, values in chunk_axes)
+    points = space.defaults(shape)
+    for axis, (name, values) in enumerate(chunk_axes):
+        # Broadcast the axis values along their own dimension
+        points[name] = space.cast(name, values).reshape([-1 if a == axis else 1 for a in range(len(shape))])
+    return points.reshape(-1), shape
+
+def compute_chunk(store, chunk_id):
+    """Distances for every grid point of one chunk (runs in worker processes)."""
+    letter = store.metadata["letter"]
+    space = ParameterSpace(load_param_config()[letter], letter=letter)
+    model = LetterSkeleton(size=(200, 200))
+    base_img = render_letter(model, letter, space.to_dict(space.defaults(1)[0])).copy()
+
+    # Every sample renders into the same mask and is scored in preallocated buffers
+    scorer = DistanceWorkspace(base_img.shape)
+    scorer.set_reference(base_img)
+    mask = np.empty_like(base_img)
+
+    points, shape = chunk_params(store, chunk_id, space)
+    keys = [(letter, row.tobytes()) for row in canonical_keys(letter, points)]
+    out = np.empty(len(points), dtype=store.dtype)
+    for i, (row, key) in enumerate(zip(points, keys)):
+        score = _SCORE_CACHE.get(key)
+        if score is None:
+            score = scorer.distance(render_letter(model, letter, space.to_dict(row), out=mask))
+            _SCORE_CACHE[key] = score
+            if len(_SCORE_CACHE) > SCORE_CACHE_SIZE:
+                _SCORE_CACHE.popitem(last=False)
+        else:
+            _SCORE_CACHE.move_to_end(key)
+        out[i] = score
+    return out.reshape(shape)
+
+def tensor_hash(letter, config):
+    """Input hash of every chunk: letter config (ranges and defaults of unswept params), metric and code."""
+    spec = {"kind": "nd", "letter": letter, "config": config, "metric": "blur+ssim"}
+    return input_hash(spec, code=render_code(letter) + (src.metrics, src.canonical, compute_chunk))
+
+def count_distinct(store, space, limit=2_000_000):
+    """(distinct renders, grid points) over the whole tensor, or None if it is too large to check."""
+    size = int(np.prod(store.shape))
+    if size > limit:
+        return None
+    points = np.concatenate([chunk_params(store, cid, space)[0] for cid in store.chunk_ids()])
+    reps, _ = collapse_equivalent(store.metadata["letter"], points)
+    return len(reps), size
+
+def plot_section(store, x_name, y_name, config):
+    """Saves a 2-D cross-section (remaining axes fixed at their defaults)."""
+    fixed = {name: config[name]['default'] for name in store.axis_names if name not in (x_name, y_name)}
+    data, free = store.section(fixed)
+    # Image rows follow the y axis
+    if [name for name, _ in free] == [x_name, y_name]:
+        data = data.T
+    x_values = dict(free)[x_name]
+    y_values = dict(free)[y_name]
+
+    fig, ax = plt.subplots(figsize=(9, 7))
+    im = ax.imshow(data, origin='lower', cmap='coolwarm', vmin=0, vmax=1, aspect='auto',
+                   extent=(x_values[0], x_values[-1], y_values[0], y_values[-1]))
+    fig.colorbar(im, ax=ax, label="Distance (1 - SSIM)")
+    fixed_txt = ", ".join(f"{k}={v}" for k, v in fixed.items())
+    ax.set_title(f"{store.metadata['letter']}: {x_name} vs {y_name}\n({fixed_txt})", fontsize=12, fontweight='bold')
+    ax.set_xlabel(x_name)
+    ax.set_ylabel(y_name)
+
+    path = os.path.join(store.path, f"section_{x_name}_{y_name}.png")
+    fig.savefig(path, bbox_inches='tight', dpi=100)
+    plt.close(fig)
+    print(f"🖼️  Saved cross-section: {path}")
+
+USAGE = "Usage: sweep_tensor.py LETTER PARAM [PARAM ...] [--steps N] [--workers N] [--chunk N] [--plot X,Y]"
+
+def main():
+    options = ('--steps', '--workers', '--chunk', '--plot')
+    args = [a for i, a in enumerate(sys.argv[1:], 1)
+            if not a.startswith('--') and sys.argv[i - 1] not in options]
+    if len(args) < 2:
+        print(USAGE)
+        sys.exit(1)
+
+    letter, params = args[0].upper(), args[1:]
+    config = load_param_config()
+    if letter not in config:
+        print(f"❌ Error: Unknown letter '{letter}'")
+        sys.exit(1)
+    unknown = [p for p in params if p not in config[letter]]
+    if unknown:
+        print(f"❌ Error: Unknown parameters {unknown}. Available: {list(config[letter].keys())}")
+        sys.exit(1)
+
+    # The cross-section axes must be two of the swept parameters (checked before computing)
+    plot = get_cli_option('--plot')
+    if plot:
+        plot_axes = plot.split(',')
+        if len(plot_axes) != 2 or plot_axes[0] == plot_axes[1] or any(a not in params for a in plot_axes):
+            print(f"❌ Error: --plot needs two different swept parameters X,Y (swept: {params}), got '{plot}'")
+            print(USAGE)
+            sys.exit(1)
+
+    steps = get_cli_option('--steps', 10, int)
+    workers = get_cli_option('--workers', 0, int)
+    chunk = get_cli_option('--chunk', 4, int)
+
+    path = os.path.join(OUTPUT_DIR, f"{letter}_{'_'.join(params)}_{steps}")
+    try:
+        store = TensorStore.create(path, axes_from_config(config[letter], params, steps),
+                                   chunks=(chunk,) * len(params), metadata={"letter": letter, "metric": "blur+ssim"},
+                                   input_hash=tensor_hash(letter, config[letter]))
+    except ValueError as e:
+        print(f"❌ Error: {e} (other --chunk or parameter range). Remove it to recompute with this layout.")
+        sys.exit(1)
+    missing = store.missing_chunks()
+    distinct = count_distinct(store, ParameterSpace(config[letter], letter=letter))
+    if distinct:
+        print(f"\n♻️  {distinct[0]} distinct renders for {distinct[1]} grid points "
+              f"({distinct[1] / distinct[0]:.2f}x fewer after canonicalization)")
+    print(f"\n🧊 Tensor {store.shape} in {len(store.chunk_ids())} chunks of {store.chunks}, "
+          f"{len(missing)} to compute ({workers or 'no'} workers)")
+
+    start = time.perf_counter()
+    store.fill(compute_chunk, chunk_ids=missing, num_workers=workers)
+    print(f"✅ Done in {time.perf_counter() - start:.1f}s -> {path}")
+
+    if plot:
+        plot_section(store, *plot_axes, config[letter])
+
+if __name__ == "__main__":
+    main()
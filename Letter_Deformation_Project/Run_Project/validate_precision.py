@@ -0,0 +1,111 @@
+import sys
+import os
+import time
+
+# --- PATH CONFIGURATION ---
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+import numpy as np
+
+from src.letter_model import LetterSkeleton
+from src.base_letters import render_letter
+from src.param_config import load_param_config, STANDARD_SWEEPS, STANDARD_HEATMAP_PAIRS
+from src.param_space import ParameterSpace, load_spaces
+from src.metrics import calculate_distance, blur_image, ssim_distance
+from src.fused_kernels import dilate_blur, KernelWorkspace
+
+# =========================
+# Validation: float32 vs float64 scoring
+# =========================
+# Re-scores the standard batch sweeps (1D reports + heatmaps) in both
+# precisions and reports how far the float32 scores move.
+# Usage: python Run_Project/validate_precision.py [heatmap_steps]
+
+OUTPUT_DIR = os.path.join(parent_dir, "analysis")
+REPORT_PATH = os.path.join(OUTPUT_DIR, "precision_report.txt")
+
+def band(score):
+    return 0 if score < 0.25 else 1 if score < 0.5 else 2
+
+def sweep_cases(config, heatmap_steps):
+    """Yields (name, letter, list of parameter dicts) for every standard sweep."""
+    spaces = load_spaces(config)
+    for letter, param, start, end, steps in STANDARD_SWEEPS:
+        space = spaces[letter]
+        yield f"1D  {letter}: {param}", letter, space.to_dicts(space.sweep(param, np.linspace(start, end, steps)))
+
+    for letter, p1, p2 in STANDARD_HEATMAP_PAIRS:
+        cfg, space = config[letter], spaces[letter]
+        grid = space.grid(p1, np.linspace(cfg[p1]['min'], cfg[p1]['max'], heatmap_steps),
+                          p2, np.linspace(cfg[p2]['min'], cfg[p2]['max'], heatmap_steps))
+        yield f"2D  {letter}: {p1} x {p2}", letter, space.to_dicts(grid)
+
+def main():
+    heatmap_steps = int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else 10
+    config = load_param_config()
+    model = LetterSkeleton(size=(200, 200))
+    ws32 = KernelWorkspace((200, 200), dtype=np.float32)
+    out32 = np.empty((200, 200), dtype=np.float32)
+
+    lines = [f"float32 vs float64 distance scores (standard batch sweeps, heatmaps {heatmap_steps}x{heatmap_steps})", ""]
+    header = f"{'sweep':<40}{'n':>5}{'max |Δ|':>11}{'mean |Δ|':>11}{'fused max |Δ|':>15}{'2dp flips':>11}{'band flips':>12}"
+    lines += [header, "-" * len(header)]
+    print("\n🔬 " + lines[0] + "\n")
+    print(header)
+
+    all_diffs, all_fused, flips, band_flips, total = [], [], 0, 0, 0
+    t64 = t32 = 0.0
+    for name, letter, points in sweep_cases(config, heatmap_steps):
+        space = ParameterSpace(config[letter], letter=letter)
+        base = render_letter(model, letter, space.to_dict(space.defaults(1)[0])).copy()
+        base32 = blur_image(base, precision='float32')
+        images, canvases = [], []
+        for p in points:
+            images.append(render_letter(model, letter, p).copy())
+            canvases.append((model.canvas.copy(), int(p['thickness'])))
+
+        start = time.perf_counter()
+        s64 = np.array([calculate_distance(base, img, precision='float64') for img in images])
+        t64 += time.perf_counter() - start
+        start = time.perf_counter()
+        s32 = np.array([calculate_distance(base, img, precision='float32') for img in images])
+        t32 += time.perf_counter() - start
+        # Fused kernel with a float32 workspace
+        fused = np.array([ssim_distance(base32, dilate_blur(c, t, out=out32, workspace=ws32), precision='float32')
+                          for c, t in canvases])
+
+        diff = np.abs(s32 - s64)
+        fdiff = np.abs(fused - s64)
+        n_flips = int(np.sum(np.round(s32, 2) != np.round(s64, 2)))
+        n_band = sum(band(a) != band(b) for a, b in zip(s32, s64))
+        all_diffs.append(diff); all_fused.append(fdiff)
+        flips += n_flips; band_flips += n_band; total += len(points)
+
+        row = f"{name:<40}{len(points):>5}{diff.max():>11.2e}{diff.mean():>11.2e}{fdiff.max():>15.2e}{n_flips:>11}{n_band:>12}"
+        lines.append(row)
+        print(row)
+
+    all_diffs = np.concatenate(all_diffs)
+    all_fused = np.concatenate(all_fused)
+    summary = [
+        "",
+        f"Scores compared:            {total}",
+        f"Max |Δ| (float32 skimage):  {all_diffs.max():.3e}",
+        f"Max |Δ| (float32 fused):    {all_fused.max():.3e}",
+        f"Two-decimal label changes:  {flips}  (values sitting on a rounding boundary)",
+        f"Colour band changes:        {band_flips}",
+        f"Time float64 / float32:     {t64 / total * 1e3:.2f} / {t32 / total * 1e3:.2f} ms per score",
+    ]
+    lines += summary
+    print("\n".join(summary))
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    with open(REPORT_PATH, 'w') as f:
+        f.write("\n".join(lines) + "\n")
+    print(f"\n✅ Report saved: {REPORT_PATH}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,354 @@
+import sys
+import os
+import json
+import time
+import importlib
+import traceback
+
+# --- PATH CONFIGURATION ---
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+# The tool scripts are imported as modules from here
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+import matplotlib
+matplotlib.use('Agg')
+
+import src.letter_model
+import src.metrics
+import src.dedup
+import src.montage
+import src.results_table
+import src.base_letters
+import src.param_config
+import src.param_space
+import src.sampling
+import src.alignment
+from src.cli import get_cli_option
+from src.sweep_store import input_hash, render_code
+
+# =========================
+# Watch mode: rebuild only what a change affects
+# =========================
+# Usage:
+#   python Run_Project/watch.py [--steps 10] [--interval 1] [--only dataset,plots,heatmaps,inter] [--once]
+#
+# Every output has a fingerprint of exactly the inputs it is built from:
+#   dataset/<L>/base         render code of <L> + the letter's defaults
+#   dataset/<L>/<p1+p2..>    ... + the config entries of the active params + steps
+#   plots/<L>/<param>        render code of <L> + defaults + the standard sweep
+#   heatmaps/<L>/<p1+p2>     render code of <L> + defaults + both config entries
+#   inter/matrix             render code of every letter
+# plus the metric (src.metrics), the modules that decide what a group writes
+# (OUTPUT_MODULES) and the tool script that builds it. The render code is
+# src.sweep_store.render_code: the draw function with the CanonicalLetters
+# helpers it calls, letter_model and param_space (int rounding).
+# When a watched file changes, the modules are reloaded and only outputs with a
+# new fingerprint are rebuilt. Base images and distances stay in memory between
+# rebuilds, so masks that were seen before are not scored again.
+# Fingerprints of built outputs persist in STATE_PATH, so a restart is incremental too.
+
+STATE_PATH = os.path.join(parent_dir, "analysis", "watch_state.json")
+CONFIG_PATH = os.path.join(parent_dir, "param_config.json")
+DATASET_DIR = os.path.join(parent_dir, "OUTPUT_DATASET")
+
+ENGINE_MODULES = ('src.letter_model', 'src.metrics')
+# Output formats (and score reuse) per group, part of its fingerprints
+OUTPUT_MODULES = {
+    'dataset': ('src.dedup', 'src.montage', 'src.results_table'),
+    'plots': ('src.dedup',),
+    'heatmaps': ('src.dedup',),
+    'inter': ('src.alignment',),
+}
+# Reloaded in dependency order before the tool scripts
+SRC_MODULES = ('src.letter_model', 'src.metrics', 'src.alignment', 'src.dedup', 'src.montage',
+               'src.results_table', 'src.param_config', 'src.param_space', 'src.sampling',
+               'src.base_letters')
+TOOL_SCRIPTS = {
+    'dataset': 'generate_dataset',
+    'plots': 'analyze_parameter',
+    'heatmaps': 'analyze_heatmap',
+    'inter': 'inter_letter_analysis',
+}
+
+WATCHED_FILES = [CONFIG_PATH] + \
+    [os.path.join(parent_dir, *name.split('.')) + ".py" for name in SRC_MODULES] + \
+    [os.path.join(current_dir, f"{name}.py") for name in TOOL_SCRIPTS.values()]
+
+def snapshot():
+    """Modification times of every watched file."""
+    return {path: os.stat(path).st_mtime_ns for path in WATCHED_FILES if os.path.exists(path)}
+
+def dataset_key(record):
+    """Output id of a dataset_summary.json record (None for sampled records)."""
+    if record["type"] == "base":
+        return f"dataset/{record['letter']}/base"
+    if record["type"] == "deformation":
+        return f"dataset/{record['letter']}/{'+'.join(record['active_params'])}"
+    return None
+
+# =========================
+# Warm cache
+# =========================
+
+class WarmCache:
+    """DistanceCaches kept across rebuilds, one per (letter, base mask)."""
+    def __init__(self):
+        self.caches = {}
+
+    def clear(self):
+        self.caches.clear()
+
+    def distances(self, letter, base_img):
+        key = (letter, src.dedup.mask_digest(base_img))
+        if key not in self.caches:
+            self.caches[key] = src.dedup.DistanceCache(base_img, src.metrics.calculate_distance)
+        return self.caches[key]
+
+    def stats(self):
+        """(distinct masks scored, duplicate lookups) over all caches."""
+        return (sum(len(c.scores) for c in self.caches.values()),
+                sum(c.hits for c in self.caches.values()))
+
+# =========================
+# Watcher
+# =========================
+
+class Watcher:
+    def __init__(self, steps, groups):
+        self.steps = steps
+        self.groups = groups
+        self.warm = WarmCache()
+        self.tools = {}
+        self.engine_hash = None
+        self.config = {}
+        self.state = {}
+        if os.path.exists(STATE_PATH):
+            with open(STATE_PATH, 'r') as f:
+                self.state = json.load(f)
+        self.records = self._load_records()
+
+    def _load_records(self):
+        # Dataset records per output, seeded from the last generated summary
+        records = {}
+        summary_path = os.path.join(DATASET_DIR, "dataset_summary.json")
+        if os.path.exists(summary_path):
+            with open(summary_path, 'r') as f:
+                for record in json.load(f):
+                    key = dataset_key(record)
+                    if key is not None:
+                        records.setdefault(key, []).append(record)
+        return records
+
+    def _save_state(self):
+        os.makedirs(os.path.dirname(STATE_PATH), exist_ok=True)
+        with open(STATE_PATH + ".tmp", 'w') as f:
+            json.dump(self.state, f, indent=2, sort_keys=True)
+        os.replace(STATE_PATH + ".tmp", STATE_PATH)
+
+    # --- Loading ---
+
+    def reload(self):
+        """Re-imports src modules and tool scripts so edits take effect."""
+        for name in SRC_MODULES:
+            importlib.reload(sys.modules[name])
+        for group in self.groups:
+            name = TOOL_SCRIPTS[group]
+            try:
+                self.tools[group] = importlib.reload(sys.modules[name]) if name in sys.modules \
+                    else importlib.import_module(name)
+            except ImportError as e:
+                if group in self.tools or name in sys.modules:
+                    raise
+                print(f"⚠️  Skipping {group}: {e}")
+        self.groups = [g for g in self.groups if g in self.tools]
+
+        self.config = src.param_config.load_param_config(CONFIG_PATH)
+        if 'dataset' in self.tools:
+            self.tools['dataset'].PARAM_CONFIG = self.config
+
+        # Scores are only valid for the rendering / metric code they came from
+        engine_hash = input_hash({}, code=tuple(sys.modules[name] for name in ENGINE_MODULES))
+        if engine_hash != self.engine_hash:
+            self.warm.clear()
+            self.engine_hash = engine_hash
+
+    # --- Planning ---
+
+    def plan(self):
+        """[(output id, fingerprint, build function)] for every output of the current config."""
+        outputs = []
+        letters = [l for l in src.base_letters.DRAW_FUNCS if l in self.config]
+
+        def fingerprint(group, spec, code):
+            formats = tuple(sys.modules[name] for name in OUTPUT_MODULES[group])
+            return input_hash(spec, code=code + (src.metrics, self.tools[group]) + formats)
+
+        if 'dataset' in self.groups:
+            gd = self.tools['dataset']
+            for letter in letters:
+                cfg = self.config[letter]
+                defaults = {k: [v['default'], v.get('dtype')] for k, v in cfg.items()}
+                outputs.append((f"dataset/{letter}/base",
+                                fingerprint('dataset', {"defaults": defaults}, render_code(letter)),
+                                lambda l=letter: self.build_base(l)))
+                for combo in gd.get_all_combinations(list(cfg.keys())):
+                    spec = {"defaults": defaults, "active": {p: cfg[p] for p in combo}, "steps": self.steps}
+                    outputs.append((f"dataset/{letter}/{'+'.join(combo)}",
+                                    fingerprint('dataset', spec, render_code(letter)),
+                                    lambda l=letter, c=combo: self.build_family(l, c)))
+
+        if 'plots' in self.groups:
+            for letter, param, start, end, steps in src.param_config.STANDARD_SWEEPS:
+                if letter not in letters or param not in self.config[letter]:
+                    continue
+                defaults = {k: [v['default'], v.get('dtype')] for k, v in self.config[letter].items()}
+                spec = {"defaults": defaults, "sweep": [param, start, end, steps]}
+                outputs.append((f"plots/{letter}/{param}", fingerprint('plots', spec, render_code(letter)),
+                                lambda s=(letter, param, start, end, steps): self.build_plot(*s)))
+
+        if 'heatmaps' in self.groups:
+            for letter, param1, param2 in src.param_config.STANDARD_HEATMAP_PAIRS:
+                cfg = self.config.get(letter, {})
+                if letter not in letters or param1 not in cfg or param2 not in cfg:
+                    continue
+                defaults = {k: [v['default'], v.get('dtype')] for k, v in cfg.items()}
+                spec = {"defaults": defaults, param1: cfg[param1], param2: cfg[param2]}
+                outputs.append((f"heatmaps/{letter}/{param1}+{param2}",
+                                fingerprint('heatmaps', spec, render_code(letter)),
+                                lambda s=(letter, param1, param2): self.build_heatmap(*s)))
+
+        if 'inter' in self.groups:
+            # Shared modules (letter_model, param_space) are hashed once
+            code = tuple(dict.fromkeys(fn for letter in src.base_letters.DRAW_FUNCS
+                                       for fn in render_code(letter)))
+            outputs.append(("inter/matrix", fingerprint('inter', {}, code), self.build_inter))
+
+        return outputs
+
+    # --- Builders ---
+
+    def base_image(self, letter):
+        """Base image of a letter under the current config and code (one render, not saved)."""
+        gd = self.tools['dataset']
+        model = src.letter_model.LetterSkeleton(size=(200, 200))
+        return gd.generate_base(letter, gd.DRAW_FUNCS[letter], model, None, save=False)
+
+    def build_base(self, letter):
+        gd = self.tools['dataset']
+        letter_dir = os.path.join(DATASET_DIR, letter)
+        os.makedirs(letter_dir, exist_ok=True)
+        model = src.letter_model.LetterSkeleton(size=(200, 200))
+        _, record = gd.generate_base(letter, gd.DRAW_FUNCS[letter], model, letter_dir, save=True)
+        self.records[f"dataset/{letter}/base"] = [record]
+
+    def build_family(self, letter, combo):
+        gd = self.tools['dataset']
+        base_img, _ = self.base_image(letter)
+        model = src.letter_model.LetterSkeleton(size=(200, 200))
+        self.records[f"dataset/{letter}/{'+'.join(combo)}"] = gd.generate_family(
+            letter, gd.DRAW_FUNCS[letter], model, base_img, DATASET_DIR, combo, self.steps,
+            distances=self.warm.distances(letter, base_img))
+
+    # The watcher's fingerprint has already found these outputs stale, so the
+    # sweep cache is bypassed (its key may not cover what changed)
+
+    def build_plot(self, letter, param, start, end, steps):
+        ap = self.tools['plots']
+        distances = self.warm.distances(letter, ap.get_base_image(letter))
+        ap.run_analysis(letter, param, start, end, steps, save_prefix="report_", recompute=True,
+                        distances=distances)
+
+    def build_heatmap(self, letter, param1, param2):
+        ah = self.tools['heatmaps']
+        distances = self.warm.distances(letter, ah.get_base_image(letter))
+        ah.generate_heatmap(letter, param1, param2, steps=10, recompute=True, distances=distances)
+
+    def build_inter(self):
+        self.tools['inter'].run_matrix_analysis()
+
+    def save_dataset_summary(self, outputs):
+        """Rewrites dataset_summary.json and the columnar table in generation order."""
+        gd = self.tools['dataset']
+        dataset_metadata = [record for output_id, _, _ in outputs if output_id.startswith("dataset/")
+                            for record in self.records.get(output_id, [])]
+        json_output_path = os.path.join(DATASET_DIR, "dataset_summary.json")
+        with open(json_output_path, 'w') as f:
+            json.dump(dataset_metadata, f, indent=4)
+        print(f"💾 Saved {len(dataset_metadata)} records to {json_output_path}")
+        gd.save_results_table(DATASET_DIR, dataset_metadata)
+
+    # --- One pass ---
+
+    def rebuild(self):
+        """Reloads, rebuilds every output whose fingerprint changed. Returns the number rebuilt."""
+        start = time.perf_counter()
+        self.reload()
+        outputs = self.plan()
+        current = {output_id for output_id, _, _ in outputs}
+
+        dirty = [(output_id, fp, build) for output_id, fp, build in outputs
+                 if self.state.get(output_id) != fp
+                 or (output_id.startswith("dataset/") and output_id not in self.records)]
+        # Outputs that no longer exist (e.g. a parameter was removed from the config)
+        removed = [output_id for output_id in self.state if output_id not in current
+                   and output_id.split('/')[0] in self.groups]
+
+        if not dirty and not removed:
+            print("✅ Everything is up to date.")
+            return 0
+
+        print(f"\n🔁 {len(dirty)} of {len(outputs)} outputs to rebuild")
+        for output_id, fp, build in dirty:
+            print(f"   -> {output_id}")
+            build()
+            self.state[output_id] = fp
+            self._save_state()
+        for output_id in removed:
+            del self.state[output_id]
+            self.records.pop(output_id, None)
+        self._save_state()
+
+        if any(output_id.startswith("dataset/") for output_id, _, _ in dirty) or \
+                any(output_id.startswith("dataset/") for output_id in removed):
+            self.save_dataset_summary(outputs)
+
+        scored, reused = self.warm.stats()
+        print(f"✅ Rebuilt {len(dirty)} outputs in {time.perf_counter() - start:.1f}s "
+              f"(warm cache: {scored} distinct masks scored, {reused} reused)")
+        return len(dirty)
+
+def main():
+    steps = get_cli_option('--steps', 10, int)
+    interval = get_cli_option('--interval', 1.0, float)
+    groups = get_cli_option('--only', ",".join(TOOL_SCRIPTS)).split(',')
+    unknown = [g for g in groups if g not in TOOL_SCRIPTS]
+    if unknown:
+        print(f"❌ Error: Unknown output groups {unknown}. Choose from {', '.join(TOOL_SCRIPTS)}")
+        sys.exit(1)
+
+    watcher = Watcher(steps, groups)
+    print(f"\n👀 Watching {len(WATCHED_FILES)} files ({', '.join(groups)}, {steps} steps)")
+
+    while True:
+        seen = snapshot()
+        try:
+            watcher.rebuild()
+        except Exception:
+            # Typically a half-finished edit: report it and wait for the next save
+            traceback.print_exc()
+            print("❌ Rebuild failed, waiting for the next change...")
+        if '--once' in sys.argv:
+            break
+        try:
+            while snapshot() == seen:
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            print("\n👋 Stopped watching.")
+            break
+
+if __name__ == "__main__":
+    main()
@@ -42,11 +42,9 @@ def run_full_pipeline():
     clear_screen()
     print(f"{Style.HEADER}{Style.BOLD}=== STARTING FULL ANALYSIS PIPELINE ==={Style.END}\n")
     
-    # 1. Generate 1D Distance Graphs
-    run_script("analyze_parameter.py", ["--batch"])
-    
-    # 2. Generate 2D Interaction Heatmaps
-    run_script("analyze_heatmap.py", ["--batch"])
+    # 1 + 2. Generate 1D Distance Graphs and 2D Interaction Heatmaps
+    # (one render pass: shared parameter sets are rendered and scored once)
+    run_script("report_pass.py", ["--only", "plots,heatmaps"])
     
     # 3. Generate Inter-Letter Similarity Matrix
     run_script("inter_letter_analysis.py")
@@ -73,6 +71,7 @@ def main():
         print(f"  {Style.GREEN}3.{Style.END} Parameter Analysis (1D Distortion Graphs)")
         print(f"  {Style.GREEN}4.{Style.END} Heatmap Analysis (2D Parameter Interaction)")
         print(f"  {Style.GREEN}5.{Style.END} Inter-Letter Similarity Matrix")
+        print(f"  {Style.GREEN}6.{Style.END} Dataset + Full Matrices + Reports (single render pass)")
         
         print(f"\n{Style.BOLD}Automation:{Style.END}")
         print(f"  {Style.YELLOW}A.{Style.END} {Style.BOLD}RUN ALL ANALYSIS (Batch Mode){Style.END}")
@@ -87,6 +86,7 @@ def main():
         elif choice == '3': run_script("analyze_parameter.py")
         elif choice == '4': run_script("analyze_heatmap.py")
         elif choice == '5': run_script("inter_letter_analysis.py")
+        elif choice == '6': run_script("report_pass.py")
         elif choice == 'A': run_full_pipeline()
         elif choice == 'Q':
             print(f"\n{Style.BLUE}Goodbye! 👋{Style.END}")
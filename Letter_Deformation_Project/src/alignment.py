@@ -0,0 +1,163 @@
+import numpy as np
+import cv2
+from scipy import fft as sfft
+
+from src.dedup import mask_digest
+from src.metrics import DistanceWorkspace, calculate_distance
+
+# ==========================================
+# Shift-tolerant distance (FFT cross-correlation)
+# ==========================================
+# Part of the distance between two letters is pure translation: shearing A
+# moves CENTER_X by shear_x // 2 and C is centred at x=110 while the other
+# letters are at x=100. Instead of scoring every shift of a search window,
+# the best shift is read off the cross-correlation of the two images,
+# computed with real FFTs:
+#
+#   corr = irfft2(conj(rfft2(reference)) * rfft2(image))
+#   corr[dy, dx] = sum_p reference[p] * image[p + (dy, dx)]
+#
+# Both images are zero-padded by the search radius (max_shift, default a
+# quarter of the canvas), so the correlation is linear and a letter is never
+# matched against a copy of itself wrapped around the border. The image is
+# moved back by the shift at the correlation peak (zero fill) and the aligned
+# pair is scored as usual. The reference spectrum is computed once, so an
+# aligned score costs one forward and one inverse FFT on top of the plain
+# score.
+# subpixel=True refines the peak with a parabola through its neighbours and
+# shifts with bilinear interpolation.
+
+_SPECTRA = {}
+_SPECTRA_SIZE = 64
+
+
+def search_radius(shape, max_shift=None):
+    """Largest shift searched per axis (default: a quarter of the shorter side)."""
+    return min(shape) // 4 if max_shift is None else int(np.ceil(max_shift))
+
+
+def fft_shape(shape, max_shift=None):
+    """Padded FFT size for a linear correlation up to the search radius."""
+    r = search_radius(shape, max_shift)
+    return tuple(sfft.next_fast_len(n + r, real=True) for n in shape)
+
+
+def image_spectrum(img, max_shift=None):
+    """Real 2-D FFT of an image (float64), zero-padded for the search radius."""
+    return sfft.rfft2(img.astype(np.float64, copy=False), s=fft_shape(img.shape, max_shift))
+
+
+def cached_spectrum(img, max_shift=None):
+    """image_spectrum, kept for the last few distinct images (keyed by content)."""
+    key = (mask_digest(img), search_radius(img.shape, max_shift))
+    if key not in _SPECTRA:
+        if len(_SPECTRA) >= _SPECTRA_SIZE:
+            _SPECTRA.pop(next(iter(_SPECTRA)))
+        _SPECTRA[key] = image_spectrum(img, max_shift)
+    return _SPECTRA[key]
+
+
+def _peak_offset(below, peak, above):
+    """Vertex of the parabola through three samples, relative to the middle one."""
+    denom = below - 2.0 * peak + above
+    if denom >= 0:
+        return 0.0
+    return float(np.clip(0.5 * (below - above) / denom, -0.5, 0.5))
+
+
+def find_shift(ref_spectrum, img, max_shift=None, subpixel=False):
+    """
+    Shift (dy, dx) of 'img' relative to the image whose spectrum is given
+    (image_spectrum with the same max_shift): img[p] ~ reference[p - (dy, dx)].
+    Shifts are searched up to max_shift pixels per axis.
+    """
+    r = search_radius(img.shape, max_shift)
+    h, w = fft_shape(img.shape, max_shift)
+    corr = sfft.irfft2(np.conj(ref_spectrum) * image_spectrum(img, max_shift), s=(h, w))
+    # Keep only |dy|, |dx| <= r (negative shifts sit at the end)
+    corr[np.abs(np.fft.fftfreq(h, 1.0 / h)) > r, :] = -np.inf
+    corr[:, np.abs(np.fft.fftfreq(w, 1.0 / w)) > r] = -np.inf
+    py, px = np.unravel_index(np.argmax(corr), corr.shape)
+    dy = py - h if py > h // 2 else py
+    dx = px - w if px > w // 2 else px
+    if not subpixel:
+        return int(dy), int(dx)
+    c = corr[py, px]
+    up, down = corr[(py - 1) % h, px], corr[(py + 1) % h, px]
+    left, right = corr[py, (px - 1) % w], corr[py, (px + 1) % w]
+    oy = _peak_offset(up, c, down) if np.isfinite(up) and np.isfinite(down) else 0.0
+    ox = _peak_offset(left, c, right) if np.isfinite(left) and np.isfinite(right) else 0.0
+    return float(dy + oy), float(dx + ox)
+
+
+def shift_image(img, dy, dx, out=None):
+    """
+    Moves an image by (dy, dx) pixels with zero fill: out[p] = img[p - (dy, dx)].
+    Integer shifts copy pixels exactly; fractional shifts interpolate bilinearly.
+    """
+    if out is None:
+        out = np.empty_like(img)
+    if float(dy).is_integer() and float(dx).is_integer():
+        dy, dx = int(dy), int(dx)
+        h, w = img.shape
+        out.fill(0)
+        if abs(dy) < h and abs(dx) < w:
+            out[max(dy, 0):h + min(dy, 0), max(dx, 0):w + min(dx, 0)] = \
+                img[max(-dy, 0):h + min(-dy, 0), max(-dx, 0):w + min(-dx, 0)]
+        return out
+    M = np.float64([[1, 0, dx], [0, 1, dy]])
+    cv2.warpAffine(img, M, (img.shape[1], img.shape[0]), dst=out, flags=cv2.INTER_LINEAR,
+                   borderMode=cv2.BORDER_CONSTANT, borderValue=0)
+    return out
+
+
+class AlignedDistance:
+    """
+    Translation-invariant distance to one reference image.
+
+        aligned = AlignedDistance(base_img, max_shift=30)
+        score = aligned.distance(img)          # calculate_distance after alignment
+        score, (dy, dx) = aligned.distance_and_shift(img)
+
+    The reference spectrum and SSIM statistics are computed once. Scoring
+    uses a DistanceWorkspace, so the scores of aligned images are exactly
+    those of calculate_distance(reference, aligned_image).
+    """
+    def __init__(self, reference, max_shift=None, subpixel=False, precision=None):
+        self.reference = reference
+        self.max_shift = max_shift
+        self.subpixel = subpixel
+        self.spectrum = image_spectrum(reference, max_shift)
+        self.workspace = DistanceWorkspace(reference.shape, precision=precision)
+        self.workspace.set_reference(reference)
+        self.aligned = np.empty_like(reference)
+
+    def shift(self, img):
+        """Shift (dy, dx) of img relative to the reference."""
+        return find_shift(self.spectrum, img, self.max_shift, self.subpixel)
+
+    def align(self, img, out=None):
+        """img moved onto the reference; returns (aligned image, shift)."""
+        dy, dx = self.shift(img)
+        return shift_image(img, -dy, -dx, out=out), (dy, dx)
+
+    def distance_and_shift(self, img):
+        if img.shape != self.reference.shape: return 0.0, (0, 0)
+        aligned, shift = self.align(img, out=self.aligned)
+        return self.workspace.distance(aligned), shift
+
+    def distance(self, img):
+        return self.distance_and_shift(img)[0]
+
+
+def align_to(reference, img, max_shift=None, subpixel=False):
+    """img moved onto 'reference' (spectrum of the reference cached); returns (aligned, shift)."""
+    dy, dx = find_shift(cached_spectrum(reference, max_shift), img, max_shift, subpixel)
+    return shift_image(img, -dy, -dx), (dy, dx)
+
+
+def aligned_distance(img1, img2, max_shift=None, subpixel=False, precision=None, workspace=None):
+    """calculate_distance(img1, img2) after moving img2 onto img1 (see AlignedDistance)."""
+    if img1.shape != img2.shape: return 0.0
+    aligned, _ = align_to(img1, img2, max_shift, subpixel)
+    return calculate_distance(img1, aligned, precision=precision, workspace=workspace)
@@ -245,4 +245,25 @@ class CanonicalLetters:
         skeleton.draw_line(p1, p2, thickness)
         skeleton.draw_line(p2, p3, thickness)
         skeleton.draw_line(p3, p4, thickness)
-        skeleton.draw_line(p4, p5, thickness)
\ No newline at end of file
+        skeleton.draw_line(p4, p5, thickness)
+
+# Letter character -> drawing function, shared by the library modules
+DRAW_FUNCS = {
+    'A': CanonicalLetters.draw_A,
+    'B': CanonicalLetters.draw_B,
+    'C': CanonicalLetters.draw_C,
+    'F': CanonicalLetters.draw_F,
+    'X': CanonicalLetters.draw_X,
+    'W': CanonicalLetters.draw_W,
+}
+
+
+def render_letter(skeleton, letter, params, out=None):
+    """
+    Draws a letter with a full parameter dict (including 'thickness')
+    and returns the thickened image (written into 'out' when given).
+    """
+    params = dict(params)
+    thick = int(params.pop('thickness', 6))
+    DRAW_FUNCS[letter](skeleton, **params, thickness=thick)
+    return skeleton.apply_morphology(thickness=thick, out=out)
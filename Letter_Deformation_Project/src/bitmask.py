@@ -0,0 +1,268 @@
+import numpy as np
+
+# ==========================================
+# Bit-packed binary masks
+# ==========================================
+# A thickened letter is a binary mask: 200x200 pixels fit in 5000 bytes when
+# stored one bit per pixel (8x less than the uint8 image, 64x less than a
+# float64 one). Masks are packed row-major with np.packbits and padded to
+# whole uint64 words, so overlap counts between masks are an AND / XOR of
+# words followed by a popcount:
+#
+#   |a & b| = popcount(a & b)          |a | b| = |a| + |b| - |a & b|
+#   |a ^ b| = |a| + |b| - 2 |a & b|
+#
+# These metrics are a cheap first pass next to SSIM (e.g. all-pairs
+# confusion over many thousands of masks); they ignore anti-aliasing, so
+# masks are rendered with LetterSkeleton(binary=True) or thresholded at > 0.
+#
+# PackedMasks.pairwise returns the full N x N matrix. For large N,
+# PackedMasks.reduce_pairs walks the same comparisons in tiles and keeps only
+# per-mask nearest neighbours and per-group sums, so its memory is
+# O(N + tile^2) instead of O(N^2).
+
+# NumPy >= 2.0 has a vectorized popcount; older versions use a byte table
+HAS_BITWISE_COUNT = hasattr(np, 'bitwise_count')
+_BYTE_COUNTS = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+METRICS = ('iou', 'dice', 'hamming', 'xor')
+# Metrics where larger means more alike (the others are distances)
+SIMILARITIES = ('iou', 'dice')
+
+
+def popcount(words):
+    """Number of set bits over the last axis of a uint64 array (int64)."""
+    words = np.ascontiguousarray(words, dtype=np.uint64)
+    if HAS_BITWISE_COUNT:
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+    counts = _BYTE_COUNTS[words.view(np.uint8)]
+    return counts.reshape(words.shape[:-1] + (-1,)).sum(axis=-1, dtype=np.int64)
+
+
+def n_words(shape):
+    """uint64 words per packed mask of the given (H, W) shape."""
+    return -(-int(np.prod(shape)) // 64)
+
+
+def pack_masks(masks):
+    """
+    Packs one (H, W) mask or a stack (N, H, W) into uint64 words, one bit per
+    pixel (pixel set where the mask is > 0). Returns (n_words,) or (N, n_words).
+    """
+    masks = np.asarray(masks)
+    single = masks.ndim == 2
+    flat = masks.reshape(1 if single else len(masks), -1)
+    words = n_words(masks.shape[-2:])
+    packed = np.zeros((len(flat), words * 8), dtype=np.uint8)
+    bits = np.packbits(flat > 0, axis=1)
+    packed[:, :bits.shape[1]] = bits
+    packed = packed.view(np.uint64)
+    return packed[0] if single else packed
+
+
+def unpack_masks(words, shape):
+    """Inverse of pack_masks: uint8 masks (0 / 255) of the given (H, W) shape."""
+    words = np.asarray(words, dtype=np.uint64)
+    single = words.ndim == 1
+    words = words.reshape(1 if single else len(words), -1)
+    size = int(np.prod(shape))
+    bits = np.unpackbits(words.view(np.uint8), axis=1, count=size)
+    masks = (bits * np.uint8(255)).reshape((len(words),) + tuple(shape))
+    return masks[0] if single else masks
+
+
+def overlap_metric(inter, count_a, count_b, pixels, metric='iou'):
+    """
+    Overlap metric from the set-bit counts of two masks and of their AND.
+    'iou' and 'dice' are similarities (1.0 = same mask; two empty masks count
+    as identical), 'hamming' is the fraction of differing pixels and 'xor'
+    the number of differing pixels. Works elementwise on arrays.
+    """
+    inter = np.asarray(inter, dtype=np.int64)
+    total = np.asarray(count_a, dtype=np.int64) + np.asarray(count_b, dtype=np.int64)
+    if metric == 'iou':
+        union = total - inter
+        return np.where(union > 0, inter / np.maximum(union, 1), 1.0)
+    if metric == 'dice':
+        return np.where(total > 0, 2 * inter / np.maximum(total, 1), 1.0)
+    if metric == 'hamming':
+        return (total - 2 * inter) / pixels
+    if metric == 'xor':
+        return total - 2 * inter
+    raise ValueError(f"Unknown mask metric '{metric}' (expected one of {', '.join(METRICS)})")
+
+
+def and_counts(a, b, block=16):
+    """
+    (len(a), len(b)) matrix of |a_i & b_j| for two stacks of packed masks,
+    computed in tiles of block x block masks so the temporary AND words are
+    independent of the number of masks (the result itself is len(a) x len(b)).
+    """
+    inter = np.empty((len(a), len(b)), dtype=np.int64)
+    for i in range(0, len(a), block):
+        rows = a[i:i + block, None, :]
+        for j in range(0, len(b), block):
+            inter[i:i + block, j:j + block] = popcount(rows & b[None, j:j + block, :])
+    return inter
+
+
+def mask_metrics(a, b):
+    """
+    IoU, Dice, Hamming and XOR area of two (H, W) masks, or of two packed
+    masks (then Hamming is relative to all bits of the words).
+    """
+    a, b = np.asarray(a), np.asarray(b)
+    pixels = a.size if a.ndim == 2 else a.size * 64
+    a = pack_masks(a) if a.ndim == 2 else a.astype(np.uint64)
+    b = pack_masks(b) if b.ndim == 2 else b.astype(np.uint64)
+    inter, count_a, count_b = popcount(a & b), popcount(a), popcount(b)
+    return {m: float(overlap_metric(inter, count_a, count_b, pixels, m)) for m in METRICS}
+
+
+class PackedMasks:
+    """
+    Growable store of bit-packed masks of one (H, W) shape.
+
+        store = PackedMasks((200, 200))
+        store.append(mask)                 # or store.extend(stack)
+        iou = store.pairwise(metric='iou') # (N, N)
+
+    'pixels' (H * W) is the denominator of the Hamming distance; the padding
+    bits of the last word are always 0.
+    """
+    def __init__(self, shape, capacity=1024):
+        self.shape = tuple(shape)
+        self.pixels = int(np.prod(self.shape))
+        self.n_words = n_words(self.shape)
+        self.words = np.zeros((max(capacity, 1), self.n_words), dtype=np.uint64)
+        self.counts = np.zeros(max(capacity, 1), dtype=np.int64)
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def nbytes(self):
+        """Bytes used by the stored masks (not counting spare capacity)."""
+        return self.size * self.n_words * 8
+
+    def _reserve(self, n):
+        if n <= len(self.words):
+            return
+        capacity = max(n, 2 * len(self.words))
+        words = np.zeros((capacity, self.n_words), dtype=np.uint64)
+        counts = np.zeros(capacity, dtype=np.int64)
+        words[:self.size] = self.words[:self.size]
+        counts[:self.size] = self.counts[:self.size]
+        self.words, self.counts = words, counts
+
+    def extend(self, masks):
+        """Appends a stack of (H, W) masks; returns the index of the first one."""
+        masks = np.asarray(masks)
+        if masks.shape[1:] != self.shape:
+            raise ValueError(f"Mask shape {masks.shape[1:]} does not match {self.shape}")
+        start = self.size
+        self._reserve(start + len(masks))
+        packed = pack_masks(masks)
+        self.words[start:start + len(masks)] = packed
+        self.counts[start:start + len(masks)] = popcount(packed)
+        self.size += len(masks)
+        return start
+
+    def append(self, mask):
+        """Appends one (H, W) mask; returns its index."""
+        return self.extend(np.asarray(mask)[None])
+
+    def packed(self):
+        return self.words[:self.size]
+
+    def image(self, i):
+        """Mask i as a uint8 (0 / 255) image."""
+        return unpack_masks(self.words[i], self.shape)
+
+    def distance(self, i, mask, metric='iou'):
+        """Metric between stored mask i and an (H, W) mask."""
+        b = pack_masks(mask)
+        inter = popcount(self.words[i] & b)
+        return float(overlap_metric(inter, self.counts[i], popcount(b), self.pixels, metric))
+
+    def take(self, indices):
+        """New store with the masks at 'indices' (in that order)."""
+        indices = np.asarray(indices, dtype=np.int64)
+        store = PackedMasks(self.shape, capacity=len(indices))
+        store.words[:len(indices)] = self.words[:self.size][indices]
+        store.counts[:len(indices)] = self.counts[:self.size][indices]
+        store.size = len(indices)
+        return store
+
+    def pairwise(self, other=None, metric='iou', block=16):
+        """
+        (len(self), len(other)) matrix of 'metric' between all stored masks
+        (other defaults to self), from tiled AND popcounts (see and_counts).
+        The result and the metric's temporaries are dense; for many masks use
+        reduce_pairs.
+        """
+        other = self if other is None else other
+        if other.shape != self.shape:
+            raise ValueError(f"Mask shape {other.shape} does not match {self.shape}")
+        inter = and_counts(self.packed(), other.packed(), block)
+        return overlap_metric(inter, self.counts[:self.size, None], other.counts[None, :other.size],
+                              self.pixels, metric)
+
+    def reduce_pairs(self, groups, metric='iou', tile=1024, block=16):
+        """
+        All-pairs 'metric' between the stored masks, reduced tile by tile
+        without the N x N matrix. groups: group id (0..G-1) of every mask.
+        Returns (nearest, best, sums, counts):
+            nearest, best   most similar other mask of every mask and its score
+                            (argmax for iou / dice, argmin for distances;
+                            ties go to the lowest index, as with pairwise)
+            sums, counts    (G, G) sum and number of scores between the masks
+                            of two groups, a mask with itself excluded
+        """
+        groups = np.asarray(groups, dtype=np.int64)
+        if len(groups) != len(self):
+            raise ValueError(f"Got {len(groups)} group ids for {len(self)} masks")
+        n, n_groups = len(self), int(groups.max()) + 1 if len(groups) else 0
+        similarity = metric in SIMILARITIES
+        worst = -np.inf if similarity else np.inf
+        nearest = np.full(n, -1, dtype=np.int64)
+        best = np.full(n, worst)
+        sums = np.zeros((n_groups, n_groups))
+        onehot = np.eye(n_groups)[groups]
+        words = self.packed()
+
+        for i in range(0, n, tile):
+            rows = slice(i, min(i + tile, n))
+            for j in range(0, n, tile):
+                cols = slice(j, min(j + tile, n))
+                inter = and_counts(words[rows], words[cols], block)
+                scores = overlap_metric(inter, self.counts[rows, None], self.counts[None, cols],
+                                        self.pixels, metric).astype(np.float64, copy=False)
+                if i == j:
+                    np.fill_diagonal(scores, 0.0)
+                sums += onehot[rows].T @ scores @ onehot[cols]
+                if i == j:
+                    np.fill_diagonal(scores, worst)
+                pick = scores.argmax(axis=1) if similarity else scores.argmin(axis=1)
+                value = scores[np.arange(len(pick)), pick]
+                better = value > best[rows] if similarity else value < best[rows]
+                nearest[rows][better] = pick[better] + j
+                best[rows][better] = value[better]
+
+        sizes = np.bincount(groups, minlength=n_groups).astype(np.int64)
+        counts = np.outer(sizes, sizes) - np.diag(sizes)
+        return nearest, best, sums, counts
+
+    def save(self, path):
+        np.savez(path, words=self.packed(), shape=np.array(self.shape))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            words = data['words']
+            store = cls(tuple(data['shape']), capacity=len(words))
+        store.words[:len(words)] = words
+        store.counts[:len(words)] = popcount(words)
+        store.size = len(words)
+        return store
@@ -0,0 +1,73 @@
+import numpy as np
+
+from src.display_list import DisplayList, build_display_list
+from src.geometry import compute_geometry
+
+# ==========================================
+# Parameter canonicalization
+# ==========================================
+# Many parameter sets draw exactly the same thing: int() truncation and '//'
+# in the draw_* functions, clamps (crossbar limits, 5/195 shear bounds),
+# top_width=0 dropping the top bar, and the rounding LetterSkeleton / OpenCV
+# apply to every primitive. The canonical form of a parameter set is its
+# display list quantized the way it will be rasterized:
+#   line / ellipse coordinates  int(round(v))      (LetterSkeleton)
+#   ellipse angles              cvRound            (OpenCV, half to even)
+#   polyline vertices           int32 truncation   (np.array(points, np.int32))
+#   thickness                   int
+# Python's round() and np.round are half-to-even too, so two parameter sets
+# with the same canonical form give pixel-identical masks and only one of
+# them has to be rendered and scored.
+
+
+def quantize_primitive(primitive):
+    """A primitive with the values the rasterizer will actually use."""
+    kind = primitive[0]
+    if kind == 'line':
+        return ('line', *(int(round(v)) for v in primitive[1:5]), int(primitive[5]))
+    if kind == 'arc':
+        return ('arc', *(int(round(v)) for v in primitive[1:8]), int(primitive[8]))
+    return ('polyline', tuple((int(x), int(y)) for x, y in primitive[1]), int(primitive[2]))
+
+
+def canonical_form(letter, params, size=(200, 200)):
+    """
+    Canonical, hashable form of a full parameter dict (including 'thickness'):
+    the quantized DisplayList. Equal forms render to identical masks.
+    """
+    dl = build_display_list(letter, params, size)
+    return DisplayList(letter, size, [quantize_primitive(p) for p in dl.primitives], dl.thickness)
+
+
+def canonical_keys(letter, params):
+    """
+    Vectorized canonicalization for a batch (list of dicts or dict of
+    sequences), via src.geometry. Returns an (N, K) int64 array with one
+    row per parameter set; equal rows mean identical renders.
+    """
+    geometry = compute_geometry(letter, params)
+    n = len(geometry)
+    lines = np.round(geometry.lines).astype(np.int64)
+    # Skipped lines (e.g. top_width=0) must not depend on their coordinates
+    lines = np.where(geometry.line_mask[..., None], lines, np.iinfo(np.int64).min)
+    arcs = np.round(geometry.arcs).astype(np.int64)
+    return np.concatenate([lines.reshape(n, -1), arcs.reshape(n, -1),
+                           geometry.thickness.reshape(n, 1)], axis=1)
+
+
+def collapse_equivalent(letter, params):
+    """
+    Groups equivalent parameter sets. Returns (representatives, inverse):
+    representatives are indices of one parameter set per distinct canonical
+    form (first occurrence, in order), and params[i] renders like
+    params[representatives[inverse[i]]].
+    """
+    keys = canonical_keys(letter, params)
+    if len(keys) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    _, first, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+    # Renumber groups by first occurrence so representatives keep the input order
+    order = np.argsort(first)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return first[order], rank[inverse.reshape(-1)]
@@ -0,0 +1,16 @@
+import sys
+
+# ==========================================
+# Command line options of the Run_Project scripts
+# ==========================================
+# The tools take flags as '--name value' pairs anywhere on the command line,
+# e.g. "generate_dataset.py --sampling sobol --samples 500".
+
+
+def get_cli_option(name, default=None, cast=str):
+    """Returns the value following '--name' on the command line, cast with 'cast' (default if absent)."""
+    if name in sys.argv:
+        idx = sys.argv.index(name)
+        if idx + 1 < len(sys.argv):
+            return cast(sys.argv[idx + 1])
+    return default
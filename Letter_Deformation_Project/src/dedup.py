@@ -0,0 +1,91 @@
+import os
+import hashlib
+import threading
+import cv2
+
+# ==========================================
+# Content-hash deduplication
+# ==========================================
+# int() truncation, rounding and coordinate clamps in the letter drawings map
+# many parameter sets to the same pixels. Rendered masks are identified by a
+# digest of their bytes, so each distinct image is scored once and (with
+# --dedup) stored once, under unique/<first two hex digits>/<digest>.png.
+
+
+def mask_digest(img):
+    """Content hash (hex) of a rendered mask: shape, dtype and pixel bytes."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{img.shape}{img.dtype.str}".encode())
+    h.update(img.tobytes())
+    return h.hexdigest()
+
+
+def encode_mask(img):
+    """PNG bytes of a mask (what cv2.imwrite would store)."""
+    ok, data = cv2.imencode(".png", img)
+    if not ok:
+        raise IOError("Could not encode image as PNG")
+    return data.tobytes()
+
+
+class DistanceCache:
+    """Distance to one base image, computed once per distinct mask."""
+    def __init__(self, base_img, distance_fn):
+        self.base_img = base_img
+        self.distance_fn = distance_fn
+        self.scores = {}
+        self.hits = 0
+
+    def distance(self, img, digest=None):
+        digest = digest or mask_digest(img)
+        if digest in self.scores:
+            self.hits += 1
+        else:
+            self.scores[digest] = self.distance_fn(self.base_img, img)
+        return self.scores[digest]
+
+
+class DedupStore:
+    """Content-addressed image folder shared by every record with the same pixels."""
+    def __init__(self, root_dir, subdir="unique"):
+        self.root_dir = root_dir
+        self.subdir = subdir
+        self.added = 0
+        self.reused = 0
+
+    def rel_path(self, digest):
+        return os.path.join(self.subdir, digest[:2], f"{digest}.png")
+
+    def contains(self, digest):
+        return os.path.exists(os.path.join(self.root_dir, self.rel_path(digest)))
+
+    def add(self, img, digest=None):
+        """
+        Stores the mask unless an identical one exists (also from other shards).
+        Returns (relative path, digest).
+        """
+        digest = digest or mask_digest(img)
+        if self.contains(digest):
+            self.reused += 1
+            return self.rel_path(digest), digest
+        return self.add_encoded(digest, encode_mask(img))
+
+    def add_encoded(self, digest, data):
+        """
+        add() for a mask already encoded as PNG bytes (e.g. by a pipeline
+        stage); data=None means the caller found the digest already stored.
+        """
+        rel_path = self.rel_path(digest)
+        full_path = os.path.join(self.root_dir, rel_path)
+        if data is None or os.path.exists(full_path):
+            self.reused += 1
+            return rel_path, digest
+
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        # Temp file + rename: concurrent writers of the same digest never leave a partial PNG
+        tmp_path = f"{full_path}.{os.getpid()}.{threading.get_ident()}.tmp.png"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, full_path)
+        self.added += 1
+        return rel_path, digest
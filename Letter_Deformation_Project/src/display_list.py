@@ -0,0 +1,190 @@
+import json
+import math
+from functools import lru_cache
+import numpy as np
+
+from src.base_letters import DRAW_FUNCS
+
+# ==========================================
+# Primitives
+# ==========================================
+# Plain tuples so they are hashable, picklable and JSON friendly:
+#   ('line',     x1, y1, x2, y2, thickness)
+#   ('arc',      cx, cy, axis_x, axis_y, angle, start_angle, end_angle, thickness)
+#   ('polyline', ((x, y), ...), thickness)
+
+
+class DisplayList:
+    """
+    The drawing commands of one letter, recorded instead of rasterized.
+    Equality and hash only depend on what ends up on the canvas (canvas size,
+    primitives and the morphology thickness), so identical geometry from
+    different parameter sets shares one cache entry. 'letter' is metadata.
+    """
+    __slots__ = ('letter', 'size', 'primitives', 'thickness')
+
+    def __init__(self, letter, size, primitives, thickness):
+        self.letter = letter
+        self.size = tuple(size)
+        self.primitives = tuple(primitives)
+        self.thickness = int(thickness)
+
+    def _key(self):
+        return (self.size, self.primitives, self.thickness)
+
+    def __eq__(self, other):
+        return isinstance(other, DisplayList) and self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __len__(self):
+        return len(self.primitives)
+
+    def __repr__(self):
+        return f"DisplayList(letter={self.letter!r}, primitives={len(self.primitives)}, thickness={self.thickness})"
+
+    def to_dict(self):
+        prims = [[p[0], [list(pt) for pt in p[1]], p[2]] if p[0] == 'polyline' else list(p)
+                 for p in self.primitives]
+        return {"letter": self.letter, "size": list(self.size),
+                "thickness": self.thickness, "primitives": prims}
+
+    @classmethod
+    def from_dict(cls, data):
+        prims = [(p[0], tuple(tuple(pt) for pt in p[1]), p[2]) if p[0] == 'polyline' else tuple(p)
+                 for p in data["primitives"]]
+        return cls(data["letter"], data["size"], prims, data["thickness"])
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), separators=(',', ':'))
+
+    @classmethod
+    def from_json(cls, text):
+        return cls.from_dict(json.loads(text))
+
+
+class RecordingSkeleton:
+    """
+    Drop-in stand-in for LetterSkeleton that records the draw calls of the
+    CanonicalLetters.draw_* functions as primitives.
+    """
+    def __init__(self, size=(200, 200)):
+        self.h, self.w = size
+        self.primitives = []
+
+    def clear(self):
+        self.primitives = []
+
+    def draw_line(self, p1, p2, thickness=1):
+        self.primitives.append(('line', p1[0], p1[1], p2[0], p2[1], thickness))
+
+    def draw_curve(self, points=None, center=None, axes=None, angle=0, start_angle=0, end_angle=360, thickness=1):
+        if center is not None and axes is not None:
+            self.primitives.append(('arc', center[0], center[1], axes[0], axes[1],
+                                    angle, start_angle, end_angle, thickness))
+        elif points is not None:
+            self.primitives.append(('polyline', tuple((p[0], p[1]) for p in points), thickness))
+
+
+def build_display_list(letter, params, size=(200, 200)):
+    """Records the primitives of one letter for a full parameter dict (including 'thickness')."""
+    params = dict(params)
+    thick = int(params.pop('thickness', 6))
+    recorder = RecordingSkeleton(size=size)
+    DRAW_FUNCS[letter](recorder, **params, thickness=thick)
+    return DisplayList(letter, size, recorder.primitives, thick)
+
+
+# ==========================================
+# Arc tessellation (cached per primitive)
+# ==========================================
+
+@lru_cache(maxsize=4096)
+def tessellate_arc(arc, delta=2.0):
+    """
+    Converts an 'arc' primitive into polyline vertices (float array, read-only),
+    using the angle normalisation of cv2.ellipse2Poly. Cached per primitive, so
+    the B and C arcs of a sweep are only tessellated once per distinct shape.
+    """
+    _, cx, cy, ax, ay, angle, start, end, _ = arc
+
+    angle = angle % 360
+    if start > end: start, end = end, start
+    while start < 0:
+        start += 360; end += 360
+    while end > 360:
+        end -= 360; start -= 360
+    if end - start > 360:
+        start, end = 0, 360
+
+    n = max(2, int(math.ceil((end - start) / delta)) + 1)
+    t = np.radians(np.linspace(start, end, n))
+    a = math.radians(angle)
+    x = ax * np.cos(t)
+    y = ay * np.sin(t)
+    pts = np.stack([cx + x * math.cos(a) - y * math.sin(a),
+                    cy + x * math.sin(a) + y * math.cos(a)], axis=-1)
+    pts.setflags(write=False)
+    return pts
+
+
+def primitive_segments(primitive):
+    """Returns the primitive as an (S, 4) array of x1, y1, x2, y2 segments."""
+    kind = primitive[0]
+    if kind == 'line':
+        return np.array([primitive[1:5]], dtype=np.float64)
+    if kind == 'arc':
+        pts = tessellate_arc(primitive)
+    else:
+        pts = np.asarray(primitive[1], dtype=np.float64)
+    if len(pts) < 2:
+        pts = np.vstack([pts, pts])
+    return np.hstack([pts[:-1], pts[1:]])
+
+
+# ==========================================
+# Render backends
+# ==========================================
+
+def replay(display_list, skeleton):
+    """Replays a display list onto a LetterSkeleton (OpenCV rasterization)."""
+    skeleton.clear()
+    for p in display_list.primitives:
+        if p[0] == 'line':
+            skeleton.draw_line((p[1], p[2]), (p[3], p[4]), p[5])
+        elif p[0] == 'arc':
+            skeleton.draw_curve(center=(p[1], p[2]), axes=(p[3], p[4]), angle=p[5],
+                                start_angle=p[6], end_angle=p[7], thickness=p[8])
+        else:
+            skeleton.draw_curve(points=p[1], thickness=p[2])
+
+
+def render_opencv(display_lists):
+    """Reference backend: the same OpenCV drawing + dilation as LetterSkeleton."""
+    from src.letter_model import LetterSkeleton
+
+    display_lists = list(display_lists)
+    if not display_lists:
+        return np.zeros((0, 200, 200), dtype=np.uint8)
+    skeleton = LetterSkeleton(size=display_lists[0].size)
+    out = np.empty((len(display_lists), *display_lists[0].size), dtype=np.uint8)
+    for i, dl in enumerate(display_lists):
+        replay(dl, skeleton)
+        out[i] = skeleton.apply_morphology(thickness=dl.thickness)
+    return out
+
+
+# Backend name -> function(display_lists) returning (N, H, W) uint8 masks
+RENDER_BACKENDS = {
+    'opencv': render_opencv,
+}
+
+
+def render_display_lists(display_lists, backend='opencv', **kwargs):
+    """Renders a sequence of display lists with one of the registered backends."""
+    if backend == 'sdf' and backend not in RENDER_BACKENDS:
+        import src.sdf_render  # registers itself
+    if backend not in RENDER_BACKENDS:
+        raise ValueError(f"Unknown render backend '{backend}', expected one of {list(RENDER_BACKENDS)}")
+    return RENDER_BACKENDS[backend](display_lists, **kwargs)
@@ -0,0 +1,156 @@
+import numpy as np
+
+from src.bitmask import and_counts, overlap_metric, popcount
+
+# ==========================================
+# Scalable embedding and clustering of masks
+# ==========================================
+# A full distance matrix over a dataset of N masks costs N^2 comparisons.
+# Everything here only needs distances from all masks to a few reference
+# masks, computed on bit-packed masks (src/bitmask.py) with the Jaccard
+# distance 1 - IoU, which is a metric:
+#
+#   landmarks      farthest-point selection, L passes over N masks
+#   embedding      landmark MDS (de Silva & Tenenbaum): classical MDS of the
+#                  L x L landmark distances, every mask placed from its L
+#                  distances to the landmarks                  N x L
+#   clustering     mini-batch k-medoids: medoids are masks of the dataset,
+#                  refined on random batches, one final assignment  N x k
+#
+# so the cost is O(N * (L + k)) comparisons of a few hundred words each.
+
+CHUNK = 8192
+
+
+def jaccard_distance(store_a, store_b, block=16):
+    """(len(a), len(b)) Jaccard distances (1 - IoU) between two PackedMasks."""
+    inter = and_counts(store_a.packed(), store_b.packed(), block)
+    iou = overlap_metric(inter, store_a.counts[:len(store_a), None],
+                         store_b.counts[None, :len(store_b)], store_a.pixels, 'iou')
+    return 1.0 - iou
+
+
+def jaccard_to(store, i):
+    """Jaccard distances of every mask of a PackedMasks to mask i."""
+    words, count = store.words[i], store.counts[i]
+    out = np.empty(len(store))
+    for start in range(0, len(store), CHUNK):
+        chunk = store.words[start:min(start + CHUNK, len(store))]
+        inter = popcount(chunk & words)
+        out[start:start + len(chunk)] = 1.0 - overlap_metric(
+            inter, store.counts[start:start + len(chunk)], count, store.pixels, 'iou')
+    return out
+
+
+def farthest_point_landmarks(store, n_landmarks, first=(), seed=0):
+    """
+    Indices of n_landmarks masks spread over the dataset: each new landmark is
+    the mask farthest from all landmarks chosen so far. 'first' are indices
+    that are always landmarks (e.g. the canonical letters); otherwise the
+    first landmark is a random mask.
+    """
+    n_landmarks = min(n_landmarks, len(store))
+    chosen = [int(i) for i in first][:n_landmarks]
+    if not chosen:
+        chosen = [int(np.random.default_rng(seed).integers(len(store)))]
+    nearest = np.full(len(store), np.inf)
+    for i in chosen:
+        np.minimum(nearest, jaccard_to(store, i), out=nearest)
+    while len(chosen) < n_landmarks:
+        i = int(np.argmax(nearest))
+        if nearest[i] <= 0:
+            break   # fewer distinct masks than landmarks
+        chosen.append(i)
+        np.minimum(nearest, jaccard_to(store, i), out=nearest)
+    return np.array(chosen, dtype=np.int64)
+
+
+def landmark_mds(landmark_dist, point_dist, dims=2):
+    """
+    Landmark MDS. landmark_dist: (L, L) distances between the landmarks,
+    point_dist: (N, L) distances of every point to the landmarks.
+    Returns (N, dims) coordinates; landmarks land where classical MDS of
+    landmark_dist puts them.
+    """
+    sq = np.asarray(landmark_dist, dtype=np.float64) ** 2
+    n = len(sq)
+    centering = np.eye(n) - 1.0 / n
+    b = -0.5 * centering @ sq @ centering
+    eigval, eigvec = np.linalg.eigh(b)
+    order = np.argsort(eigval)[::-1][:dims]
+    eigval, eigvec = eigval[order], eigvec[:, order]
+    keep = eigval > 1e-12
+    pinv = np.zeros((dims, n))
+    pinv[keep] = (eigvec[:, keep] / np.sqrt(eigval[keep])).T
+    mean_sq = sq.mean(axis=0)
+    return -0.5 * (np.asarray(point_dist, dtype=np.float64) ** 2 - mean_sq) @ pinv.T
+
+
+class MiniBatchKMedoids:
+    """
+    k-medoids on the Jaccard distance of a PackedMasks, refined on batches.
+
+        km = MiniBatchKMedoids(12, seed=0).fit(store)
+        km.labels, km.medoids          # cluster per mask, index of each medoid
+
+    Initialisation is k-medoids++ (each new medoid drawn with probability
+    proportional to its squared distance from the nearest medoid). Every
+    iteration draws batch_size masks, assigns them to the nearest medoid and
+    moves each medoid to the member of its batch cluster (or keeps itself)
+    with the smallest total distance to the other members. Stops after
+    n_iter iterations or when no medoid moved for 'patience' iterations.
+    """
+    def __init__(self, n_clusters, batch_size=1024, n_iter=100, patience=10, seed=0):
+        self.n_clusters = n_clusters
+        self.batch_size = batch_size
+        self.n_iter = n_iter
+        self.patience = patience
+        self.seed = seed
+        self.medoids = None
+        self.labels = None
+        self.distances = None
+        self.iterations = 0
+
+    def _init(self, store, rng):
+        medoids = [int(rng.integers(len(store)))]
+        nearest = jaccard_to(store, medoids[0])
+        while len(medoids) < min(self.n_clusters, len(store)):
+            weights = nearest ** 2
+            if weights.sum() <= 0:
+                break
+            i = int(rng.choice(len(store), p=weights / weights.sum()))
+            medoids.append(i)
+            np.minimum(nearest, jaccard_to(store, i), out=nearest)
+        return np.array(medoids, dtype=np.int64)
+
+    def fit(self, store):
+        rng = np.random.default_rng(self.seed)
+        medoids = self._init(store, rng)
+        still = 0
+        for it in range(self.n_iter):
+            batch = rng.choice(len(store), size=min(self.batch_size, len(store)), replace=False)
+            assign = jaccard_distance(store.take(batch), store.take(medoids)).argmin(axis=1)
+            moved = False
+            for c in range(len(medoids)):
+                members = batch[assign == c]
+                if not len(members):
+                    continue
+                candidates = np.unique(np.append(members, medoids[c]))
+                cost = jaccard_distance(store.take(candidates), store.take(members)).sum(axis=1)
+                best = int(candidates[np.argmin(cost)])
+                if best != medoids[c]:
+                    medoids[c] = best
+                    moved = True
+            self.iterations = it + 1
+            still = 0 if moved else still + 1
+            if still >= self.patience:
+                break
+        self.medoids = medoids
+        self.distances = jaccard_distance(store, store.take(medoids))
+        self.labels = self.distances.argmin(axis=1)
+        return self
+
+    @property
+    def inertia(self):
+        """Sum of the distances of every mask to its medoid."""
+        return float(self.distances[np.arange(len(self.labels)), self.labels].sum())
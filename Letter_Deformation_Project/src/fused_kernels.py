@@ -0,0 +1,154 @@
+import numpy as np
+
+# ==========================================
+# Fused dilate + blur kernel
+# ==========================================
+# The reference hot path is
+#     dilation(canvas, square(t))  ->  gaussian(img, sigma=1.5)
+# which allocates a dilated uint8 image, a float64 copy and the blurred
+# result for every sample. dilate_blur() computes the same blurred image
+# (and optionally the dilated mask) in one call, writing into caller-owned
+# buffers. Two implementations can be selected at runtime:
+#   'reference' - the original skimage calls (for validation)
+#   'numpy'     - separable max + separable Gaussian on preallocated buffers
+#
+# Run_Project/benchmark_kernels.py compares them with the unfused path
+# (LetterSkeleton.apply_morphology's cv2 dilation + blur_image into
+# DistanceWorkspace buffers), which is faster end to end; the sweeps and
+# LetterStream use that path.
+#
+# Semantics match skimage: a square(t) footprint covers offsets
+# [-(t-1)//2, t//2] with zeros outside the canvas, and the Gaussian uses
+# truncate=4.0 with 'nearest' edges on the image scaled to [0, 1].
+
+KERNEL_BACKENDS = ('reference', 'numpy')
+
+_backend = 'numpy'
+
+
+def set_kernel_backend(name):
+    """Selects the dilate_blur implementation ('reference' or 'numpy')."""
+    global _backend
+    if name not in KERNEL_BACKENDS:
+        raise ValueError(f"Unknown kernel backend '{name}', expected one of {KERNEL_BACKENDS}")
+    _backend = name
+
+
+def get_kernel_backend():
+    return _backend
+
+
+_KERNEL_CACHE = {}
+
+def gaussian_weights(sigma=1.5, truncate=4.0):
+    """Normalised 1-D Gaussian taps, same radius rule as scipy.ndimage."""
+    key = (sigma, truncate)
+    if key not in _KERNEL_CACHE:
+        radius = int(truncate * float(sigma) + 0.5)
+        x = np.arange(-radius, radius + 1, dtype=np.float64)
+        w = np.exp(-0.5 * (x / sigma) ** 2)
+        _KERNEL_CACHE[key] = w / w.sum()
+    return _KERNEL_CACHE[key]
+
+
+class KernelWorkspace:
+    """Scratch buffers for one canvas size, reused across calls."""
+    def __init__(self, shape, max_thickness=64, sigma=1.5, dtype=np.float64):
+        h, w = shape
+        self.shape = (h, w)
+        self.dtype = np.dtype(dtype)
+        self.weights = gaussian_weights(sigma).astype(self.dtype)
+        r = len(self.weights) // 2
+        self.radius = r
+        self.max_thickness = max_thickness
+        # Dilation (uint8, zero padded) and blur (float, edge padded) buffers
+        self.hpad = np.zeros((h, w + max_thickness), dtype=np.uint8)
+        self.vpad = np.zeros((h + max_thickness, w), dtype=np.uint8)
+        self.dilated = np.empty((h, w), dtype=np.uint8)
+        self.fpad = np.empty((h, w + 2 * r), dtype=self.dtype)
+        self.hblur = np.empty((h + 2 * r, w), dtype=self.dtype)
+        self.tmp = np.empty((h, w), dtype=self.dtype)
+
+
+_WORKSPACES = {}
+
+def _default_workspace(shape, dtype=np.float64):
+    key = (tuple(shape), np.dtype(dtype).str)
+    if key not in _WORKSPACES:
+        _WORKSPACES[key] = KernelWorkspace(shape, dtype=dtype)
+    return _WORKSPACES[key]
+
+
+def _dilate_blur_reference(canvas, thickness, sigma, out, dilated_out):
+    from skimage.morphology import dilation, square
+    from skimage.filters import gaussian
+
+    dilated = dilation(canvas, square(thickness))
+    if dilated_out is not None:
+        dilated_out[...] = dilated
+    out[...] = gaussian(dilated, sigma=sigma)
+    return out
+
+
+def _dilate_blur_numpy(canvas, thickness, ws, out, dilated_out):
+    h, w = canvas.shape
+    lo, hi = (thickness - 1) // 2, thickness // 2
+    span = lo + hi
+    r = ws.radius
+
+    # Separable square dilation: horizontal then vertical running max
+    hpad = ws.hpad[:, :w + span]
+    hpad[:, :lo] = 0
+    hpad[:, lo + w:] = 0
+    hpad[:, lo:lo + w] = canvas
+    vpad = ws.vpad[:h + span]
+    vpad[:lo] = 0
+    vpad[lo + h:] = 0
+    hmax = vpad[lo:lo + h]
+    np.copyto(hmax, hpad[:, 0:w])
+    for k in range(1, span + 1):
+        np.maximum(hmax, hpad[:, k:k + w], out=hmax)
+    dilated = ws.dilated if dilated_out is None else dilated_out
+    np.copyto(dilated, vpad[0:h])
+    for k in range(1, span + 1):
+        np.maximum(dilated, vpad[k:k + h], out=dilated)
+
+    # Separable Gaussian with 'nearest' edges, image scaled to [0, 1]
+    fpad = ws.fpad
+    np.multiply(dilated, ws.dtype.type(1.0 / 255.0), out=fpad[:, r:r + w], casting='unsafe')
+    fpad[:, :r] = fpad[:, r:r + 1]
+    fpad[:, r + w:] = fpad[:, r + w - 1:r + w]
+
+    hb = ws.hblur[r:r + h]
+    np.multiply(fpad[:, 0:w], ws.weights[0], out=hb)
+    for k in range(1, len(ws.weights)):
+        np.multiply(fpad[:, k:k + w], ws.weights[k], out=ws.tmp)
+        hb += ws.tmp
+    ws.hblur[:r] = ws.hblur[r:r + 1]
+    ws.hblur[r + h:] = ws.hblur[r + h - 1:r + h]
+
+    np.multiply(ws.hblur[0:h], ws.weights[0], out=out)
+    for k in range(1, len(ws.weights)):
+        np.multiply(ws.hblur[k:k + h], ws.weights[k], out=ws.tmp)
+        out += ws.tmp
+    return out
+
+
+def dilate_blur(canvas, thickness, sigma=1.5, out=None, dilated_out=None, workspace=None, backend=None):
+    """
+    Dilates a uint8 canvas with a thickness x thickness square and blurs the
+    result (scaled to [0, 1]) with a Gaussian of the given sigma.
+    Writes into 'out' (float, same shape) and, if given, the dilated mask into
+    'dilated_out' (uint8). Returns 'out'. The workspace dtype sets the
+    compute precision (float64 by default, like skimage).
+    """
+    backend = backend or _backend
+    thickness = int(thickness)
+    if workspace is None:
+        workspace = _default_workspace(canvas.shape, out.dtype if out is not None else np.float64)
+    if out is None:
+        out = np.empty(canvas.shape, dtype=workspace.dtype)
+
+    if backend == 'reference' or thickness > workspace.max_thickness or sigma != 1.5:
+        return _dilate_blur_reference(canvas, thickness, sigma, out, dilated_out)
+    return _dilate_blur_numpy(canvas, thickness, workspace, out, dilated_out)
@@ -0,0 +1,281 @@
+import inspect
+import numpy as np
+
+from src.base_letters import DRAW_FUNCS
+
+# ==========================================
+# Vectorized letter geometry
+# ==========================================
+# Mirrors the stroke math of CanonicalLetters.draw_* for a whole batch of
+# parameter sets at once. Python int() truncation becomes np.trunc and
+# '//' keeps its floor semantics, so the endpoints are the same numbers the
+# scalar code passes to the skeleton (trig may differ in the last ulp).
+#
+# Output layout per letter (N = batch size):
+#   lines      (N, L, 4)  x1, y1, x2, y2
+#   line_mask  (N, L)     False where the scalar code skips the line
+#   arcs       (N, M, 7)  cx, cy, axis_x, axis_y, angle, start_angle, end_angle
+#   thickness  (N,)       integer stroke thickness
+
+
+class LetterGeometry:
+    """Stroke geometry of N parameter sets of one letter, as arrays."""
+    def __init__(self, letter, lines, line_mask, arcs, thickness):
+        self.letter = letter
+        self.lines = lines
+        self.line_mask = line_mask
+        self.arcs = arcs
+        self.thickness = thickness
+
+    def __len__(self):
+        return len(self.thickness)
+
+    def display_list(self, i, size=(200, 200)):
+        """Sample i as a DisplayList (the primitives draw_* would have recorded)."""
+        from src.display_list import DisplayList
+
+        thick = int(self.thickness[i])
+        prims = [('line', *map(float, line), thick)
+                 for line, valid in zip(self.lines[i], self.line_mask[i]) if valid]
+        prims += [('arc', *map(float, arc), thick) for arc in self.arcs[i]]
+        return DisplayList(self.letter, size, prims, thick)
+
+
+def _draw_defaults(letter):
+    """Default keyword values of the scalar draw function (e.g. cut_bottom for C)."""
+    sig = inspect.signature(DRAW_FUNCS[letter])
+    return {name: p.default for name, p in sig.parameters.items()
+            if p.default is not inspect.Parameter.empty}
+
+
+def as_param_arrays(letter, params):
+    """
+    Accepts a list of parameter dicts, a dict of sequences or a structured
+    array (src.param_space) and returns a dict of float64 arrays, filling
+    missing keys with the draw defaults.
+    """
+    if isinstance(params, np.ndarray) and params.dtype.names:
+        params = np.ravel(params)
+        columns = {k: params[k].astype(np.float64) for k in params.dtype.names}
+        n = len(params)
+    elif isinstance(params, dict):
+        columns = {k: np.asarray(v, dtype=np.float64) for k, v in params.items()}
+        n = len(next(iter(columns.values()))) if columns else 0
+    else:
+        params = list(params)
+        n = len(params)
+        keys = set().union(*(p.keys() for p in params)) if params else set()
+        defaults = _draw_defaults(letter)
+        columns = {k: np.array([p.get(k, defaults.get(k, 0)) for p in params], dtype=np.float64)
+                   for k in keys}
+
+    for key, value in _draw_defaults(letter).items():
+        if key not in columns:
+            columns[key] = np.full(n, value, dtype=np.float64)
+    return columns, n
+
+
+def _rotate(x, y, cx, cy, angle_deg):
+    """Array version of CanonicalLetters._rotate_point (truncates like int())."""
+    rad = np.radians(angle_deg)
+    cos_a = np.cos(rad)
+    sin_a = np.sin(rad)
+    dx = x - cx
+    dy = y - cy
+    return np.trunc(cx + dx * cos_a - dy * sin_a), np.trunc(cy + dx * sin_a + dy * cos_a)
+
+
+def _shear(x, y, shear_x, bottom_y, height):
+    factor = (bottom_y - y) / height
+    return np.clip(np.trunc(x + shear_x * factor), 5, 195), y
+
+
+def _stack_lines(*lines):
+    # Each line is (x1, y1, x2, y2) of broadcastable arrays -> (N, L, 4)
+    return np.stack([np.stack(np.broadcast_arrays(*line), axis=-1) for line in lines], axis=1)
+
+
+def _no_arcs(n):
+    return np.zeros((n, 0, 7))
+
+
+def geometry_A(p, n):
+    shear_x = p['shear_x']
+    TOP_Y, BOTTOM_Y = 40, 175
+    HEIGHT = BOTTOM_Y - TOP_Y
+
+    center_x = 100 - np.trunc(shear_x // 2)
+    base_width = np.trunc(100 * p['base_width_factor'])
+    top_width = np.trunc(p['top_width'])
+
+    bl = _shear(center_x - base_width // 2, BOTTOM_Y, shear_x, BOTTOM_Y, HEIGHT)
+    br = _shear(center_x + base_width // 2, BOTTOM_Y, shear_x, BOTTOM_Y, HEIGHT)
+    tl = _shear(center_x - top_width // 2, TOP_Y, shear_x, BOTTOM_Y, HEIGHT)
+    tr = _shear(center_x + top_width // 2, TOP_Y, shear_x, BOTTOM_Y, HEIGHT)
+
+    bar_y = (TOP_Y + BOTTOM_Y) // 2 - p['crossbar_h_shift']
+    bar_y = np.clip(bar_y, TOP_Y + 20, BOTTOM_Y - 25)
+    ratio = (bar_y - TOP_Y) / (BOTTOM_Y - TOP_Y)
+    bar_left_x = np.trunc(tl[0] + (bl[0] - tl[0]) * ratio)
+    bar_right_x = np.trunc(tr[0] + (br[0] - tr[0]) * ratio)
+
+    lines = _stack_lines(
+        (bl[0], bl[1], tl[0], tl[1]),
+        (br[0], br[1], tr[0], tr[1]),
+        (tl[0], tl[1], tr[0], tr[1]),
+        (bar_left_x, bar_y, bar_right_x, bar_y),
+    )
+    line_mask = np.ones((n, 4), dtype=bool)
+    line_mask[:, 2] = top_width > 0
+    return lines, line_mask, _no_arcs(n)
+
+
+def geometry_B(p, n):
+    LEFT_X, TOP_Y, BOTTOM_Y, CENTER_Y = 60, 30, 170, 100
+    width = np.trunc(70 * p['width_factor'])
+    squash_f = p['vertical_squash']
+    rot = p['rotation_deg']
+
+    def squash(y):
+        return np.trunc(CENTER_Y + (y - CENTER_Y) * squash_f)
+
+    top = squash(TOP_Y)
+    bottom = squash(BOTTOM_Y)
+    waist = squash(100 - p['waist_y_shift'])
+
+    p1 = _rotate(LEFT_X, top, 100, 100, rot)
+    p2 = _rotate(LEFT_X, bottom, 100, 100, rot)
+    c_top = _rotate(LEFT_X, (top + waist) // 2, 100, 100, rot)
+    c_bot = _rotate(LEFT_X, (waist + bottom) // 2, 100, 100, rot)
+
+    lines = _stack_lines((p1[0], p1[1], p2[0], p2[1]))
+    arcs = np.stack([
+        np.stack(np.broadcast_arrays(c_top[0], c_top[1], width, np.abs(waist - top) // 2, rot, -90, 90), axis=-1),
+        np.stack(np.broadcast_arrays(c_bot[0], c_bot[1], width, np.abs(bottom - waist) // 2, rot, -90, 90), axis=-1),
+    ], axis=1)
+    return lines, np.ones((n, 1), dtype=bool), arcs
+
+
+def geometry_C(p, n):
+    R = 75
+    arcs = np.stack(np.broadcast_arrays(
+        110, 100, R, np.trunc(R * p['vertical_squash']), p['rotation_deg'],
+        45 + p['cut_bottom'], 315 - p['cut_top']), axis=-1)[:, None, :]
+    return np.zeros((n, 0, 4)), np.zeros((n, 0), dtype=bool), arcs.astype(np.float64)
+
+
+def geometry_F(p, n):
+    LEFT_X, TOP_Y = 55, 30
+    shear_x = p['shear_x']
+    height = np.trunc((170 - 30) * p['spine_height'])
+    bottom_y = TOP_Y + height
+    bar_len = np.trunc(90 * p['bar_length'])
+    # The scalar code uses factor 0 for a zero-height spine
+    safe_height = np.where(height != 0, height, 1)
+    shear_mult = np.where(height != 0, shear_x, 0)
+
+    def shear(x, y):
+        return _shear(x, y, shear_mult, bottom_y, safe_height)
+
+    mid_y = TOP_Y + np.trunc(height * 0.45) + p['middle_bar_shift']
+    s_top, s_bot = shear(LEFT_X, TOP_Y), shear(LEFT_X, bottom_y)
+    s_bar_end = shear(LEFT_X + bar_len, TOP_Y)
+    s_mid, s_mid_end = shear(LEFT_X, mid_y), shear(LEFT_X + np.trunc(bar_len * 0.5), mid_y)
+
+    lines = _stack_lines(
+        (s_top[0], s_top[1], s_bot[0], s_bot[1]),
+        (s_top[0], s_top[1], s_bar_end[0], s_bar_end[1]),
+        (s_mid[0], s_mid[1], s_mid_end[0], s_mid_end[1]),
+    )
+    return lines, np.ones((n, 3), dtype=bool), _no_arcs(n)
+
+
+def geometry_X(p, n):
+    cx, cy = 100, 100
+    cross_ratio = p['cross_ratio']
+    asym = np.trunc(p['asymmetry'])
+    rot = p['rotation_deg']
+
+    base_half_width = 50 + (p['spread_angle'] * 1.5)
+    w_top = np.trunc(base_half_width * np.maximum(0.2, cross_ratio * 2.0))
+    w_bot = np.trunc(base_half_width * np.maximum(0.2, (1.0 - cross_ratio) * 2.0))
+
+    tl = (cx - w_top, 30)
+    tr = (cx + w_top + asym, 30)
+    bl = (cx - w_bot + asym, 170)
+    br = (cx + w_bot, 170)
+
+    # Rotating by 0 degrees leaves integer points unchanged, like the scalar branch
+    tl, tr, bl, br = (_rotate(x, y, cx, cy, rot) for x, y in (tl, tr, bl, br))
+
+    lines = _stack_lines(
+        (tl[0], tl[1], br[0], br[1]),
+        (tr[0], tr[1], bl[0], bl[1]),
+    )
+    return lines, np.ones((n, 2), dtype=bool), _no_arcs(n)
+
+
+def geometry_W(p, n):
+    CX, TOP, BOT = 100, 30, 170
+    HEIGHT = BOT - TOP
+    shear_x = p['shear_x']
+
+    width = np.trunc(160 * p['width_factor'])
+    half = width // 2
+    quarter = width // 4
+    valley = TOP + np.trunc(HEIGHT * p['peak_depth'])
+    mid_peak = TOP + np.trunc(HEIGHT * (1 - p['middle_height']))
+
+    def shear(x, y):
+        return _shear(x, y, shear_x, BOT, HEIGHT)
+
+    pts = [shear(CX - half, TOP), shear(CX - quarter, valley), shear(CX, mid_peak),
+           shear(CX + quarter, valley), shear(CX + half, TOP)]
+    lines = _stack_lines(*[(a[0], a[1], b[0], b[1]) for a, b in zip(pts[:-1], pts[1:])])
+    return lines, np.ones((n, 4), dtype=bool), _no_arcs(n)
+
+
+GEOMETRY_FUNCS = {
+    'A': geometry_A,
+    'B': geometry_B,
+    'C': geometry_C,
+    'F': geometry_F,
+    'X': geometry_X,
+    'W': geometry_W,
+}
+
+
+def compute_geometry(letter, params):
+    """
+    Computes the stroke geometry for a batch of parameter sets of one letter.
+    'params' is a list of parameter dicts or a dict of equal-length sequences.
+    """
+    columns, n = as_param_arrays(letter, params)
+    lines, line_mask, arcs = GEOMETRY_FUNCS[letter](columns, n)
+    thickness = np.trunc(columns['thickness']).astype(np.int64)
+    return LetterGeometry(letter, lines, line_mask, arcs, thickness)
+
+
+# ==========================================
+# Rasterization (consumes the arrays)
+# ==========================================
+
+def draw_geometry(skeleton, geometry, i):
+    """Draws sample i of a LetterGeometry onto a LetterSkeleton."""
+    skeleton.clear()
+    thick = int(geometry.thickness[i])
+    for (x1, y1, x2, y2), valid in zip(geometry.lines[i], geometry.line_mask[i]):
+        if valid:
+            skeleton.draw_line((x1, y1), (x2, y2), thick)
+    for cx, cy, ax, ay, angle, start, end in geometry.arcs[i]:
+        skeleton.draw_curve(center=(cx, cy), axes=(ax, ay), angle=angle,
+                            start_angle=start, end_angle=end, thickness=thick)
+
+
+def render_geometry(geometry, skeleton):
+    """Rasterizes every sample; returns an (N, H, W) uint8 array of thickened letters."""
+    out = np.empty((len(geometry), skeleton.h, skeleton.w), dtype=np.uint8)
+    for i in range(len(geometry)):
+        draw_geometry(skeleton, geometry, i)
+        out[i] = skeleton.apply_morphology(thickness=int(geometry.thickness[i]))
+    return out
@@ -1,11 +1,22 @@
 import numpy as np
 import cv2
-from skimage.morphology import dilation, square
+
+_SQUARES = {}
+
+def _square(size):
+    if size not in _SQUARES:
+        _SQUARES[size] = np.ones((size, size), dtype=np.uint8)
+    return _SQUARES[size]
+
 
 class LetterSkeleton:
-    def __init__(self, size=(200, 200)):
+    def __init__(self, size=(200, 200), binary=False):
         self.h, self.w = size
         self.canvas = np.zeros((self.h, self.w), dtype=np.uint8)
+        # binary=True draws without anti-aliasing, so every pixel is 0 or 255
+        # (masks for src.bitmask)
+        self.binary = binary
+        self.line_type = cv2.LINE_8 if binary else cv2.LINE_AA
 
     def clear(self):
         self.canvas.fill(0)
@@ -14,7 +25,7 @@ class LetterSkeleton:
         # Convert points to integer tuples
         pt1 = (int(round(p1[0])), int(round(p1[1])))
         pt2 = (int(round(p2[0])), int(round(p2[1])))
-        cv2.line(self.canvas, pt1, pt2, color=255, thickness=thickness, lineType=cv2.LINE_AA)
+        cv2.line(self.canvas, pt1, pt2, color=255, thickness=thickness, lineType=self.line_type)
 
     def draw_curve(self, points=None, center=None, axes=None, angle=0, start_angle=0, end_angle=360, thickness=1):
         """
@@ -27,13 +38,24 @@ class LetterSkeleton:
             c = (int(round(center[0])), int(round(center[1])))
             ax = (int(round(axes[0])), int(round(axes[1])))
             
-            cv2.ellipse(self.canvas, c, ax, angle, start_angle, end_angle, 255, thickness, cv2.LINE_AA)
+            cv2.ellipse(self.canvas, c, ax, angle, start_angle, end_angle, 255, thickness, self.line_type)
 
         # Case 2: We received a regular list of points
         elif points is not None:
             pts = np.array(points, np.int32)
             pts = pts.reshape((-1, 1, 2))
-            cv2.polylines(self.canvas, [pts], isClosed=False, color=255, thickness=thickness, lineType=cv2.LINE_AA)
+            cv2.polylines(self.canvas, [pts], isClosed=False, color=255, thickness=thickness, lineType=self.line_type)
             
-    def apply_morphology(self, thickness=6):
-        return dilation(self.canvas, square(thickness))
\ No newline at end of file
+    def apply_morphology(self, thickness=6, out=None):
+        """
+        Thickens the skeleton with a square(thickness) dilation. Writes into
+        'out' (uint8, canvas shape) when given instead of a new array.
+        """
+        if out is None:
+            out = np.empty_like(self.canvas)
+        # Same footprint placement as skimage's dilation(canvas, square(t)):
+        # offsets [-(t-1)//2, t//2] and zeros outside the canvas
+        anchor = (thickness - 1) // 2
+        cv2.dilate(self.canvas, _square(thickness), dst=out, anchor=(anchor, anchor),
+                   borderType=cv2.BORDER_CONSTANT, borderValue=0)
+        return out
\ No newline at end of file
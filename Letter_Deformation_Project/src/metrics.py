@@ -0,0 +1,301 @@
+import numpy as np
+from scipy import ndimage as ndi
+from skimage.metrics import structural_similarity as ssim
+from skimage.filters import gaussian
+from skimage.util import img_as_float32
+
+# Compute precision of the distance pipeline. 'float64' is the original
+# skimage behaviour; 'float32' keeps the blur, the SSIM local statistics and
+# the SSIM map in single precision (skimage follows the input dtype), which
+# halves the memory traffic per comparison. Scores are reported to two
+# decimals, see Run_Project/validate_precision.py for the deviation.
+PRECISIONS = ('float64', 'float32')
+
+_precision = 'float64'
+
+
+def set_precision(name):
+    """Selects the compute precision of the distance pipeline ('float64' or 'float32')."""
+    global _precision
+    if name not in PRECISIONS:
+        raise ValueError(f"Unknown precision '{name}', expected one of {PRECISIONS}")
+    _precision = name
+
+
+def get_precision():
+    return _precision
+
+
+def _float_dtype(precision=None):
+    return np.float32 if (precision or _precision) == 'float32' else np.float64
+
+
+def blur_image(img, sigma=1.5, precision=None, out=None, scratch=None):
+    """
+    Gaussian blur used before every SSIM comparison (float in [0, 1]).
+    With 'out' (and 'scratch' for the scaled uint8 input, both in the compute
+    dtype) nothing is allocated; the result is the same as without.
+    """
+    if out is None:
+        if (precision or _precision) == 'float32':
+            return gaussian(img_as_float32(img), sigma=sigma)
+        return gaussian(img, sigma=sigma)
+
+    # Same steps as skimage: uint8 -> [0, 1] in the compute dtype, then a
+    # 'nearest'-edge Gaussian truncated at 4 sigma
+    if img.dtype == np.uint8:
+        if scratch is None:
+            scratch = np.empty(img.shape, dtype=out.dtype)
+        np.copyto(scratch, img)
+        np.multiply(scratch, 1 / 255, out=scratch)
+        img = scratch
+    return ndi.gaussian_filter(img.astype(out.dtype, copy=False), sigma, output=out, mode='nearest', truncate=4.0)
+
+
+def ssim_distance(img1_blur, img2_blur, precision=None, workspace=None):
+    """
+    Distance between two already-blurred images (1 - SSIM), using the
+    dynamic range of the first (reference) image. A DistanceWorkspace of
+    the same shape and precision evaluates it without allocating.
+    """
+    if workspace is not None:
+        workspace.set_reference_blur(img1_blur)
+        return workspace.distance_blurred(img2_blur)
+
+    if (precision or _precision) == 'float32':
+        img1_blur = img1_blur.astype(np.float32, copy=False)
+        img2_blur = img2_blur.astype(np.float32, copy=False)
+
+    d_range = float(img1_blur.max() - img1_blur.min())
+    if d_range == 0: d_range = 1.0
+
+    similarity = ssim(img1_blur, img2_blur, data_range=d_range)
+    return max(0.0, 1.0 - float(similarity))
+
+
+def calculate_distance(img1, img2, precision=None, workspace=None):
+    """
+    Calculates distance with tolerance for thickness changes
+    using Gaussian Blur before SSIM comparison.
+    Range: 0.0 (Identical) to 1.0 (Different).
+
+    With a DistanceWorkspace the blurs and SSIM statistics go to its
+    buffers, and the reference (img1) statistics are reused while img1 is
+    the same array as in the previous call.
+    """
+    if img1.shape != img2.shape: return 0.0
+
+    if workspace is not None:
+        workspace.set_reference(img1)
+        return workspace.distance(img2)
+
+    # Apply Gaussian blur to soften edges (reduces pixel-perfect requirements)
+    img1_blur = blur_image(img1, precision=precision)
+    img2_blur = blur_image(img2, precision=precision)
+
+    return ssim_distance(img1_blur, img2_blur, precision=precision)
+
+
+# ==========================================
+# Allocation-free scoring
+# ==========================================
+# A sweep scores thousands of renders of one size against the same base
+# image. DistanceWorkspace keeps every intermediate of blur + SSIM in
+# preallocated buffers and reuses the reference blur and its local
+# statistics, so a call allocates no arrays. The operations are the ones
+# skimage's structural_similarity performs (7x7 uniform window, sample
+# covariance, K1=0.01, K2=0.03, 'reflect' edges, 3 px border cropped) in
+# the same order, so the scores are bit-identical to calculate_distance.
+
+_WIN = 7
+_K1, _K2 = 0.01, 0.03
+_COV_NORM = _WIN ** 2 / (_WIN ** 2 - 1)
+
+
+class DistanceWorkspace:
+    """
+    Scratch buffers for scoring images of one shape against a reference.
+
+        ws = DistanceWorkspace(base_img.shape)
+        ws.set_reference(base_img)
+        for params in samples:
+            score = ws.distance(render_letter(model, letter, params, out=mask))
+
+    The reference array must not be modified in place while it is set.
+    With local=True, distance() only evaluates SSIM around the pixels where
+    the image differs from the reference (see 'Diff-restricted scoring').
+    """
+    def __init__(self, shape, sigma=1.5, precision=None, local=False):
+        self.shape = tuple(shape)
+        self.sigma = sigma
+        self.local = local
+        self.radius = int(4.0 * sigma + 0.5)    # Gaussian support, as in scipy
+        self.precision = precision or _precision
+        self.dtype = np.dtype(_float_dtype(self.precision))
+        self.reference = None
+        self._ref_blur = None
+        buf = lambda: np.empty(self.shape, dtype=self.dtype)
+        # Reference blur and its window statistics (mean, mean^2, variance)
+        self.ref_blur = buf()
+        self.ref_mean = buf()
+        self.ref_mean_sq = buf()
+        self.ref_var = buf()
+        # Per-call image: scaled input and blur
+        self.scaled = buf()
+        self.blur = buf()
+        # SSIM temporaries
+        self.b = [buf() for _ in range(4)]
+        self.c1 = self.c2 = 0.0
+        self._crop = (slice(_WIN // 2, -(_WIN // 2)),) * 2
+        if local:
+            self.diff = np.empty(self.shape, dtype=bool)
+            self.diff_rows = np.empty(self.shape[0], dtype=bool)
+            self.diff_cols = np.empty(self.shape[1], dtype=bool)
+
+    def _filter(self, img, out):
+        return ndi.uniform_filter(img, size=_WIN, output=out)
+
+    def set_reference(self, img):
+        """Blurs the reference image (skipped while it is the same array as before)."""
+        if img is self.reference:
+            return
+        self._check(img)
+        blur_image(img, self.sigma, out=self.ref_blur, scratch=self.scaled)
+        self._set_stats()
+        self.reference = img
+        self._ref_blur = None
+
+    def set_reference_blur(self, img_blur):
+        """Uses an already-blurred reference (e.g. a cached base blur)."""
+        if img_blur is self._ref_blur:
+            return
+        self._check(img_blur)
+        np.copyto(self.ref_blur, img_blur, casting='same_kind')
+        self._set_stats()
+        self.reference = None
+        self._ref_blur = img_blur
+
+    def _set_stats(self):
+        self._window_stats(self.ref_blur, self.ref_mean, self.ref_mean_sq, self.ref_var)
+        d_range = float(self.ref_blur.max() - self.ref_blur.min())
+        if d_range == 0: d_range = 1.0
+        self.c1 = (_K1 * d_range) ** 2
+        self.c2 = (_K2 * d_range) ** 2
+
+    def _window_stats(self, x, ux, ux_sq, vx):
+        """Window mean, squared mean and variance of the reference (ux_sq is scratch until the end)."""
+        self._filter(x, ux)
+        np.multiply(x, x, out=vx)
+        self._filter(vx, ux_sq)
+        # vx = cov_norm * (uxx - ux * ux)
+        np.multiply(ux, ux, out=vx)
+        np.subtract(ux_sq, vx, out=vx)
+        np.multiply(_COV_NORM, vx, out=vx)
+        np.square(ux, out=ux_sq)
+
+    def _check(self, img):
+        if img.shape != self.shape:
+            raise ValueError(f"Workspace is for images of shape {self.shape}, got {img.shape}")
+
+    def distance(self, img):
+        """Distance of a uint8 image to the reference (see calculate_distance)."""
+        if img.shape != self.shape: return 0.0
+        if self.local and self.reference is not None:
+            return self._distance_local(img)
+        blur_image(img, self.sigma, out=self.blur, scratch=self.scaled)
+        return self.distance_blurred(self.blur)
+
+    def distance_blurred(self, img_blur):
+        """Distance of an already-blurred image to the reference (see ssim_distance)."""
+        if self.reference is None and self._ref_blur is None:
+            raise RuntimeError("DistanceWorkspace has no reference, call set_reference() first")
+        self._check(img_blur)
+        y = img_blur.astype(self.dtype, copy=False)
+        S = self._ssim_map(self.ref_blur, y, self.ref_mean, self.ref_mean_sq, self.ref_var, *self.b)
+        similarity = S[self._crop].mean(dtype=np.float64)
+        return max(0.0, 1.0 - float(similarity))
+
+    def _ssim_map(self, x, y, ux, ux_sq, vx, uy, vy, vxy, t):
+        """SSIM map of x (with its window stats) and y, in skimage's order of operations. Returns t."""
+        self._filter(y, uy)
+        np.multiply(y, y, out=t)
+        self._filter(t, vy)
+        np.multiply(x, y, out=t)
+        self._filter(t, vxy)
+        # vy = cov_norm * (uyy - uy * uy), vxy = cov_norm * (uxy - ux * uy)
+        np.multiply(uy, uy, out=t)
+        np.subtract(vy, t, out=vy)
+        np.multiply(_COV_NORM, vy, out=vy)
+        np.multiply(ux, uy, out=t)
+        np.subtract(vxy, t, out=vxy)
+        np.multiply(_COV_NORM, vxy, out=vxy)
+
+        # A2 = 2 * vxy + C2 (in vxy), B2 = vx + vy + C2 (in vy)
+        np.multiply(2, vxy, out=vxy)
+        np.add(vxy, self.c2, out=vxy)
+        np.add(vx, vy, out=vy)
+        np.add(vy, self.c2, out=vy)
+        # A1 = 2 * ux * uy + C1 (in t), B1 = ux**2 + uy**2 + C1 (in uy)
+        np.multiply(2, ux, out=t)
+        np.multiply(t, uy, out=t)
+        np.add(t, self.c1, out=t)
+        np.square(uy, out=uy)
+        np.add(ux_sq, uy, out=uy)
+        np.add(uy, self.c1, out=uy)
+        # S = (A1 * A2) / (B1 * B2)
+        np.multiply(uy, vy, out=uy)
+        np.multiply(t, vxy, out=t)
+        np.divide(t, uy, out=t)
+        return t
+
+    # --- Diff-restricted scoring ---
+    # Where the two masks agree on the whole blur + SSIM window around a pixel,
+    # both blurred windows are equal, so A1 == B1 and A2 == B2 and S is 1.
+    # Only the bounding box of the differing pixels, grown by the blur radius
+    # plus the window radius, is evaluated; the other pixels of the mean are
+    # counted as 1. The Gaussian is computed on a crop with the same edge
+    # handling (its values are exact). scipy's uniform filter is a running
+    # sum along each line, so window means restarted at the crop border
+    # differ from the full-frame ones in the last bits: scores move by at
+    # most ~4e-13, never at the 4 reported decimals.
+
+    def _distance_local(self, img):
+        np.not_equal(img, self.reference, out=self.diff)
+        rows = np.any(self.diff, axis=1, out=self.diff_rows)
+        if not rows.any():
+            return 0.0
+        cols = np.any(self.diff, axis=0, out=self.diff_cols)
+
+        pad = _WIN // 2
+        reach = self.radius + pad
+        score_box, box, crop = [], [], []
+        for mask, n in ((rows, self.shape[0]), (cols, self.shape[1])):
+            first, last = int(mask.argmax()), n - 1 - int(mask[::-1].argmax())
+            # Pixels whose S can differ from 1 (only pixels >= pad from the border are averaged)
+            lo, hi = max(first - reach, pad), min(last + reach + 1, n - pad)
+            score_box.append((lo, hi))
+            # ... their SSIM windows, and the blur input around those
+            box.append((lo - pad, hi + pad))
+            crop.append((max(lo - pad - self.radius, 0), min(hi + pad + self.radius, n)))
+
+        (cr0, cr1), (cc0, cc1) = crop
+        (br0, br1), (bc0, bc1) = box
+        scaled = _view(self.scaled, (cr1 - cr0, cc1 - cc0))
+        blurred = _view(self.blur, scaled.shape)
+        blur_image(img[cr0:cr1, cc0:cc1], self.sigma, out=blurred, scratch=scaled)
+
+        shape = (br1 - br0, bc1 - bc0)
+        x = self.ref_blur[br0:br1, bc0:bc1]
+        y = blurred[br0 - cr0:br1 - cr0, bc0 - cc0:bc1 - cc0]
+        ref_stats = (stat[br0:br1, bc0:bc1] for stat in (self.ref_mean, self.ref_mean_sq, self.ref_var))
+        S = self._ssim_map(x, y, *ref_stats, *(_view(b, shape) for b in self.b))
+
+        inner = S[pad:-pad, pad:-pad]
+        total = (self.shape[0] - 2 * pad) * (self.shape[1] - 2 * pad)
+        similarity = (inner.sum(dtype=np.float64) + (total - inner.size)) / total
+        return max(0.0, 1.0 - float(similarity))
+
+
+def _view(buf, shape):
+    """Contiguous array of 'shape' on the start of a (larger) preallocated buffer."""
+    return buf.reshape(-1)[:shape[0] * shape[1]].reshape(shape)
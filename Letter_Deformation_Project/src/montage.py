@@ -0,0 +1,125 @@
+import math
+import cv2
+import numpy as np
+
+# ==========================================
+# NumPy contact sheets
+# ==========================================
+# Tiles already-rendered masks into one uint8 BGR array and writes it with
+# cv2.imwrite, instead of one matplotlib axes per image. Every tile is
+#   label lines (text in the score colour)
+#   image framed by a border in the score colour
+# so the cost is roughly a pixel copy plus a few putText calls per tile.
+
+# Score bands (same thresholds as get_color_for_score), BGR
+SCORE_BANDS = (
+    (0.25, (0, 128, 0)),      # green: excellent match
+    (0.50, (0, 140, 255)),    # dark orange (#ff8c00): moderate match
+    (math.inf, (0, 0, 255)),  # red: poor match / high distortion
+)
+
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+LABEL_SCALE = 0.35
+LINE_HEIGHT = 12
+TITLE_SCALE = 0.6
+TITLE_HEIGHT = 30
+BACKGROUND = 255
+
+
+def score_color(score):
+    """BGR colour of the score band."""
+    for limit, color in SCORE_BANDS:
+        if score < limit:
+            return color
+    return SCORE_BANDS[-1][1]
+
+
+def _split_label(label):
+    if label is None: return []
+    if isinstance(label, str): return label.split("\n")
+    return list(label)
+
+
+def tile_shape(image_shape, label_lines, border=3):
+    """(height, width) of one tile for images of image_shape with label_lines text lines."""
+    h, w = image_shape[:2]
+    return label_lines * LINE_HEIGHT + h + 2 * border, w + 2 * border
+
+
+def draw_tile(tile, img, lines=(), color=(0, 0, 0), border=3):
+    """
+    Draws one tile into 'tile' (contiguous (th, tw, 3) uint8 buffer, reused
+    by callers): the label lines on top, then the framed image.
+    """
+    h, w = img.shape[:2]
+    label_h = tile.shape[0] - h - 2 * border
+    tile[:label_h] = BACKGROUND
+    for k, line in enumerate(lines):
+        cv2.putText(tile, line, (border, (k + 1) * LINE_HEIGHT - 3), FONT, LABEL_SCALE,
+                    color, 1, cv2.LINE_AA)
+    frame = tile[label_h:]
+    frame[...] = color
+    inner = frame[border:border + h, border:border + w]
+    if img.ndim == 2:
+        inner[...] = img[..., None]
+    else:
+        inner[...] = img
+    return tile
+
+
+def draw_title(band, text, scale=TITLE_SCALE):
+    """Writes a centred bold title into a contiguous (H, W, 3) band."""
+    band[...] = BACKGROUND
+    (tw, th), _ = cv2.getTextSize(text, FONT, scale, 2)
+    x = max(0, (band.shape[1] - tw) // 2)
+    y = (band.shape[0] + th) // 2
+    cv2.putText(band, text, (x, y), FONT, scale, (0, 0, 0), 2, cv2.LINE_AA)
+    return band
+
+
+def grid_shape(n, cols=None):
+    """Rows and columns for n tiles (near-square, like the old subplot grid)."""
+    if cols is None:
+        rows = int(np.ceil(np.sqrt(n)))
+        cols = int(np.ceil(n / rows))
+    else:
+        rows = int(np.ceil(n / cols))
+    return rows, cols
+
+
+def build_montage(images, labels=None, scores=None, title=None, cols=None, border=3, gap=4):
+    """
+    Tiles equally sized grayscale (or BGR) images into one BGR uint8 array.
+    labels: one string (lines split on '\\n') or list of lines per image.
+    scores: optional distance per image, selects the label / border colour.
+    """
+    images = list(images)
+    if not images:
+        return np.full((1, 1, 3), BACKGROUND, dtype=np.uint8)
+    labels = [_split_label(l) for l in labels] if labels is not None else [[] for _ in images]
+    rows, cols = grid_shape(len(images), cols)
+
+    n_lines = max(len(l) for l in labels)
+    th, tw = tile_shape(images[0].shape, n_lines, border)
+    top = TITLE_HEIGHT if title else 0
+    sheet = np.full((top + rows * (th + gap) + gap, cols * (tw + gap) + gap, 3),
+                    BACKGROUND, dtype=np.uint8)
+    if title:
+        draw_title(sheet[:top], title)
+
+    tile = np.empty((th, tw, 3), dtype=np.uint8)
+    for i, img in enumerate(images):
+        r, c = divmod(i, cols)
+        color = score_color(scores[i]) if scores is not None else (0, 0, 0)
+        draw_tile(tile, img, labels[i], color, border)
+        y = top + gap + r * (th + gap)
+        x = gap + c * (tw + gap)
+        sheet[y:y + th, x:x + tw] = tile
+    return sheet
+
+
+def save_image(filepath, img):
+    """Writes an image array (gray or BGR) with OpenCV's encoder."""
+    if not cv2.imwrite(filepath, img):
+        raise IOError(f"Could not write image: {filepath}")
+    return filepath
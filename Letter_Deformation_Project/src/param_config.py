@@ -1,50 +1,54 @@
+import os
+import json
+
 # Dictionary defining parameter limits and defaults for letter deformation
 # For each letter (A, B, C, F, X, W), we define parameters with:
 # 1. Minimum value (min)
 # 2. Maximum value (max)
 # 3. Default value (default)
+# 4. Value type (dtype): 'int' or 'float', see src/param_space.py
 
 PARAM_CONFIG = {
     'A': {
-        'base_width_factor': {'min': 1.0, 'max': 1.8, 'default': 1.0},
-        'top_width':         {'min': 0,   'max': 100,  'default': 0},
-        'crossbar_h_shift':  {'min': -30,   'max': 40,  'default': 0},
-        'shear_x':           {'min': 0,   'max': 35,  'default': 0},
-        'thickness':         {'min': 6,   'max': 18,  'default': 6}
+        'base_width_factor': {'min': 1.0, 'max': 1.8, 'default': 1.0, 'dtype': 'float'},
+        'top_width':         {'min': 0,   'max': 100,  'default': 0, 'dtype': 'int'},
+        'crossbar_h_shift':  {'min': -30,   'max': 40,  'default': 0, 'dtype': 'int'},
+        'shear_x':           {'min': 0,   'max': 35,  'default': 0, 'dtype': 'int'},
+        'thickness':         {'min': 6,   'max': 18,  'default': 6, 'dtype': 'int'}
     },
     'B': {
-        'width_factor':      {'min': 0.5, 'max': 1.0, 'default': 1.0},
-        'waist_y_shift':     {'min': 0,   'max': 40,  'default': 0},
-        'rotation_deg':      {'min': -30, 'max': 0,   'default': 0},
-        'vertical_squash':   {'min': 0.4, 'max': 1.0, 'default': 1.0},
-        'thickness':         {'min': 6,   'max': 18,  'default': 6}
+        'width_factor':      {'min': 0.5, 'max': 1.0, 'default': 1.0, 'dtype': 'float'},
+        'waist_y_shift':     {'min': 0,   'max': 40,  'default': 0, 'dtype': 'int'},
+        'rotation_deg':      {'min': -30, 'max': 0,   'default': 0, 'dtype': 'int'},
+        'vertical_squash':   {'min': 0.4, 'max': 1.0, 'default': 1.0, 'dtype': 'float'},
+        'thickness':         {'min': 6,   'max': 18,  'default': 6, 'dtype': 'int'}
     },
     'C': {
-        'cut_top':           {'min': -60, 'max': 40,  'default': 40},
-        'vertical_squash':   {'min': 0.45,'max': 1.0, 'default': 1.0},
-        'rotation_deg':      {'min': 0,   'max': 45,  'default': 0},
-        'thickness':         {'min': 6,   'max': 18,  'default': 6}
+        'cut_top':           {'min': -60, 'max': 40,  'default': 40, 'dtype': 'int'},
+        'vertical_squash':   {'min': 0.45,'max': 1.0, 'default': 1.0, 'dtype': 'float'},
+        'rotation_deg':      {'min': 0,   'max': 45,  'default': 0, 'dtype': 'int'},
+        'thickness':         {'min': 6,   'max': 18,  'default': 6, 'dtype': 'int'}
     },
     'F': {
-        'bar_length':        {'min': 1.0, 'max': 2.0, 'default': 1.0},
-        'middle_bar_shift':  {'min': -30, 'max': 40,  'default': 0},
-        'shear_x':           {'min': -30, 'max': 30,  'default': 0},
-        'spine_height':      {'min': 0.6, 'max': 1.2, 'default': 1.0},
-        'thickness':         {'min': 6,   'max': 18,  'default': 6}
+        'bar_length':        {'min': 1.0, 'max': 2.0, 'default': 1.0, 'dtype': 'float'},
+        'middle_bar_shift':  {'min': -30, 'max': 40,  'default': 0, 'dtype': 'int'},
+        'shear_x':           {'min': -30, 'max': 30,  'default': 0, 'dtype': 'int'},
+        'spine_height':      {'min': 0.6, 'max': 1.2, 'default': 1.0, 'dtype': 'float'},
+        'thickness':         {'min': 6,   'max': 18,  'default': 6, 'dtype': 'int'}
     },
     'X': {
-        'cross_ratio':       {'min': 0.3, 'max': 0.7, 'default': 0.5},
-        'spread_angle':      {'min': -30, 'max': 30,  'default': 0},
-        'rotation_deg':      {'min': -30, 'max': 30,  'default': 0},
-        'asymmetry':         {'min': -30, 'max': 30,  'default': 0},
-        'thickness':         {'min': 6,   'max': 18,  'default': 6}
+        'cross_ratio':       {'min': 0.3, 'max': 0.7, 'default': 0.5, 'dtype': 'float'},
+        'spread_angle':      {'min': -30, 'max': 30,  'default': 0, 'dtype': 'int'},
+        'rotation_deg':      {'min': -30, 'max': 30,  'default': 0, 'dtype': 'int'},
+        'asymmetry':         {'min': -30, 'max': 30,  'default': 0, 'dtype': 'int'},
+        'thickness':         {'min': 6,   'max': 18,  'default': 6, 'dtype': 'int'}
     },
     'W': {
-        'peak_depth':        {'min': 0.5, 'max': 0.9, 'default': 0.7},
-        'width_factor':      {'min': 0.3, 'max': 1.4, 'default': 1.0},
-        'middle_height':     {'min': 0.3, 'max': 1.0, 'default': 0.5},
-        'shear_x':           {'min': -25, 'max': 25,  'default': 0},
-        'thickness':         {'min': 6,   'max': 18,  'default': 6}
+        'peak_depth':        {'min': 0.5, 'max': 0.9, 'default': 0.7, 'dtype': 'float'},
+        'width_factor':      {'min': 0.3, 'max': 1.4, 'default': 1.0, 'dtype': 'float'},
+        'middle_height':     {'min': 0.3, 'max': 1.0, 'default': 0.5, 'dtype': 'float'},
+        'shear_x':           {'min': -25, 'max': 25,  'default': 0, 'dtype': 'int'},
+        'thickness':         {'min': 6,   'max': 18,  'default': 6, 'dtype': 'int'}
     }
 }
 
@@ -57,3 +61,32 @@ def get_limits(letter, param):
 def get_all_letters():
     """Returns a list of all available letters"""
     return list(PARAM_CONFIG.keys())
+
+# The JSON file is the source of truth used by every Run_Project tool
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'param_config.json')
+
+def load_param_config(filepath=CONFIG_PATH):
+    """Loads the parameter configuration JSON (Min/Max/Default per letter)"""
+    with open(filepath, 'r') as f:
+        return json.load(f)
+
+# Standard batch sweeps used by the report tools (analyze_parameter / analyze_heatmap --batch)
+# 1D sweeps: (letter, param, start, end, steps)
+STANDARD_SWEEPS = [
+    ('A', 'shear_x', -30, 30, 12),
+    ('B', 'vertical_squash', 0.4, 1.0, 12),
+    ('C', 'cut_top', -20, 80, 12),
+    ('F', 'bar_length', 0.5, 1.5, 12),
+    ('X', 'cross_ratio', 0.3, 0.7, 12),
+    ('W', 'peak_depth', 0.3, 0.9, 12),
+]
+
+# 2D heatmaps: (letter, param_x, param_y), each over its config range
+STANDARD_HEATMAP_PAIRS = [
+    ('A', 'shear_x', 'base_width_factor'),
+    ('B', 'vertical_squash', 'waist_y_shift'),
+    ('C', 'cut_top', 'vertical_squash'),
+    ('F', 'bar_length', 'middle_bar_shift'),
+    ('X', 'cross_ratio', 'spread_angle'),
+    ('W', 'peak_depth', 'width_factor'),
+]
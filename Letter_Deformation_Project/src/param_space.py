@@ -0,0 +1,173 @@
+import numpy as np
+
+# ==========================================
+# Parameter spaces with explicit dtypes
+# ==========================================
+# Every parameter in param_config.json declares its dtype ("int" or "float").
+# A ParameterSpace holds one letter's parameters and stores sets of parameter
+# values as structured NumPy arrays (one named field per parameter, in config
+# order). Sweeps, grids and samples are built column by column instead of one
+# dict per sample; dicts are only made at the draw call (to_dict / draw_args).
+#
+# Integer parameters are rounded half to even (np.rint, the same as Python's
+# round()), matching what the report tools did with int(round(v)).
+
+PARAM_DTYPES = {'int': np.int64, 'float': np.float64}
+
+
+def param_kind(param_cfg, name="parameter"):
+    """The declared dtype ('int' or 'float') of a param_config.json entry."""
+    kind = param_cfg.get('dtype')
+    if kind not in PARAM_DTYPES:
+        raise ValueError(f"'{name}' needs a \"dtype\" of {' or '.join(map(repr, PARAM_DTYPES))} "
+                         f"in param_config.json, got {kind!r}")
+    return kind
+
+
+def param_kinds(config):
+    """
+    Declared dtype of every parameter name over all letters of a config
+    ('float' where letters declare the same name differently).
+    """
+    kinds = {}
+    for letter, params in config.items():
+        for name, cfg in params.items():
+            kind = param_kind(cfg, f"{letter}.{name}")
+            kinds[name] = kind if kinds.get(name, kind) == kind else 'float'
+    return kinds
+
+
+def cast_values(kind, values):
+    """Values in a parameter's dtype (ints rounded half to even)."""
+    values = np.asarray(values, dtype=np.float64)
+    if kind == 'int':
+        return np.rint(values).astype(np.int64)
+    return values
+
+
+class ParameterSpace:
+    """
+    The parameters of one letter (a param_config.json entry).
+
+        space = ParameterSpace(config['B'], letter='B')
+        family = space.interpolate(['rotation_deg', 'thickness'], np.linspace(0, 1, 10))
+        for row in family:
+            params, thickness = space.draw_args(row)
+            draw_B(model, **params, thickness=thickness)
+
+    Arrays returned by the space are structured arrays with dtype space.dtype;
+    parameters that are not set explicitly hold their default.
+    """
+    def __init__(self, letter_config, letter=None):
+        self.letter = letter
+        self.names = tuple(letter_config.keys())
+        self.kinds = {name: param_kind(cfg, f"{letter}.{name}" if letter else name)
+                      for name, cfg in letter_config.items()}
+        self.dtype = np.dtype([(name, PARAM_DTYPES[self.kinds[name]]) for name in self.names])
+        self.low = {name: cfg['min'] for name, cfg in letter_config.items()}
+        self.high = {name: cfg['max'] for name, cfg in letter_config.items()}
+        self.default = {name: cfg['default'] for name, cfg in letter_config.items()}
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.kinds
+
+    def _check(self, names):
+        unknown = [name for name in names if name not in self.kinds]
+        if unknown:
+            raise KeyError(f"Unknown parameters {unknown} for {self.letter or 'this letter'}, "
+                           f"available: {list(self.names)}")
+
+    def is_int(self, name):
+        return self.kinds[name] == 'int'
+
+    def cast(self, name, values):
+        """Values (scalar or array) in the dtype of 'name'."""
+        out = cast_values(self.kinds[name], values)
+        return out.item() if out.ndim == 0 else out
+
+    # --- Building sample sets ---
+
+    def defaults(self, shape=1):
+        """Array of the given shape with every parameter at its default."""
+        out = np.empty(shape, dtype=self.dtype)
+        for name in self.names:
+            out[name] = self.default[name]
+        return out
+
+    def interpolate(self, active, t):
+        """
+        One row per t in [0, 1]: 'active' parameters move from min to max
+        (min + (max - min) * t), the others stay at their defaults.
+        """
+        self._check(active)
+        t = np.asarray(t, dtype=np.float64)
+        out = self.defaults(t.shape)
+        for name in active:
+            lo, hi = self.low[name], self.high[name]
+            out[name] = cast_values(self.kinds[name], lo + (hi - lo) * t)
+        return out
+
+    def sweep(self, name, values):
+        """One row per value of 'name', everything else at its default."""
+        self._check([name])
+        values = np.asarray(values, dtype=np.float64)
+        out = self.defaults(values.shape)
+        out[name] = cast_values(self.kinds[name], values)
+        return out
+
+    def grid(self, x_name, x_values, y_name, y_values):
+        """2-D grid of shape (len(y_values), len(x_values)): row i is y_values[i], column j is x_values[j]."""
+        self._check([x_name, y_name])
+        y, x = np.meshgrid(np.asarray(y_values, dtype=np.float64), np.asarray(x_values, dtype=np.float64),
+                           indexing='ij')
+        out = self.defaults(x.shape)
+        out[x_name] = cast_values(self.kinds[x_name], x)
+        out[y_name] = cast_values(self.kinds[y_name], y)
+        return out
+
+    def from_unit(self, unit_points):
+        """
+        Maps unit-cube points (N, len(space)) onto the [min, max] box, one
+        column per parameter in config order. Integer parameters are spread
+        uniformly over every integer in the range instead of being rounded,
+        so the end values are not under-sampled.
+        """
+        unit_points = np.asarray(unit_points, dtype=np.float64)
+        out = np.empty(len(unit_points), dtype=self.dtype)
+        for d, name in enumerate(self.names):
+            lo, hi = self.low[name], self.high[name]
+            u = unit_points[:, d]
+            if self.is_int(name):
+                span = hi - lo + 1
+                out[name] = lo + np.minimum(np.floor(u * span), span - 1)
+            else:
+                out[name] = lo + (hi - lo) * u
+        return out
+
+    def clip(self, samples):
+        """Clips every parameter of 'samples' to its [min, max] range (in place) and returns it."""
+        for name in self.names:
+            np.clip(samples[name], self.low[name], self.high[name], out=samples[name])
+        return samples
+
+    # --- Back to Python values ---
+
+    def to_dict(self, row):
+        """Full parameter dict (Python ints / floats) of one row."""
+        return dict(zip(self.names, row.tolist()))
+
+    def to_dicts(self, samples):
+        return [dict(zip(self.names, values)) for values in np.ravel(samples).tolist()]
+
+    def draw_args(self, row):
+        """(params without 'thickness', thickness) for a draw_* call."""
+        params = self.to_dict(row)
+        return params, int(params.pop('thickness', 6))
+
+
+def load_spaces(config):
+    """ParameterSpace per letter of a loaded param_config.json."""
+    return {letter: ParameterSpace(letter_config, letter=letter) for letter, letter_config in config.items()}
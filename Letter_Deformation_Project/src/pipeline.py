@@ -0,0 +1,182 @@
+import time
+import queue
+import threading
+
+# ==========================================
+# Staged pipeline with bounded queues
+# ==========================================
+# Dataset generation alternates CPU work (draw, dilate, blur + SSIM) with I/O
+# (PNG encoding, writing files). A Pipeline runs each step as a stage with its
+# own worker threads, connected by bounded queues: a full queue blocks the
+# stage before it (backpressure), so at most about queue_size items per stage
+# are in memory. OpenCV, NumPy / scikit-image, zlib and file writes release
+# the GIL for most of their work, so the stages overlap.
+#
+# Per-stage statistics show where the time goes:
+#   busy     share of the stage's worker time spent in the stage function
+#   starved  waiting for input (the stages before are too slow)
+#   blocked  waiting for room in the next queue (the stages after are too slow)
+
+_DONE = object()
+_POLL = 0.1
+
+
+class StageStats:
+    """Counters of one stage (summed over its workers)."""
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.busy = 0.0
+        self.starved = 0.0
+        self.blocked = 0.0
+        self.lock = threading.Lock()
+
+    def add(self, busy, starved, blocked):
+        with self.lock:
+            self.items += 1
+            self.busy += busy
+            self.starved += starved
+            self.blocked += blocked
+
+    def summary(self, wall):
+        total = max(wall * self.workers, 1e-9)
+        return (f"{self.name:<8} x{self.workers}  {self.items:>6} items  "
+                f"{self.items / max(wall, 1e-9):8.1f} items/s  "
+                f"busy {100 * self.busy / total:3.0f}%  "
+                f"starved {100 * self.starved / total:3.0f}%  "
+                f"blocked {100 * self.blocked / total:3.0f}%")
+
+
+class Pipeline:
+    """
+    Runs items through stages [(name, fn, workers), ...] where fn(item) returns
+    the item for the next stage.
+
+        pipe = Pipeline([("render", render, 1), ("score", score, 2),
+                         ("encode", encode, 2), ("write", write, 1)], queue_size=16)
+        for item in pipe.imap(tasks):    # completion order
+            ...
+        print(pipe.report())
+
+    The first error raised by a stage stops the pipeline and is re-raised by imap().
+    """
+    def __init__(self, stages, queue_size=16):
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+        for name, _, workers in stages:
+            if workers < 1:
+                raise ValueError(f"Stage '{name}' needs at least one worker, got {workers}")
+        self.stages = stages
+        self.queue_size = queue_size
+        self.stats = [StageStats(name, workers) for name, _, workers in stages]
+        self.wall = 0.0
+        self._stop = threading.Event()
+        self._error = None
+
+    # --- Queue helpers (give up when the pipeline is stopped) ---
+
+    def _put(self, q, item):
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=_POLL)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _get(self, q):
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=_POLL)
+            except queue.Empty:
+                pass
+        return _DONE
+
+    def _fail(self, error):
+        if self._error is None:
+            self._error = error
+        self._stop.set()
+
+    # --- Threads ---
+
+    def _feed(self, items, out_q):
+        try:
+            for item in items:
+                if not self._put(out_q, item):
+                    return
+        except BaseException as e:
+            self._fail(e)
+        self._put(out_q, _DONE)
+
+    def _work(self, fn, stats, in_q, out_q, remaining):
+        while True:
+            t0 = time.perf_counter()
+            item = self._get(in_q)
+            t1 = time.perf_counter()
+            if item is _DONE:
+                # Pass the end marker on to the next stage once every worker of this one is done
+                self._put(in_q, _DONE)
+                with stats.lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last:
+                    self._put(out_q, _DONE)
+                return
+            try:
+                result = fn(item)
+            except BaseException as e:
+                self._fail(e)
+                continue
+            t2 = time.perf_counter()
+            self._put(out_q, result)
+            stats.add(busy=t2 - t1, starved=t1 - t0, blocked=time.perf_counter() - t2)
+
+    def imap(self, items):
+        """Yields the output of the last stage for every item, in completion order."""
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        threads = [threading.Thread(target=self._feed, args=(items, queues[0]), daemon=True)]
+        for i, ((_, fn, workers), stats) in enumerate(zip(self.stages, self.stats)):
+            remaining = [workers]
+            threads += [threading.Thread(target=self._work, args=(fn, stats, queues[i], queues[i + 1], remaining),
+                                         daemon=True) for _ in range(workers)]
+
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        try:
+            while True:
+                item = self._get(queues[-1])
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            # Also reached when the consumer stops early: release every blocked thread
+            self._stop.set()
+            for t in threads:
+                t.join()
+            self.wall = time.perf_counter() - start
+        if self._error is not None:
+            raise self._error
+
+    def run(self, items):
+        """Runs all items and returns the outputs as a list (completion order)."""
+        return list(self.imap(items))
+
+    def report(self):
+        """One line of throughput / utilisation per stage."""
+        return "\n".join(s.summary(self.wall) for s in self.stats)
+
+
+def parse_workers(spec, stage_names, default=1):
+    """
+    Worker counts from 'render=1,score=2,...' (missing stages get 'default').
+    Returns a dict stage name -> workers.
+    """
+    workers = {name: default for name in stage_names}
+    for part in filter(None, (spec or "").split(',')):
+        name, _, count = part.partition('=')
+        if name not in workers:
+            raise ValueError(f"Unknown stage '{name}', expected one of {list(stage_names)}")
+        workers[name] = int(count)
+    return workers
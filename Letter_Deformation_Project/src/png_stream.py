@@ -0,0 +1,107 @@
+import os
+import struct
+import zlib
+import numpy as np
+
+# ==========================================
+# Streaming PNG encoder
+# ==========================================
+# Writes an 8-bit PNG a block of rows at a time (zlib + struct only), so an
+# image of any height never has to be held in memory: only the rows passed
+# to write_rows() and the pending compressed bytes.
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# Channels -> PNG colour type (gray, RGB, RGBA)
+COLOR_TYPES = {1: 0, 3: 2, 4: 6}
+
+
+def _chunk(tag, data):
+    return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff)
+
+
+class PNGStreamWriter:
+    """
+    Incremental PNG writer for a (height, width, channels) uint8 image whose
+    size is known up front. Rows use the PNG 'Up' filter (difference to the
+    previous row), which compresses rendered masks well. bgr=True accepts
+    OpenCV channel order.
+
+        with PNGStreamWriter(path, width, height) as png:
+            for strip in strips:
+                png.write_rows(strip)
+    """
+    def __init__(self, filepath, width, height, channels=3, bgr=False, level=6, idat_size=1 << 20):
+        if channels not in COLOR_TYPES:
+            raise ValueError(f"Unsupported channel count {channels}, expected one of {list(COLOR_TYPES)}")
+        self.filepath = filepath
+        self.width, self.height, self.channels = int(width), int(height), channels
+        self.bgr = bgr and channels >= 3
+        self.rows_written = 0
+        self.idat_size = idat_size
+        self._compressor = zlib.compressobj(level)
+        self._pending = []
+        self._pending_bytes = 0
+        self._prev_row = np.zeros(self.width * channels, dtype=np.uint8)
+
+        self._file = open(filepath, 'wb')
+        self._file.write(PNG_SIGNATURE)
+        ihdr = struct.pack('>IIBBBBB', self.width, self.height, 8, COLOR_TYPES[channels], 0, 0, 0)
+        self._file.write(_chunk(b'IHDR', ihdr))
+
+    def write_rows(self, rows):
+        """Appends rows: (n, width) for gray or (n, width, channels) uint8."""
+        rows = np.asarray(rows, dtype=np.uint8)
+        n = rows.shape[0]
+        if self.rows_written + n > self.height:
+            raise ValueError(f"Too many rows: {self.rows_written + n} > declared height {self.height}")
+        if self.bgr:
+            rows = rows[..., [2, 1, 0] + list(range(3, self.channels))]
+        flat = rows.reshape(n, self.width * self.channels)
+
+        # Filter byte 2 ('Up') + row minus previous row, modulo 256
+        filtered = np.empty((n, flat.shape[1] + 1), dtype=np.uint8)
+        filtered[:, 0] = 2
+        np.subtract(flat[0], self._prev_row, out=filtered[0, 1:])
+        np.subtract(flat[1:], flat[:-1], out=filtered[1:, 1:])
+        self._prev_row = flat[-1].copy()
+
+        self._push(self._compressor.compress(filtered.tobytes()))
+        self.rows_written += n
+
+    def _push(self, data):
+        if data:
+            self._pending.append(data)
+            self._pending_bytes += len(data)
+        if self._pending_bytes >= self.idat_size:
+            self._flush_idat()
+
+    def _flush_idat(self):
+        if self._pending_bytes:
+            self._file.write(_chunk(b'IDAT', b''.join(self._pending)))
+        self._pending, self._pending_bytes = [], 0
+
+    def close(self):
+        if self._file is None: return
+        try:
+            if self.rows_written != self.height:
+                raise ValueError(f"PNG incomplete: wrote {self.rows_written} of {self.height} rows")
+            self._pending.append(self._compressor.flush())
+            self._pending_bytes += len(self._pending[-1])
+            self._flush_idat()
+            self._file.write(_chunk(b'IEND', b''))
+        finally:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            # Leave no truncated file behind on errors
+            self._file.close()
+            self._file = None
+            os.remove(self.filepath)
+            return False
+        self.close()
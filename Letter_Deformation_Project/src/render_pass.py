@@ -0,0 +1,138 @@
+from functools import partial
+
+import numpy as np
+
+from src.letter_model import LetterSkeleton
+from src.base_letters import render_letter
+from src.canonical import collapse_equivalent
+from src.dedup import mask_digest, DistanceCache
+from src.metrics import calculate_distance, DistanceWorkspace
+from src.param_space import load_spaces
+
+# ==========================================
+# Render-once pass with fan-out to sinks
+# ==========================================
+# The dataset families, the full matrices, the 1-D reports and the heatmaps
+# all render and score parameter sets of the same letters, and many of them
+# overlap (every single-parameter family of the dataset is also a row of the
+# full matrix, sweeps and grids pass through the defaults, ...). A RenderPass
+# asks every registered sink which parameter sets it needs, renders and
+# scores each distinct one once per letter and hands the results back:
+#
+#   for every letter:
+#       rows  = sink.request(letter, space)       for every sink
+#       render each distinct row once             (src.canonical: equivalent
+#                                                  parameter sets render alike)
+#       score each distinct mask once             (DistanceCache on the digest)
+#       sink.consume(letter, rows, images, scores, digests)
+#   sink.finish()
+#
+# Images handed to sinks are shared between them and must not be modified.
+
+
+class RenderSink:
+    """An output of a RenderPass. Subclasses override what they need."""
+    name = "sink"
+
+    def request(self, letter, space):
+        """Parameter sets needed for 'letter' (array of space.dtype), or None."""
+        return None
+
+    def consume(self, letter, rows, images, scores, digests):
+        """Results of the rows returned by request(), in the same order."""
+
+    def finish(self):
+        """Called once after the last letter."""
+
+
+class LetterStats:
+    def __init__(self, letter):
+        self.letter = letter
+        self.requested = 0
+        self.rendered = 0
+        self.scored = 0
+
+    def summary(self):
+        return (f"{self.letter}: {self.requested:>6} requested  {self.rendered:>6} rendered  "
+                f"{self.scored:>6} scored")
+
+
+class RenderPass:
+    """
+    Renders every distinct parameter set requested by the sinks once.
+
+        rp = RenderPass(config, [DatasetSink(...), SweepSink(...)])
+        rp.run()
+        print(rp.report())
+
+    The base image of each letter (all parameters at their defaults) is the
+    scoring reference; its own score is 0. local=True scores with the
+    diff-restricted SSIM of DistanceWorkspace.
+    """
+    def __init__(self, config, sinks=(), size=(200, 200), local=False):
+        self.config = config
+        self.local = local
+        self.spaces = load_spaces(config)
+        self.sinks = list(sinks)
+        self.size = size
+        self.stats = []
+
+    def add(self, sink):
+        self.sinks.append(sink)
+        return sink
+
+    def run_letter(self, letter):
+        space = self.spaces[letter]
+        stats = LetterStats(letter)
+        self.stats.append(stats)
+
+        requests = []
+        for sink in self.sinks:
+            rows = sink.request(letter, space)
+            if rows is not None and len(rows):
+                requests.append((sink, np.ravel(rows)))
+        if not requests:
+            return stats
+
+        model = LetterSkeleton(size=self.size)
+        base_img = render_letter(model, letter, space.to_dict(space.defaults(1)[0]))
+        scorer = DistanceWorkspace(self.size, local=self.local)
+        distances = DistanceCache(base_img, partial(calculate_distance, workspace=scorer))
+
+        # One render per canonical form over the rows of all sinks
+        rows = np.concatenate([r for _, r in requests])
+        reps, inverse = collapse_equivalent(letter, rows)
+        images, scores, digests = [], [], []
+        for row in rows[reps]:
+            img = render_letter(model, letter, space.to_dict(row))
+            digest = mask_digest(img)
+            images.append(img)
+            scores.append(distances.distance(img, digest))
+            digests.append(digest)
+        stats.requested = len(rows)
+        stats.rendered = len(reps)
+        stats.scored = len(distances.scores)
+
+        start = 0
+        for sink, sink_rows in requests:
+            idx = inverse[start:start + len(sink_rows)]
+            start += len(sink_rows)
+            sink.consume(letter, sink_rows, [images[i] for i in idx], [scores[i] for i in idx],
+                         [digests[i] for i in idx])
+        return stats
+
+    def run(self, letters=None):
+        """Runs every letter of the config (or 'letters') and finishes the sinks."""
+        for letter in letters or list(self.config):
+            self.run_letter(letter)
+        for sink in self.sinks:
+            sink.finish()
+
+    def report(self):
+        """Requested / rendered / scored counts per letter and in total."""
+        total = LetterStats("all")
+        for s in self.stats:
+            total.requested += s.requested
+            total.rendered += s.rendered
+            total.scored += s.scored
+        return "\n".join(s.summary() for s in self.stats + [total])
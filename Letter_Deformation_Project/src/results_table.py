@@ -0,0 +1,212 @@
+import os
+import json
+import shutil
+import numpy as np
+
+# ==========================================
+# Columnar results table
+# ==========================================
+# dataset_summary.json as typed columns, one .npy file per column plus a
+# schema.json, so questions like "B samples with rotation_deg < -20 and
+# score_dist > 0.5" are a few vectorised comparisons over memory-mapped
+# arrays instead of a scan over nested dicts.
+#
+# Column kinds:
+#   category - small integer codes + the list of categories in the schema
+#   text     - fixed-width UTF-8 bytes (file paths, image hashes)
+#   number   - score / index columns
+#   param    - one float64 column per letter parameter, NaN where the
+#              letter does not have it (NaN fails every comparison); the
+#              schema keeps its declared dtype so records() returns ints
+
+SCHEMA_FILE = "schema.json"
+TABLE_VERSION = 1
+
+CATEGORY_COLUMNS = ("letter", "type", "deformation_family")
+TEXT_COLUMNS = ("filepath", "image_hash")
+
+OPS = {
+    '==': np.equal,
+    '!=': np.not_equal,
+    '<': np.less,
+    '<=': np.less_equal,
+    '>': np.greater,
+    '>=': np.greater_equal,
+}
+
+
+def _category_codes(values):
+    categories = sorted(set(values))
+    lookup = {c: i for i, c in enumerate(categories)}
+    dtype = np.uint8 if len(categories) < 256 else np.uint16 if len(categories) < 65536 else np.uint32
+    return np.array([lookup[v] for v in values], dtype=dtype), categories
+
+
+def records_to_columns(records, param_kinds=None):
+    """
+    Converts dataset records (as written to dataset_summary.json) into
+    (columns dict of arrays, schema column list). param_kinds maps parameter
+    names to their declared dtype ('int' / 'float', see
+    src.param_space.param_kinds); unlisted parameters are floats.
+    """
+    param_kinds = param_kinds or {}
+    n = len(records)
+    columns, schema = {}, []
+
+    for name in CATEGORY_COLUMNS:
+        codes, categories = _category_codes([str(r.get(name, "")) for r in records])
+        columns[name] = codes
+        schema.append({"name": name, "kind": "category", "categories": categories})
+
+    for name in TEXT_COLUMNS:
+        encoded = [str(r.get(name, "")).encode('utf-8') for r in records]
+        width = max((len(e) for e in encoded), default=1) or 1
+        columns[name] = np.array(encoded, dtype=f"S{width}")
+        schema.append({"name": name, "kind": "text"})
+
+    columns["score_dist"] = np.array([r.get("score_dist", np.nan) for r in records], dtype=np.float64)
+    columns["sample_index"] = np.array([r.get("sampling", {}).get("index", -1) for r in records], dtype=np.int64)
+    schema += [{"name": "score_dist", "kind": "number"}, {"name": "sample_index", "kind": "number"}]
+
+    param_names = []
+    for r in records:
+        for key in r.get("parameters", {}):
+            if key not in param_names:
+                param_names.append(key)
+    for key in param_names:
+        if key in columns:
+            raise ValueError(f"Parameter '{key}' collides with a table column")
+        col = np.full(n, np.nan, dtype=np.float64)
+        for i, r in enumerate(records):
+            value = r.get("parameters", {}).get(key)
+            if value is not None:
+                col[i] = value
+        columns[key] = col
+        schema.append({"name": key, "kind": "param", "param_dtype": param_kinds.get(key, 'float')})
+
+    for entry in schema:
+        entry["dtype"] = columns[entry["name"]].dtype.str
+    return columns, schema
+
+
+def write_results_table(table_dir, records, param_kinds=None):
+    """Writes records as a columnar table directory (replacing an existing one)."""
+    columns, schema = records_to_columns(records, param_kinds)
+    tmp_dir = table_dir.rstrip(os.sep) + ".tmp"
+    if os.path.exists(tmp_dir):
+        shutil.rmtree(tmp_dir)
+    os.makedirs(tmp_dir)
+    for name, array in columns.items():
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), array)
+    with open(os.path.join(tmp_dir, SCHEMA_FILE), 'w') as f:
+        json.dump({"version": TABLE_VERSION, "num_rows": len(records), "columns": schema}, f, indent=2)
+
+    if os.path.exists(table_dir):
+        shutil.rmtree(table_dir)
+    os.replace(tmp_dir, table_dir)
+    return table_dir
+
+
+class ResultsTable:
+    """
+    Read side of a results table. Columns are memory-mapped on first use.
+
+        table = ResultsTable(os.path.join(root_dir, "dataset_table"))
+        rows = table.query(('letter', '==', 'B'), ('rotation_deg', '<', -20),
+                           ('score_dist', '>', 0.5))
+        paths = table.filepaths(rows)
+
+    Predicates are (column, op, value) with op in ==, !=, <, <=, >, >=,
+    'in' (value is a collection) or 'between' (inclusive (low, high)).
+    Keyword arguments are equality shortcuts: table.query(letter='B').
+    """
+    def __init__(self, table_dir, mmap=True):
+        self.table_dir = table_dir
+        self.mmap_mode = 'r' if mmap else None
+        with open(os.path.join(table_dir, SCHEMA_FILE), 'r') as f:
+            self.schema = json.load(f)
+        self.num_rows = self.schema["num_rows"]
+        self._columns = {c["name"]: c for c in self.schema["columns"]}
+        self._cache = {}
+
+    def __len__(self):
+        return self.num_rows
+
+    @property
+    def column_names(self):
+        return list(self._columns)
+
+    def param_names(self):
+        return [c["name"] for c in self.schema["columns"] if c["kind"] == "param"]
+
+    def column(self, name):
+        """Raw column array (category codes for category columns)."""
+        if name not in self._columns:
+            raise KeyError(f"Unknown column '{name}', available: {self.column_names}")
+        if name not in self._cache:
+            self._cache[name] = np.load(os.path.join(self.table_dir, f"{name}.npy"), mmap_mode=self.mmap_mode)
+        return self._cache[name]
+
+    def values(self, name, rows=None):
+        """Decoded values of a column (strings for category / text), optionally for some rows."""
+        data = self.column(name)
+        if rows is not None:
+            data = data[rows]
+        info = self._columns[name]
+        if info["kind"] == "category":
+            return np.asarray(info["categories"], dtype=object)[data]
+        if info["kind"] == "text":
+            return np.char.decode(data, 'utf-8')
+        return np.asarray(data)
+
+    def _encode(self, name, value):
+        # Values compared against stored representation of the column
+        info = self._columns[name]
+        if info["kind"] == "category":
+            categories = info["categories"]
+            return categories.index(value) if value in categories else -1
+        if info["kind"] == "text":
+            return str(value).encode('utf-8')
+        return value
+
+    def mask(self, *predicates, **equals):
+        """Boolean row mask for the conjunction of all predicates."""
+        predicates = list(predicates) + [(k, '==', v) for k, v in equals.items()]
+        result = np.ones(self.num_rows, dtype=bool)
+        for name, op, value in predicates:
+            data = self.column(name)
+            kind = self._columns[name]["kind"]
+            if kind in ("category", "text") and op not in ('==', '!=', 'in'):
+                raise ValueError(f"Operator '{op}' is not supported on {kind} column '{name}'")
+            if op == 'in':
+                result &= np.isin(data, [self._encode(name, v) for v in value])
+            elif op == 'between':
+                low, high = value
+                result &= (data >= low) & (data <= high)
+            elif op in OPS:
+                result &= OPS[op](data, self._encode(name, value))
+            else:
+                raise ValueError(f"Unknown operator '{op}', expected one of {list(OPS) + ['in', 'between']}")
+        return result
+
+    def query(self, *predicates, **equals):
+        """Row offsets (int64 array) matching all predicates."""
+        return np.flatnonzero(self.mask(*predicates, **equals))
+
+    def filepaths(self, rows):
+        """Relative file paths of the given rows (offsets or boolean mask)."""
+        return self.values("filepath", rows).tolist()
+
+    def records(self, rows):
+        """Rows as plain dicts (parameters that are NaN are left out, int parameters are ints)."""
+        rows = np.flatnonzero(rows) if np.asarray(rows).dtype == bool else np.asarray(rows)
+        cols = {name: self.values(name, rows) for name in self.column_names}
+        params = self.param_names()
+        casts = {p: int if self._columns[p].get("param_dtype") == 'int' else float for p in params}
+        out = []
+        for i in range(len(rows)):
+            record = {name: cols[name][i].item() if hasattr(cols[name][i], 'item') else cols[name][i]
+                      for name in self.column_names if name not in params}
+            record["parameters"] = {p: casts[p](cols[p][i]) for p in params if not np.isnan(cols[p][i])}
+            out.append(record)
+        return out
@@ -0,0 +1,72 @@
+import warnings
+import numpy as np
+
+from src.param_space import ParameterSpace
+
+# Supported ways of spreading samples over the param_config.json box
+SAMPLING_METHODS = ('random', 'lhs', 'sobol', 'halton')
+
+
+def letter_seed(seed, letter):
+    """Derives a stable per-letter seed so every letter gets its own stream."""
+    return int(np.random.SeedSequence([int(seed), ord(letter)]).generate_state(1)[0])
+
+
+def _qmc_engine(engine_cls, n_dims, seed):
+    # scipy renamed 'seed' to 'rng' in 1.15, support both spellings
+    try:
+        return engine_cls(d=n_dims, rng=seed)
+    except TypeError:
+        return engine_cls(d=n_dims, seed=seed)
+
+
+def make_unit_sampler(n_dims, method='random', seed=None):
+    """
+    Returns a draw(n) function producing successive chunks of unit-cube points.
+    Consecutive calls continue the same stream, so Sobol/Halton sequences keep
+    their low-discrepancy ordering and never repeat points.
+    """
+    if method not in SAMPLING_METHODS:
+        raise ValueError(f"Unknown sampling method '{method}', expected one of {SAMPLING_METHODS}")
+
+    if method == 'random':
+        rng = np.random.default_rng(seed)
+        return lambda n: rng.random((n, n_dims))
+
+    from scipy.stats import qmc
+
+    engines = {'lhs': qmc.LatinHypercube, 'sobol': qmc.Sobol, 'halton': qmc.Halton}
+    engine = _qmc_engine(engines[method], n_dims, seed)
+
+    def draw(n):
+        with warnings.catch_warnings():
+            # Sobol warns when n is not a power of two; the budget is chosen by the user
+            warnings.simplefilter('ignore', UserWarning)
+            return engine.random(n)
+    return draw
+
+
+def sample_unit_cube(n_samples, n_dims, method='random', seed=None):
+    """
+    Draws n_samples points in the unit hypercube [0, 1)^n_dims.
+    'random' is plain uniform sampling, 'lhs' is Latin hypercube sampling,
+    'sobol' and 'halton' are scrambled low-discrepancy sequences.
+    """
+    return make_unit_sampler(n_dims, method=method, seed=seed)(n_samples)
+
+
+def sample_space(space, n_samples, method='random', seed=None):
+    """
+    Samples n_samples full parameter sets of a ParameterSpace, covering the
+    whole box of its config entry. Returns a structured array (space.dtype).
+    """
+    return space.from_unit(sample_unit_cube(n_samples, len(space), method=method, seed=seed))
+
+
+def sample_params(letter_config, n_samples, method='random', seed=None):
+    """
+    Samples n_samples full parameter sets for one letter, covering the whole
+    box defined by its param_config.json entry. Returns a list of dicts.
+    """
+    space = ParameterSpace(letter_config)
+    return space.to_dicts(sample_space(space, n_samples, method=method, seed=seed))
@@ -0,0 +1,131 @@
+import numpy as np
+
+from src.display_list import RENDER_BACKENDS, primitive_segments
+
+# ==========================================
+# Signed-distance-field rasterizer
+# ==========================================
+# Every pixel gets its distance to the nearest line / arc segment of the
+# letter, for a whole batch at once. A mask is that field thresholded at the
+# stroke half width, so:
+#   * a thickness sweep re-thresholds one field instead of re-drawing,
+#   * resolution is just the sampling grid ('scale'),
+#   * anti-aliasing comes from the same field (1-pixel linear ramp).
+#
+# The OpenCV path draws an anti-aliased line of width t and then dilates it
+# with a t x t square. Fitted against that reference over thickness 6..18 and
+# all letters, the closest disc-shaped stroke has a half width of t + 1.25,
+# and even t needs the strokes moved by -0.5 px because an even square
+# footprint is not centred. With that, masks agree with the reference at
+# ~0.94 IoU on average (the square reaches further on diagonals than any
+# disc), so the SDF backend is an approximation, not a pixel-exact twin.
+
+
+def sdf_half_width(thickness):
+    """Half stroke width (letter units) that best matches LetterSkeleton's line + dilation."""
+    return np.asarray(thickness, dtype=np.float32) + 1.25
+
+
+def sdf_offset(thickness):
+    """Stroke shift that mimics the off-centre even-sized dilation footprint."""
+    return np.where(np.asarray(thickness) % 2 == 0, -0.5, 0.0).astype(np.float32)
+
+
+def _padded_segments(display_lists, offsets=None):
+    """
+    Stacks the segments of every display list into (B, S, 4), padding by
+    repetition. offsets (one per list) shift the strokes diagonally.
+    """
+    segs = [np.vstack([primitive_segments(p) for p in dl.primitives]) if len(dl)
+            else np.full((1, 4), -1e6) for dl in display_lists]
+    n_max = max(len(s) for s in segs)
+    out = np.empty((len(segs), n_max, 4), dtype=np.float32)
+    for i, s in enumerate(segs):
+        out[i, :len(s)] = s
+        # Repeating the last segment does not change the minimum distance
+        out[i, len(s):] = s[-1]
+    if offsets is not None:
+        out += np.asarray(offsets, dtype=np.float32)[:, None, None]
+    return out
+
+
+def sdf_distance_fields(display_lists, scale=1.0, max_distance=None, offsets=None):
+    """
+    Returns a float32 (B, H*scale, W*scale) array of distances (in letter
+    units, i.e. pixels of the 200x200 canvas) from each pixel centre to the
+    letter's strokes. Distances above max_distance are capped to it, which
+    lets every segment only touch the pixels near it. By default the cap is
+    just past the widest stroke in the batch. offsets (one per list) shift
+    the strokes, see sdf_offset().
+    """
+    display_lists = list(display_lists)
+    h, w = display_lists[0].size
+    out_h, out_w = int(round(h * scale)), int(round(w * scale))
+    if max_distance is None:
+        max_distance = float(sdf_half_width(max(dl.thickness for dl in display_lists))) + 2.0
+
+    # Pixel centres in canvas coordinates (cv2 puts pixel (i, j) at x=j, y=i)
+    xs = ((np.arange(out_w, dtype=np.float32) + 0.5) / scale - 0.5)
+    ys = ((np.arange(out_h, dtype=np.float32) + 0.5) / scale - 0.5)
+
+    segments = _padded_segments(display_lists, offsets)
+    dist2 = np.full((len(display_lists), out_h, out_w), max_distance ** 2, dtype=np.float32)
+
+    for s in range(segments.shape[1]):
+        seg = segments[:, s]
+        x1, y1, x2, y2 = (seg[:, k][:, None, None] for k in range(4))
+
+        # Only the pixels within max_distance of this segment (union over the batch)
+        c0 = int(np.searchsorted(xs, min(seg[:, 0].min(), seg[:, 2].min()) - max_distance))
+        c1 = int(np.searchsorted(xs, max(seg[:, 0].max(), seg[:, 2].max()) + max_distance, side='right'))
+        r0 = int(np.searchsorted(ys, min(seg[:, 1].min(), seg[:, 3].min()) - max_distance))
+        r1 = int(np.searchsorted(ys, max(seg[:, 1].max(), seg[:, 3].max()) + max_distance, side='right'))
+        if c0 >= c1 or r0 >= r1:
+            continue
+
+        px = xs[None, None, c0:c1]
+        py = ys[None, r0:r1, None]
+        dx, dy = x2 - x1, y2 - y1
+        len2 = np.maximum(dx * dx + dy * dy, 1e-12)
+        t = np.clip(((px - x1) * dx + (py - y1) * dy) / len2, 0.0, 1.0)
+        ex = px - x1 - t * dx
+        ey = py - y1 - t * dy
+        region = dist2[:, r0:r1, c0:c1]
+        np.minimum(region, ex * ex + ey * ey, out=region)
+
+    return np.sqrt(dist2, out=dist2)
+
+
+def sdf_masks(fields, half_widths, scale=1.0, antialias=False):
+    """
+    Thresholds distance fields into uint8 masks. half_widths is a scalar or
+    one value per field. With antialias=True the edge is a linear ramp one
+    output pixel wide instead of a hard step.
+    """
+    half_widths = np.broadcast_to(np.asarray(half_widths, dtype=np.float32), (len(fields),))
+    hw = half_widths[:, None, None]
+    if antialias:
+        coverage = np.clip((hw - fields) * scale + 0.5, 0.0, 1.0)
+        return np.round(coverage * 255).astype(np.uint8)
+    return np.where(fields <= hw, 255, 0).astype(np.uint8)
+
+
+def render_sdf(display_lists, scale=1.0, antialias=False, thickness=None):
+    """
+    Render backend: SDF masks for a batch of display lists. 'thickness'
+    overrides the stroke thickness of every letter (the geometry of the
+    letters does not depend on it), which makes thickness sweeps a threshold
+    (re-use sdf_distance_fields + sdf_masks directly to keep one field).
+    """
+    display_lists = list(display_lists)
+    if not display_lists:
+        return np.zeros((0, 200, 200), dtype=np.uint8)
+    thick = [dl.thickness for dl in display_lists] if thickness is None else thickness
+    half_widths = sdf_half_width(thick)
+    offsets = sdf_offset(np.broadcast_to(np.asarray(thick), (len(display_lists),)))
+    fields = sdf_distance_fields(display_lists, scale=scale, offsets=offsets,
+                                 max_distance=float(np.max(half_widths)) + 2.0)
+    return sdf_masks(fields, half_widths, scale=scale, antialias=antialias)
+
+
+RENDER_BACKENDS['sdf'] = render_sdf
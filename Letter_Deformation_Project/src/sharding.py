@@ -0,0 +1,81 @@
+import os
+import re
+import json
+
+# dataset_summary.shard-00002-of-00004.json
+MANIFEST_PATTERN = re.compile(r"dataset_summary\.shard-(\d+)-of-(\d+)\.json$")
+
+
+def validate_shard(shard, num_shards):
+    """Raises ValueError for an impossible --shard / --num-shards pair."""
+    if num_shards < 1:
+        raise ValueError(f"--num-shards must be >= 1 (got {num_shards})")
+    if not 0 <= shard < num_shards:
+        raise ValueError(f"--shard must be in [0, {num_shards - 1}] (got {shard})")
+
+
+def owns_unit(unit_index, shard, num_shards):
+    """
+    Static round-robin partition of the work units. Neighbouring units
+    (e.g. the families of one letter) land on different shards, which
+    keeps the shards balanced without any coordination.
+    """
+    return unit_index % num_shards == shard
+
+
+def shard_manifest_name(shard, num_shards):
+    return f"dataset_summary.shard-{shard:05d}-of-{num_shards:05d}.json"
+
+
+def write_shard_manifest(root_dir, shard, num_shards, units, settings):
+    """
+    Writes this shard's metadata. 'units' is a list of (unit_index, records)
+    so the merge step can restore the single-node ordering.
+    """
+    path = os.path.join(root_dir, shard_manifest_name(shard, num_shards))
+    manifest = {
+        "shard": shard,
+        "num_shards": num_shards,
+        "settings": settings,
+        "units": [{"unit": u, "records": records} for u, records in units],
+    }
+    with open(path, 'w') as f:
+        json.dump(manifest, f, indent=4)
+    return path
+
+
+def merge_shard_manifests(root_dir):
+    """
+    Combines every shard manifest in root_dir into one record list, ordered
+    exactly like a single-node run. Raises ValueError if shards are missing
+    or were generated with different settings.
+    """
+    manifests = {}
+    for name in sorted(os.listdir(root_dir)):
+        match = MANIFEST_PATTERN.match(name)
+        if match:
+            with open(os.path.join(root_dir, name), 'r') as f:
+                manifests[(int(match.group(1)), int(match.group(2)))] = json.load(f)
+
+    if not manifests:
+        raise ValueError(f"No shard manifests found in {root_dir}")
+
+    counts = {num for _, num in manifests}
+    if len(counts) != 1:
+        raise ValueError(f"Found manifests from different shard counts: {sorted(counts)}")
+    num_shards = counts.pop()
+
+    missing = [i for i in range(num_shards) if (i, num_shards) not in manifests]
+    if missing:
+        raise ValueError(f"Missing shards {missing} of {num_shards}")
+
+    settings = [m["settings"] for m in manifests.values()]
+    if any(s != settings[0] for s in settings):
+        raise ValueError("Shards were generated with different settings")
+
+    units = []
+    for manifest in manifests.values():
+        units.extend((u["unit"], u["records"]) for u in manifest["units"])
+    units.sort(key=lambda item: item[0])
+
+    return [record for _, records in units for record in records]
@@ -0,0 +1,198 @@
+import multiprocessing as mp
+import queue
+import traceback
+import numpy as np
+
+from src.letter_model import LetterSkeleton
+from src.base_letters import render_letter
+from src.geometry import compute_geometry, draw_geometry
+from src.metrics import blur_image, get_precision, DistanceWorkspace
+from src.param_config import load_param_config
+from src.sampling import make_unit_sampler, letter_seed
+from src.param_space import load_spaces
+
+
+class BatchRenderer:
+    """
+    Renders batches for one worker. Every worker owns its own skeleton,
+    blurred base images and sampling streams, seeded from (seed, worker_id).
+    Masks are dilated straight into the batch and scored in a
+    DistanceWorkspace; blurs and SSIM run in 'precision'.
+    """
+    def __init__(self, config, letters, batch_size, sampling, seed, worker_id, size, precision='float64'):
+        self.config = config
+        self.precision = precision
+        self.letters = list(letters)
+        self.spaces = load_spaces({letter: config[letter] for letter in self.letters})
+        self.batch_size = batch_size
+        self.size = size
+
+        worker_seed = int(np.random.SeedSequence([int(seed), int(worker_id)]).generate_state(1)[0])
+        self.rng = np.random.default_rng(worker_seed)
+        self.samplers = {
+            letter: make_unit_sampler(len(config[letter]), method=sampling,
+                                      seed=letter_seed(worker_seed, letter))
+            for letter in self.letters
+        }
+
+        self.model = LetterSkeleton(size=size)
+        self.scorer = DistanceWorkspace(size, precision=precision)
+        self.base_blurs = {}
+        for letter in self.letters:
+            space = self.spaces[letter]
+            defaults = space.to_dict(space.defaults(1)[0])
+            self.base_blurs[letter] = blur_image(render_letter(self.model, letter, defaults),
+                                                  precision=precision)
+
+    def next_batch(self):
+        """Returns one batch dict: images, labels, params and distances."""
+        images = np.empty((self.batch_size, *self.size), dtype=np.uint8)
+        labels = self.rng.choice(self.letters, size=self.batch_size)
+        params = [None] * self.batch_size
+        distances = np.empty(self.batch_size, dtype=np.float32)
+
+        # Draw all samples of a letter in one chunk to keep the QMC streams ordered
+        for letter in self.letters:
+            idx = np.flatnonzero(labels == letter)
+            if len(idx) == 0: continue
+            space = self.spaces[letter]
+            samples = space.from_unit(self.samplers[letter](len(idx)))
+            geometry = compute_geometry(letter, samples)
+
+            for j, (i, p) in enumerate(zip(idx, space.to_dicts(samples))):
+                draw_geometry(self.model, geometry, j)
+                # The dilated mask is written straight into the batch
+                self.model.apply_morphology(thickness=int(geometry.thickness[j]), out=images[i])
+                params[i] = p
+                self.scorer.set_reference_blur(self.base_blurs[letter])
+                distances[i] = self.scorer.distance(images[i])
+
+        return {"images": images, "labels": labels, "params": params, "distances": distances}
+
+
+class _RemoteTraceback(Exception):
+    """Carries the formatted traceback of a worker as the cause of the re-raised error."""
+    def __str__(self):
+        return self.args[0]
+
+
+class _WorkerFailure:
+    """Put on the queue by a worker that raised; the consumer re-raises the exception."""
+    def __init__(self, exc):
+        self.exc = exc
+        self.traceback = traceback.format_exc()
+
+
+def _put(out_queue, stop_event, item):
+    # Bounded queue: block (with timeout so we notice shutdown) when full
+    while not stop_event.is_set():
+        try:
+            out_queue.put(item, timeout=0.1)
+            return
+        except queue.Full:
+            continue
+
+
+def _worker_loop(out_queue, stop_event, renderer_args):
+    try:
+        renderer = BatchRenderer(*renderer_args)
+        while not stop_event.is_set():
+            _put(out_queue, stop_event, renderer.next_batch())
+    except Exception as exc:
+        _put(out_queue, stop_event, _WorkerFailure(exc))
+
+
+def _get_batch(in_queue, worker, worker_id, poll=0.5):
+    """
+    Next batch of one worker. Re-raises the worker's exception, and raises
+    RuntimeError if the process died without reporting one (e.g. killed).
+    """
+    while True:
+        try:
+            item = in_queue.get(timeout=poll)
+            break
+        except queue.Empty:
+            if worker.is_alive():
+                continue
+            # It may have queued its last item just before exiting
+            try:
+                item = in_queue.get(timeout=poll)
+                break
+            except queue.Empty:
+                raise RuntimeError(f"LetterStream worker {worker_id} exited unexpectedly "
+                                   f"(exit code {worker.exitcode})") from None
+    if isinstance(item, _WorkerFailure):
+        raise item.exc from _RemoteTraceback(f"\n\nWorker {worker_id} traceback:\n{item.traceback}")
+    return item
+
+
+class LetterStream:
+    """
+    Iterable dataset that renders training batches straight from memory,
+    with no PNG round-trip through OUTPUT_DATASET.
+
+    Each batch is a dict with:
+        images    - uint8 array (batch_size, H, W)
+        labels    - array of letter characters
+        params    - list of full parameter dicts (thickness included)
+        distances - float32 distance to the letter's canonical base image
+
+    With num_workers > 0 batches are rendered by background processes, each
+    with a bounded queue of `prefetch` batches. Batches are read from the
+    workers round-robin, so the stream is deterministic for a given seed and
+    worker count. num_batches=None means an endless stream. precision
+    ('float64' or 'float32') defaults to src.metrics.get_precision().
+    """
+    def __init__(self, letters=None, config=None, batch_size=32, sampling='random',
+                 seed=0, num_workers=0, prefetch=4, num_batches=None, size=(200, 200),
+                 precision=None):
+        self.config = config if config is not None else load_param_config()
+        self.letters = list(letters) if letters is not None else list(self.config.keys())
+        self.batch_size = batch_size
+        self.sampling = sampling
+        self.seed = seed
+        self.num_workers = num_workers
+        self.prefetch = prefetch
+        self.num_batches = num_batches
+        self.size = size
+        self.precision = precision or get_precision()
+
+    def _renderer_args(self, worker_id):
+        return (self.config, self.letters, self.batch_size, self.sampling,
+                self.seed, worker_id, self.size, self.precision)
+
+    def __iter__(self):
+        if self.num_workers <= 0:
+            renderer = BatchRenderer(*self._renderer_args(0))
+            count = 0
+            while self.num_batches is None or count < self.num_batches:
+                yield renderer.next_batch()
+                count += 1
+            return
+
+        ctx = mp.get_context()
+        stop_event = ctx.Event()
+        queues = [ctx.Queue(maxsize=self.prefetch) for _ in range(self.num_workers)]
+        workers = [
+            ctx.Process(target=_worker_loop, args=(q, stop_event, self._renderer_args(w)), daemon=True)
+            for w, q in enumerate(queues)
+        ]
+        for w in workers: w.start()
+
+        try:
+            count = 0
+            while self.num_batches is None or count < self.num_batches:
+                w = count % self.num_workers
+                yield _get_batch(queues[w], workers[w], w)
+                count += 1
+        finally:
+            stop_event.set()
+            for q in queues:
+                # Drain so workers blocked on put() can exit
+                try:
+                    while True: q.get_nowait()
+                except queue.Empty:
+                    pass
+            for w in workers:
+                w.join(timeout=1.0)
+                if w.is_alive(): w.terminate()
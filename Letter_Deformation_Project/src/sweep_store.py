@@ -0,0 +1,116 @@
+import os
+import re
+import json
+import hashlib
+import inspect
+import numpy as np
+
+import src.base_letters
+import src.letter_model
+import src.param_space
+
+# ==========================================
+# Sweep result store (compute once, plot many)
+# ==========================================
+# Each sweep saves its raw arrays (values, distances, thumbnails, ...) as one
+# compressed .npz together with JSON metadata and an input hash. The hash
+# covers everything that changes the numbers: the sweep spec, the letter's
+# config and the source of the draw / distance functions. Plot scripts load
+# the stored result when the hash still matches and only re-plot.
+
+META_KEY = "__meta__"
+
+
+def input_hash(spec, code=()):
+    """
+    Hex digest of a JSON-serializable sweep spec plus the source code of the
+    given functions (draw function, distance metric, ...).
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(json.dumps(spec, sort_keys=True, default=str).encode())
+    for fn in code:
+        h.update(inspect.getsource(fn).encode())
+    return h.hexdigest()
+
+
+def draw_code(letter):
+    """
+    The draw function of a letter plus every CanonicalLetters helper it calls
+    (directly or through other helpers, e.g. _rotate_point for B and X).
+    """
+    letters = src.base_letters.CanonicalLetters
+    names, todo = [], [f"draw_{letter}"]
+    while todo:
+        name = todo.pop()
+        if name in names:
+            continue
+        names.append(name)
+        todo.extend(re.findall(r"CanonicalLetters\.(\w+)", inspect.getsource(getattr(letters, name))))
+    return tuple(getattr(letters, name) for name in names)
+
+
+def render_code(letter):
+    """
+    Everything that turns a letter's parameter set into its mask: draw_code,
+    the rasterizer (src.letter_model) and the parameter casting / rounding
+    (src.param_space).
+    """
+    return draw_code(letter) + (src.letter_model, src.param_space)
+
+
+def save_sweep(filepath, arrays, metadata=None):
+    """Writes arrays + metadata to one .npz file (atomically replaced)."""
+    os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+    payload = {k: np.asarray(v) for k, v in arrays.items()}
+    payload[META_KEY] = np.array(json.dumps(metadata or {}, default=str))
+    tmp_path = filepath + ".tmp.npz"
+    np.savez_compressed(tmp_path, **payload)
+    os.replace(tmp_path, filepath)
+    return filepath
+
+
+def load_sweep(filepath):
+    """Returns (arrays dict, metadata dict) of a stored sweep."""
+    with np.load(filepath, allow_pickle=False) as data:
+        arrays = {k: data[k] for k in data.files if k != META_KEY}
+        metadata = json.loads(str(data[META_KEY])) if META_KEY in data.files else {}
+    return arrays, metadata
+
+
+class SweepStore:
+    """A directory of named sweep results, validated by input hash."""
+    def __init__(self, root):
+        self.root = root
+
+    def path_for(self, name):
+        return os.path.join(self.root, f"{name}.npz")
+
+    def load(self, name, key):
+        """Stored (arrays, metadata) for 'name' if its input hash equals 'key', else None."""
+        path = self.path_for(name)
+        if not os.path.exists(path):
+            return None
+        try:
+            arrays, metadata = load_sweep(path)
+        except (OSError, ValueError, KeyError):
+            return None
+        if metadata.get("input_hash") != key:
+            return None
+        return arrays, metadata
+
+    def save(self, name, key, arrays, metadata=None):
+        metadata = {**(metadata or {}), "input_hash": key}
+        return save_sweep(self.path_for(name), arrays, metadata)
+
+    def load_or_compute(self, name, key, compute, recompute=False):
+        """
+        Returns (arrays, metadata, cached). 'compute' is called without
+        arguments and returns (arrays, metadata) when no valid result exists.
+        """
+        if not recompute:
+            stored = self.load(name, key)
+            if stored is not None:
+                return stored[0], stored[1], True
+        arrays, metadata = compute()
+        self.save(name, key, arrays, metadata)
+        return arrays, {**metadata, "input_hash": key}, False
@@ -0,0 +1,249 @@
+import os
+import json
+import itertools
+import multiprocessing as mp
+import numpy as np
+
+from src.param_space import param_kind, cast_values
+
+# ==========================================
+# Chunked on-disk N-D tensor store
+# ==========================================
+# Joint sweeps over 3+ parameters give a dense tensor of distances that can
+# outgrow RAM. A store is a directory:
+#   header.json           shape, chunk shape, dtype, fill value, axes
+#                         (parameter name + value grid), the input hash of
+#                         the code / config that produced the chunks and
+#                         free metadata
+#   chunks/c_0.2.1.npy    one .npy per chunk (edge chunks are smaller)
+# Chunks are written atomically (temp file + rename), so independent
+# processes can fill them in any order and an interrupted sweep resumes
+# with missing_chunks(). Reads memory-map only the chunks a slice touches.
+# Reopening a store with a different input hash drops its chunks (they were
+# computed by other code), so a resumed sweep never mixes stale results.
+
+HEADER_FILE = "header.json"
+STORE_VERSION = 1
+
+
+def axis_values(param_cfg, steps):
+    """Value grid of one parameter over its config range, in its declared dtype."""
+    values = np.linspace(param_cfg['min'], param_cfg['max'], steps)
+    return cast_values(param_kind(param_cfg), values).tolist()
+
+
+def axes_from_config(letter_config, params, steps):
+    """[(name, values), ...] for the given parameters; steps is an int or one per parameter."""
+    steps = [steps] * len(params) if np.isscalar(steps) else list(steps)
+    return [(p, axis_values(letter_config[p], s)) for p, s in zip(params, steps)]
+
+
+def default_chunks(shape, dtype, target_bytes=4 << 20):
+    """Roughly cubic chunk shape of at most target_bytes."""
+    itemsize = np.dtype(dtype).itemsize
+    edge = max(1, int((target_bytes / itemsize) ** (1.0 / len(shape))))
+    return tuple(min(s, edge) for s in shape)
+
+
+class TensorStore:
+    """
+    Chunked N-D array on disk with labelled axes.
+
+        store = TensorStore.create(path, axes_from_config(cfg['B'], params, 20))
+        store.fill(compute_chunk, num_workers=4)      # compute_chunk(store, chunk_id)
+        section = store.section({'thickness': 6})     # 2-D cross-section for plotting
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, HEADER_FILE), 'r') as f:
+            self.header = json.load(f)
+        self.shape = tuple(self.header["shape"])
+        self.chunks = tuple(self.header["chunks"])
+        self.dtype = np.dtype(self.header["dtype"])
+        self.fill_value = self.header["fill_value"]
+        self.axes = [(a["name"], a["values"]) for a in self.header["axes"]]
+        self.axis_names = [name for name, _ in self.axes]
+        self.metadata = self.header.get("metadata", {})
+        self.input_hash = self.header.get("input_hash")
+
+    @classmethod
+    def create(cls, path, axes, chunks=None, dtype=np.float32, fill_value=float('nan'), metadata=None,
+               input_hash=None):
+        """
+        Creates an empty store (no chunk files yet). An existing store is
+        opened if the layout matches and raises ValueError otherwise; if its
+        input_hash differs, its chunks are deleted and the header replaced.
+        """
+        shape = tuple(len(values) for _, values in axes)
+        chunks = tuple(chunks) if chunks is not None else default_chunks(shape, dtype)
+        if len(chunks) != len(shape):
+            raise ValueError(f"Chunk shape {chunks} does not match tensor rank {len(shape)}")
+        header = {
+            "version": STORE_VERSION,
+            "shape": list(shape),
+            "chunks": list(chunks),
+            "dtype": np.dtype(dtype).str,
+            "fill_value": fill_value,
+            "axes": [{"name": name, "values": list(values)} for name, values in axes],
+            "input_hash": input_hash,
+            "metadata": metadata or {},
+        }
+        header_path = os.path.join(path, HEADER_FILE)
+        if os.path.exists(header_path):
+            with open(header_path, 'r') as f:
+                existing = json.load(f)
+            if _layout(existing) != _layout(header):
+                raise ValueError(f"A store with a different layout already exists at {path}")
+            if existing.get("input_hash") == input_hash:
+                return cls(path)
+            cls(path).clear()
+
+        os.makedirs(os.path.join(path, "chunks"), exist_ok=True)
+        with open(header_path + ".tmp", 'w') as f:
+            json.dump(header, f, indent=2, allow_nan=True)
+        os.replace(header_path + ".tmp", header_path)
+        return cls(path)
+
+    # --- Chunk layout ---
+
+    @property
+    def chunk_grid(self):
+        return tuple(-(-s // c) for s, c in zip(self.shape, self.chunks))
+
+    def chunk_ids(self):
+        return list(itertools.product(*(range(n) for n in self.chunk_grid)))
+
+    def chunk_slices(self, chunk_id):
+        return tuple(slice(i * c, min((i + 1) * c, s)) for i, c, s in zip(chunk_id, self.chunks, self.shape))
+
+    def chunk_axes(self, chunk_id):
+        """Axis values covered by a chunk: [(name, values), ...]."""
+        return [(name, values[sl]) for (name, values), sl in zip(self.axes, self.chunk_slices(chunk_id))]
+
+    def _chunk_path(self, chunk_id):
+        return os.path.join(self.path, "chunks", "c_" + ".".join(map(str, chunk_id)) + ".npy")
+
+    def has_chunk(self, chunk_id):
+        return os.path.exists(self._chunk_path(chunk_id))
+
+    def missing_chunks(self):
+        return [cid for cid in self.chunk_ids() if not self.has_chunk(cid)]
+
+    def clear(self):
+        """Deletes every written chunk (the header stays)."""
+        for cid in self.chunk_ids():
+            if self.has_chunk(cid):
+                os.remove(self._chunk_path(cid))
+
+    # --- Writing ---
+
+    def write_chunk(self, chunk_id, data):
+        """Stores one full chunk (atomic, safe to call from several processes)."""
+        expected = tuple(sl.stop - sl.start for sl in self.chunk_slices(chunk_id))
+        data = np.asarray(data, dtype=self.dtype)
+        if data.shape != expected:
+            raise ValueError(f"Chunk {chunk_id} must have shape {expected}, got {data.shape}")
+        path = self._chunk_path(chunk_id)
+        tmp_path = f"{path}.{os.getpid()}.tmp.npy"
+        np.save(tmp_path, data)
+        os.replace(tmp_path, path)
+
+    def fill(self, compute_chunk, chunk_ids=None, num_workers=0):
+        """
+        Computes and writes chunks with compute_chunk(store, chunk_id) -> array.
+        Defaults to every missing chunk. With num_workers > 0 chunks are
+        computed by a process pool (compute_chunk must be a top-level function).
+        Returns the number of chunks written.
+        """
+        chunk_ids = self.missing_chunks() if chunk_ids is None else list(chunk_ids)
+        if num_workers <= 0:
+            for cid in chunk_ids:
+                self.write_chunk(cid, compute_chunk(self, cid))
+        else:
+            with mp.get_context().Pool(num_workers) as pool:
+                for _ in pool.imap_unordered(_fill_one, [(self.path, compute_chunk, cid) for cid in chunk_ids]):
+                    pass
+        return len(chunk_ids)
+
+    # --- Reading ---
+
+    def read_chunk(self, chunk_id):
+        """Memory-mapped chunk, or None if it was not written yet."""
+        path = self._chunk_path(chunk_id)
+        if not os.path.exists(path):
+            return None
+        return np.load(path, mmap_mode='r')
+
+    def __getitem__(self, key):
+        """
+        NumPy-style basic indexing (ints and slices, with steps) over the
+        whole tensor. Only the chunks that overlap the selection are read;
+        chunks not written yet read as fill_value.
+        """
+        if not isinstance(key, tuple):
+            key = (key,)
+        if Ellipsis in key:
+            i = key.index(Ellipsis)
+            key = key[:i] + (slice(None),) * (len(self.shape) - len(key) + 1) + key[i + 1:]
+        key = key + (slice(None),) * (len(self.shape) - len(key))
+
+        # Selected global indices per axis
+        picks, squeeze = [], []
+        for axis, (k, size) in enumerate(zip(key, self.shape)):
+            if isinstance(k, slice):
+                picks.append(np.arange(size)[k])
+            else:
+                k = int(k)
+                if k < 0: k += size
+                if not 0 <= k < size:
+                    raise IndexError(f"Index {k} out of range for axis {axis} with size {size}")
+                picks.append(np.array([k]))
+                squeeze.append(axis)
+
+        out = np.full(tuple(len(p) for p in picks), self.fill_value, dtype=self.dtype)
+        # Chunks touched along each axis, with the positions they fill in 'out'
+        per_axis = []
+        for p, c in zip(picks, self.chunks):
+            ids = p // c
+            per_axis.append([(cid, np.flatnonzero(ids == cid)) for cid in np.unique(ids)])
+
+        for combo in itertools.product(*per_axis):
+            chunk = self.read_chunk(tuple(int(cid) for cid, _ in combo))
+            if chunk is None:
+                continue
+            local = tuple(picks[a][pos] - cid * self.chunks[a] for a, (cid, pos) in enumerate(combo))
+            out[np.ix_(*(pos for _, pos in combo))] = chunk[np.ix_(*local)]
+
+        return out.squeeze(axis=tuple(squeeze)) if squeeze else out
+
+    def axis_index(self, name, value):
+        """Index on an axis of the grid point closest to 'value'."""
+        values = np.asarray(self.axes[self.axis_names.index(name)][1], dtype=np.float64)
+        return int(np.argmin(np.abs(values - value)))
+
+    def section(self, fixed):
+        """
+        Cross-section with some axes fixed: fixed maps axis name -> value
+        (snapped to the nearest grid point). Returns (array, free axes), where
+        free axes is [(name, values), ...] for the remaining dimensions.
+        """
+        for name in fixed:
+            if name not in self.axis_names:
+                raise KeyError(f"Unknown axis '{name}', available: {self.axis_names}")
+        key = tuple(self.axis_index(name, fixed[name]) if name in fixed else slice(None)
+                    for name in self.axis_names)
+        free = [(name, values) for name, values in self.axes if name not in fixed]
+        return self[key], free
+
+
+def _layout(header):
+    # Everything but the input hash and the free metadata, as text (NaN fill values compare equal)
+    return json.dumps({k: v for k, v in header.items() if k not in ("metadata", "input_hash")},
+                      sort_keys=True)
+
+
+def _fill_one(args):
+    path, compute_chunk, chunk_id = args
+    store = TensorStore(path)
+    store.write_chunk(chunk_id, compute_chunk(store, chunk_id))
+    return chunk_id
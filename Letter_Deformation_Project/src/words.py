@@ -0,0 +1,179 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from src.letter_model import LetterSkeleton
+from src.base_letters import render_letter
+from src.canonical import canonical_form
+from src.metrics import DistanceWorkspace
+from src.param_space import load_spaces
+
+# ==========================================
+# Glyph atlas and word compositor
+# ==========================================
+# A word is a row of letters, each drawn by its draw_* function with its own
+# parameters on a 200x200 canvas. The GlyphAtlas keeps the rendered glyphs,
+# keyed by the canonical form of (letter, params) (src/canonical.py: equal
+# keys render to identical masks), cropped to the columns that contain ink.
+# Composing a word is then one atlas lookup and one array blit per letter:
+#
+#   x = 0
+#   for each letter:   word[:, x:x + glyph width] = max(word[...], glyph)
+#                      x += glyph width + spacing
+#
+# and the word is centred on the canvas. Spacing is measured between the ink
+# of neighbouring letters, so a letter drawn off-centre (C at x=110) or a
+# narrow one (squashed B) is not padded by its empty canvas columns.
+# Negative spacing lets letters overlap.
+
+
+class Glyph:
+    """A rendered letter cropped to its ink columns ('x0' is the crop offset)."""
+    __slots__ = ('image', 'x0')
+
+    def __init__(self, image, x0):
+        self.image = image
+        self.x0 = x0
+
+    @property
+    def width(self):
+        return self.image.shape[1]
+
+
+class GlyphAtlas:
+    """
+    Cache of rendered glyphs of one canvas size.
+
+        atlas = GlyphAtlas(config)
+        glyph = atlas.glyph('A', params)      # params: full dict, None = defaults
+
+    Holds up to 'capacity' glyphs (least recently used ones are dropped).
+    hits / misses count the lookups; report() summarizes them.
+    """
+    def __init__(self, config, size=(200, 200), capacity=4096, binary=False):
+        self.spaces = load_spaces(config)
+        self.size = size
+        self.capacity = capacity
+        self.model = LetterSkeleton(size=size, binary=binary)
+        self.glyphs = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.glyphs)
+
+    def default_params(self, letter):
+        space = self.spaces[letter]
+        return space.to_dict(space.defaults(1)[0])
+
+    def glyph(self, letter, params=None):
+        params = self.default_params(letter) if params is None else params
+        key = canonical_form(letter, params, self.size)
+        glyph = self.glyphs.get(key)
+        if glyph is not None:
+            self.hits += 1
+            self.glyphs.move_to_end(key)
+            return glyph
+        self.misses += 1
+        img = render_letter(self.model, letter, params)
+        cols = np.flatnonzero(img.any(axis=0))
+        x0, x1 = (cols[0], cols[-1] + 1) if len(cols) else (0, 0)
+        glyph = Glyph(np.ascontiguousarray(img[:, x0:x1]), int(x0))
+        glyph.image.flags.writeable = False
+        self.glyphs[key] = glyph
+        if len(self.glyphs) > self.capacity:
+            self.glyphs.popitem(last=False)
+            self.evictions += 1
+        return glyph
+
+    @property
+    def nbytes(self):
+        return sum(g.image.nbytes for g in self.glyphs.values())
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def report(self):
+        lookups = self.hits + self.misses
+        return (f"Glyph atlas: {lookups} lookups, {self.hits} hits, {self.misses} renders "
+                f"(hit rate {self.hit_rate():.1%}), {len(self)} glyphs cached "
+                f"({self.nbytes / 1e6:.1f} MB), {self.evictions} evicted")
+
+
+class WordCompositor:
+    """
+    Places glyphs of a GlyphAtlas side by side on one wide canvas.
+
+        words = WordCompositor(atlas, spacing=12)
+        img = words.compose("FAX", [params_F, None, params_X], spacing=[8, 15])
+
+    params: one dict per letter (None = that letter's defaults).
+    spacing: pixels between the ink of neighbouring letters, one value or one
+    per gap. width: fixed canvas width with the word centred (required to
+    compare words); by default the canvas fits the word plus 'margin'.
+    """
+    def __init__(self, atlas, spacing=12, margin=10):
+        self.atlas = atlas
+        self.spacing = spacing
+        self.margin = margin
+
+    def glyphs(self, word, params=None):
+        params = [None] * len(word) if params is None else list(params)
+        if len(params) != len(word):
+            raise ValueError(f"Got {len(params)} parameter sets for the {len(word)} letters of '{word}'")
+        return [self.atlas.glyph(letter, p) for letter, p in zip(word, params)]
+
+    def layout(self, glyphs, spacing=None):
+        """x of every glyph's first column (relative to the word's start) and the word width."""
+        spacing = self.spacing if spacing is None else spacing
+        gaps = np.broadcast_to(np.asarray(spacing, dtype=np.int64), (max(len(glyphs) - 1, 0),))
+        xs, x = [], 0
+        for i, glyph in enumerate(glyphs):
+            xs.append(x)
+            x += glyph.width + (int(gaps[i]) if i < len(gaps) else 0)
+        # With negative spacing a glyph can end before or start left of another
+        lo = min(xs) if xs else 0
+        hi = max((x + g.width for x, g in zip(xs, glyphs)), default=0)
+        return [x - lo for x in xs], hi - lo
+
+    def compose(self, word, params=None, spacing=None, width=None, out=None):
+        glyphs = self.glyphs(word, params)
+        xs, word_width = self.layout(glyphs, spacing)
+        h = self.atlas.size[0]
+        if width is None:
+            width = word_width + 2 * self.margin
+        if word_width > width:
+            raise ValueError(f"'{word}' is {word_width} px wide, canvas is {width} px")
+        if out is None:
+            out = np.zeros((h, width), dtype=np.uint8)
+        else:
+            out.fill(0)
+        start = (width - word_width) // 2
+        for x, glyph in zip(xs, glyphs):
+            region = out[:, start + x:start + x + glyph.width]
+            np.maximum(region, glyph.image, out=region)
+        return out
+
+
+class WordScorer:
+    """
+    Distance of deformed versions of a word to the word with every letter at
+    its defaults and the default spacing, on a canvas of fixed width.
+    """
+    def __init__(self, compositor, word, width, precision=None):
+        self.compositor = compositor
+        self.word = word
+        self.width = width
+        self.reference = compositor.compose(word, width=width)
+        self.workspace = DistanceWorkspace(self.reference.shape, precision=precision)
+        self.workspace.set_reference(self.reference)
+        self.canvas = np.empty_like(self.reference)
+
+    def compose(self, params=None, spacing=None):
+        """The word in the scorer's canvas buffer (overwritten by the next call)."""
+        return self.compositor.compose(self.word, params, spacing, self.width, out=self.canvas)
+
+    def distance(self, params=None, spacing=None):
+        return self.workspace.distance(self.compose(params, spacing))
@@ -0,0 +1,98 @@
+import sys
+import os
+
+# --- PATH CONFIGURATION ---
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+import numpy as np
+import pytest
+from skimage.morphology import dilation
+
+from src.letter_model import LetterSkeleton
+from src.base_letters import DRAW_FUNCS, render_letter
+from src.param_config import load_param_config
+from src.param_space import load_spaces
+from src.sampling import sample_space, letter_seed
+from src.geometry import compute_geometry, draw_geometry
+from src.metrics import calculate_distance, DistanceWorkspace, PRECISIONS
+
+# =========================
+# Equivalences the fast paths rely on
+# =========================
+# Run with: python -m pytest tests
+#
+#   cv2 dilation (apply_morphology)   == skimage dilation(canvas, square(t))
+#   DistanceWorkspace                 == calculate_distance (bit-identical)
+#   DistanceWorkspace(local=True)     ~= calculate_distance (1e-12)
+#   compute_geometry + draw_geometry  == CanonicalLetters.draw_* skeletons
+#
+# on seeded random samples of every letter's parameter box.
+
+SAMPLES = 40
+SEED = 0
+SIZE = (200, 200)
+
+CONFIG = load_param_config()
+SPACES = load_spaces(CONFIG)
+LETTERS = [letter for letter in DRAW_FUNCS if letter in SPACES]
+
+
+def samples(letter, n=SAMPLES):
+    space = SPACES[letter]
+    return space.to_dicts(sample_space(space, n, method='random', seed=letter_seed(SEED, letter)))
+
+
+def base_image(model, letter):
+    space = SPACES[letter]
+    return render_letter(model, letter, space.to_dict(space.defaults(1)[0])).copy()
+
+
+@pytest.mark.parametrize("letter", LETTERS)
+def test_cv2_dilation_matches_skimage(letter):
+    model = LetterSkeleton(size=SIZE)
+    for params in samples(letter):
+        img = render_letter(model, letter, params)
+        t = int(params['thickness'])
+        expected = dilation(model.canvas, np.ones((t, t), dtype=np.uint8))  # square(t)
+        np.testing.assert_array_equal(img, expected)
+
+
+@pytest.mark.parametrize("precision", PRECISIONS)
+@pytest.mark.parametrize("letter", LETTERS)
+def test_workspace_matches_calculate_distance(letter, precision):
+    model = LetterSkeleton(size=SIZE)
+    base = base_image(model, letter)
+    ws = DistanceWorkspace(SIZE, precision=precision)
+    ws.set_reference(base)
+    mask = np.empty(SIZE, dtype=np.uint8)
+    for params in samples(letter):
+        img = render_letter(model, letter, params, out=mask)
+        assert ws.distance(img) == calculate_distance(base, img, precision=precision)
+
+
+@pytest.mark.parametrize("letter", LETTERS)
+def test_local_workspace_matches_calculate_distance(letter):
+    model = LetterSkeleton(size=SIZE)
+    base = base_image(model, letter)
+    ws = DistanceWorkspace(SIZE, local=True)
+    ws.set_reference(base)
+    for params in samples(letter):
+        img = render_letter(model, letter, params)
+        assert abs(ws.distance(img) - calculate_distance(base, img)) < 1e-12
+
+
+@pytest.mark.parametrize("letter", LETTERS)
+def test_geometry_matches_scalar_draw(letter):
+    params = samples(letter, n=200)
+    geometry = compute_geometry(letter, params)
+    scalar, vector = LetterSkeleton(size=SIZE), LetterSkeleton(size=SIZE)
+    for i, p in enumerate(params):
+        p = dict(p)
+        thick = int(p.pop('thickness'))
+        DRAW_FUNCS[letter](scalar, **p, thickness=thick)
+        draw_geometry(vector, geometry, i)
+        assert int(geometry.thickness[i]) == thick
+        np.testing.assert_array_equal(vector.canvas, scalar.canvas)